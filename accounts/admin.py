@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import StaffProfile
+from .models import StaffProfile, LoginIdentifier
 
 # -----------------------------
 # Inline for StaffProfile inside User admin
@@ -44,3 +44,11 @@ class StaffProfileAdmin(admin.ModelAdmin):
     list_filter = ('role',)
     search_fields = ('user__username', 'phone', 'role')
     # fields = ('user', 'phone', 'role')  # optional: only editable fields
+
+
+@admin.register(LoginIdentifier)
+class LoginIdentifierAdmin(admin.ModelAdmin):
+    list_display = ('value', 'kind', 'user')
+    list_filter = ('kind',)
+    search_fields = ('value', 'user__username')
+    raw_id_fields = ('user',)
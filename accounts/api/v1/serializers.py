@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from subscriptions.models import SubscriptionPlan
 from chitti.models import ChittiGroup
+from accounts.first_login import add_first_login_claim
 
 
 # ----------------------
@@ -12,6 +14,14 @@ class LoginSerializer(serializers.Serializer):
     identifier = serializers.CharField()
     password = serializers.CharField(write_only=True)
 
+
+class FirstLoginTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """token/ endpoint tokens carry the first_login claim too."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_first_login_claim(super().get_token(user), user)
+
 class GroupSignupSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=100)
     phone = serializers.CharField(max_length=15)
@@ -7,7 +7,8 @@ from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from django.core.mail import send_mail
 from django.db import transaction
-from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.first_login import tokens_for_user, complete_first_login, CLAIM
+from accounts.identifiers import authenticate_identifier
 import random, time
 import razorpay
 from .serializers import *
@@ -52,30 +53,10 @@ class LoginAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user = None
-
-        # 1️⃣ Username login
-        user = authenticate(request, username=identifier, password=password)
-
-        # 2️⃣ Email login
-        if user is None:
-            u = User.objects.filter(email=identifier).first()
-            if u and u.check_password(password):
-                user = u
-
-        # 3️⃣ Member phone login
-        if user is None:
-            member = Member.objects.filter(phone=identifier).first()
-            if member and member.user and member.user.check_password(password):
-                user = member.user
+        # 🔐 Username / email / phone → one indexed lookup
+        user = authenticate_identifier(identifier, password)
 
-        # 4️⃣ Staff phone login
-        if user is None:
-            staff = StaffProfile.objects.filter(phone=identifier).first()
-            if staff and staff.user and staff.user.check_password(password):
-                user = staff.user
-
-        # 5️⃣ Final Response
+        # Final Response
         if user:
             if not user.is_active:
                 return Response(
@@ -84,7 +65,7 @@ class LoginAPIView(APIView):
                 )
 
             # ✅ JWT TOKEN GENERATION (FIXED)
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
 
             # 🔥 Role Logic
             role = "member"
@@ -116,7 +97,8 @@ class LoginAPIView(APIView):
                 "email": user.email,
                 "role": role,
                 "redirect_to": redirect_to,
-                "group_setup_needed": group_setup_needed
+                "group_setup_needed": group_setup_needed,
+                "first_login": refresh[CLAIM]
             }, status=status.HTTP_200_OK)
 
         # ❌ Login failed
@@ -390,7 +372,7 @@ class CreateGroupAfterPaymentAPIView(APIView):
 
         del request.session['pending_group_data']
 
-        refresh = RefreshToken.for_user(admin_user)
+        refresh = tokens_for_user(admin_user)
         return Response({
             "detail":f"Group '{group.name}' created successfully",
             "access": str(refresh.access_token),
@@ -608,9 +590,14 @@ class FirstLoginChangePasswordAPIView(APIView):
 
         update_session_auth_hash(request, user)
 
-        member.is_first_login = False
-        member.save()
+        complete_first_login(request, member)
+
+        # 🔑 old tokens still carry first_login=true → hand out fresh ones
+        refresh = tokens_for_user(user)
 
         return Response({
-            "detail": "Password changed successfully."
+            "detail": "Password changed successfully.",
+            "access": str(refresh.access_token),
+            "refresh": str(refresh),
+            "first_login": False
         })
\ No newline at end of file
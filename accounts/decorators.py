@@ -21,7 +21,7 @@ def role_required(*allowed_roles):
 
                 # Redirect to own dashboard
                 if role == 'admin':
-                    return redirect('accounts:admin_dashboard')
+                    return redirect('adminpanel:dashboard')
                 elif role == 'collector':
                     return redirect('accounts:collector_dashboard')
                 elif role == 'group_admin':
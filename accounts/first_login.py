@@ -0,0 +1,52 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from members.models import Member
+
+
+# -----------------------------
+# 🔑 FIRST LOGIN FLAG
+# -----------------------------
+# Members must change the password they were given before using the app.
+# Member.is_first_login is the source of truth; a copy rides in the session
+# (web) and as a JWT claim (app) so requests don't have to look it up.
+SESSION_KEY = 'is_first_login'
+CLAIM = 'first_login'
+
+
+def is_first_login(user):
+    return Member.objects.filter(user=user, is_first_login=True).exists()
+
+
+def remember_first_login(request, user=None):
+    """Copy the flag into the session (call right after login())."""
+    value = is_first_login(user or request.user)
+    request.session[SESSION_KEY] = value
+    return value
+
+
+def session_first_login(request):
+    """Session copy of the flag; sessions that predate it are filled in once."""
+    value = request.session.get(SESSION_KEY)
+    if value is None:
+        value = remember_first_login(request)
+    return value
+
+
+def add_first_login_claim(token, user):
+    token[CLAIM] = is_first_login(user)
+    return token
+
+
+def tokens_for_user(user):
+    """RefreshToken (and its access token) carrying the first_login claim."""
+    return add_first_login_claim(RefreshToken.for_user(user), user)
+
+
+def complete_first_login(request, member):
+    """Password changed → clear the flag in the DB and the session copy."""
+    member.is_first_login = False
+    member.save(update_fields=['is_first_login'])
+
+    # JWT-only requests have no session copy to update
+    if SESSION_KEY in request.session:
+        request.session[SESSION_KEY] = False
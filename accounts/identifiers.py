@@ -0,0 +1,139 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import LoginIdentifier, StaffProfile
+from members.models import Member
+
+
+# -----------------------------
+# 🔐 LOGIN IDENTIFIER RESOLVER
+# -----------------------------
+# The login box takes a username, email or phone. Every account's
+# identifiers are kept normalized in LoginIdentifier, so an attempt is one
+# query on its (kind, value) unique index instead of up to four lookups.
+PHONE_NOISE = re.compile(r'[\s\-().]')
+
+
+def normalize_username(value):
+    return (value or '').strip()
+
+
+def normalize_email(value):
+    return (value or '').strip().lower()
+
+
+def normalize_phone(value):
+    return PHONE_NOISE.sub('', value or '')
+
+
+NORMALIZERS = {
+    LoginIdentifier.KIND_USERNAME: normalize_username,
+    LoginIdentifier.KIND_EMAIL: normalize_email,
+    LoginIdentifier.KIND_STAFF_PHONE: normalize_phone,
+    LoginIdentifier.KIND_MEMBER_PHONE: normalize_phone,
+}
+
+PHONE_KINDS = (LoginIdentifier.KIND_STAFF_PHONE, LoginIdentifier.KIND_MEMBER_PHONE)
+
+
+def find_login_user(identifier):
+    """User for a username / email / phone, or None (1 query)."""
+    if not identifier or not identifier.strip():
+        return None
+
+    match = Q(kind=LoginIdentifier.KIND_USERNAME, value=normalize_username(identifier))
+    match |= Q(kind=LoginIdentifier.KIND_EMAIL, value=normalize_email(identifier))
+
+    phone = normalize_phone(identifier)
+    if phone:
+        match |= Q(kind__in=PHONE_KINDS, value=phone)
+
+    row = (
+        LoginIdentifier.objects.filter(match)
+        .select_related('user')
+        .order_by('kind', 'id')
+        .first()
+    )
+    return row.user if row else None
+
+
+def authenticate_identifier(identifier, password):
+    """User if the identifier resolves and the password matches, else None."""
+    user = find_login_user(identifier)
+    if user and password and user.check_password(password):
+        return user
+    return None
+
+
+# -----------------------------
+# 🔁 SYNC
+# -----------------------------
+def sync_login_identifier(user_id, kind, raw_value):
+    """
+    Point ``kind`` of ``user_id`` at ``raw_value`` (empty → remove).
+    A value already held by another account is left with that account.
+    """
+    if not user_id:
+        return
+
+    value = NORMALIZERS[kind](raw_value)
+
+    with transaction.atomic():
+        LoginIdentifier.objects.filter(user_id=user_id, kind=kind).exclude(value=value).delete()
+
+        if value:
+            LoginIdentifier.objects.get_or_create(
+                kind=kind,
+                value=value,
+                defaults={'user_id': user_id}
+            )
+
+
+def clear_login_identifier(user_id, kind):
+    if user_id:
+        LoginIdentifier.objects.filter(user_id=user_id, kind=kind).delete()
+
+
+def expected_identifiers():
+    """{(kind, value): user_id} from User / StaffProfile / Member, first account wins."""
+    User = get_user_model()
+
+    sources = [
+        (LoginIdentifier.KIND_USERNAME, User.objects.values_list('id', 'username')),
+        (LoginIdentifier.KIND_EMAIL, User.objects.values_list('id', 'email')),
+        (LoginIdentifier.KIND_STAFF_PHONE, StaffProfile.objects.values_list('user_id', 'phone')),
+        (
+            LoginIdentifier.KIND_MEMBER_PHONE,
+            Member.objects.filter(user__isnull=False).values_list('user_id', 'phone'),
+        ),
+    ]
+
+    expected = {}
+    for kind, rows in sources:
+        normalize = NORMALIZERS[kind]
+        for user_id, raw_value in rows.order_by('id'):
+            value = normalize(raw_value)
+            if value:
+                expected.setdefault((kind, value), user_id)
+
+    return expected
+
+
+@transaction.atomic
+def rebuild_login_identifiers():
+    """Rewrite the lookup table from the source rows. Returns the number of rows written."""
+    expected = expected_identifiers()
+
+    LoginIdentifier.objects.all().delete()
+    LoginIdentifier.objects.bulk_create(
+        [
+            LoginIdentifier(kind=kind, value=value, user_id=user_id)
+            for (kind, value), user_id in expected.items()
+        ],
+        batch_size=500
+    )
+
+    return len(expected)
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.identifiers import rebuild_login_identifiers, expected_identifiers
+from accounts.models import LoginIdentifier
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the login identifier lookup table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare the table with users, staff and members, do not write",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("verify"):
+            expected = expected_identifiers()
+            stored = {
+                (kind, value): user_id
+                for kind, value, user_id in LoginIdentifier.objects.values_list('kind', 'value', 'user_id')
+            }
+
+            mismatches = [
+                (key, stored.get(key), expected.get(key))
+                for key in set(expected) | set(stored)
+                if stored.get(key) != expected.get(key)
+            ]
+
+            for (kind, value), have, want in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(f"kind={kind} value={value} stored={have} expected={want}")
+                )
+
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} login identifiers out of sync.")
+
+            self.stdout.write(self.style.SUCCESS("Login identifiers are in sync."))
+            return
+
+        count = rebuild_login_identifiers()
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} login identifiers rebuilt.")
+        )
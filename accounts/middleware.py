@@ -1,35 +1,36 @@
 # accounts/middleware.py
+from django.conf import settings
 from django.shortcuts import redirect
 from django.urls import reverse
-from members.models import Member
+
+from accounts.first_login import session_first_login
+
 
 class ForcePasswordChangeMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
-    def __call__(self, request):
-
-        # Not logged in → allow
-        if not request.user.is_authenticated:
-            return self.get_response(request)
-
-        # Allowed paths
-        allowed_paths = [
+        # Allowed paths (resolved once at startup)
+        self.allowed_paths = frozenset([
             reverse('accounts:login'),
             reverse('accounts:logout'),
             reverse('accounts:change_password'),
-        ]
+        ])
+        self.ignored_prefixes = tuple(
+            prefix for prefix in (settings.STATIC_URL, settings.MEDIA_URL) if prefix
+        )
+
+    def __call__(self, request):
 
-        if request.path in allowed_paths or request.path.startswith('/static/'):
+        # Not logged in → allow
+        if not request.user.is_authenticated:
             return self.get_response(request)
 
-        # Check member
-        member = Member.objects.filter(user=request.user).first()
-        if not member:
+        if request.path in self.allowed_paths or request.path.startswith(self.ignored_prefixes):
             return self.get_response(request)
 
-        # Force password change only once
-        if member.is_first_login:
+        # Force password change only once (flag kept in the session)
+        if session_first_login(request):
             return redirect('accounts:change_password')
 
         return self.get_response(request)
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:28
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_identifiers(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    StaffProfile = apps.get_model('accounts', 'StaffProfile')
+    Member = apps.get_model('members', 'Member')
+    LoginIdentifier = apps.get_model('accounts', 'LoginIdentifier')
+
+    def phone(value):
+        return re.sub(r'[\s\-().]', '', value or '')
+
+    sources = [
+        (1, User.objects.values_list('id', 'username'), lambda v: (v or '').strip()),
+        (2, User.objects.values_list('id', 'email'), lambda v: (v or '').strip().lower()),
+        (3, StaffProfile.objects.values_list('user_id', 'phone'), phone),
+        (4, Member.objects.filter(user__isnull=False).values_list('user_id', 'phone'), phone),
+    ]
+
+    rows = {}
+    for kind, values, normalize in sources:
+        for user_id, raw_value in values.order_by('id'):
+            value = normalize(raw_value)
+            if value:
+                rows.setdefault((kind, value), user_id)
+
+    LoginIdentifier.objects.bulk_create(
+        [LoginIdentifier(kind=kind, value=value, user_id=user_id) for (kind, value), user_id in rows.items()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_staffprofile_created_at'),
+        ('members', '0005_alter_member_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='staffprofile',
+            name='phone',
+            field=models.CharField(db_index=True, max_length=15),
+        ),
+        migrations.CreateModel(
+            name='LoginIdentifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Username'), (2, 'Email'), (3, 'Staff phone'), (4, 'Member phone')])),
+                ('value', models.CharField(max_length=254)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='login_identifiers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='unique_login_identifier')],
+            },
+        ),
+        migrations.RunPython(backfill_identifiers, migrations.RunPython.noop),
+    ]
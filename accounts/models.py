@@ -20,7 +20,7 @@ class StaffProfile(models.Model):
         blank=True
     )
 
-    phone = models.CharField(max_length=15)
+    phone = models.CharField(max_length=15, db_index=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
 
     is_blocked = models.BooleanField(default=False)
@@ -45,3 +45,38 @@ class StaffProfile(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.role}"
+
+
+class LoginIdentifier(models.Model):
+    """
+    Normalized username / email / phone → user, so a login is resolved with
+    one indexed query (kept in sync by accounts.signals).
+    When two accounts share a value the lower kind wins, then the first saved.
+    """
+    KIND_USERNAME = 1
+    KIND_EMAIL = 2
+    KIND_STAFF_PHONE = 3
+    KIND_MEMBER_PHONE = 4
+
+    KIND_CHOICES = (
+        (KIND_USERNAME, 'Username'),
+        (KIND_EMAIL, 'Email'),
+        (KIND_STAFF_PHONE, 'Staff phone'),
+        (KIND_MEMBER_PHONE, 'Member phone'),
+    )
+
+    kind = models.PositiveSmallIntegerField(choices=KIND_CHOICES)
+    value = models.CharField(max_length=254)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='login_identifiers'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='unique_login_identifier'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.value}"
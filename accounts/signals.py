@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.identifiers import sync_login_identifier, clear_login_identifier
+from accounts.models import LoginIdentifier, StaffProfile
+from members.models import Member
+
+User = get_user_model()
+
+
+# -----------------------------
+# 🔐 KEEP LOGIN IDENTIFIERS IN SYNC
+# -----------------------------
+@receiver(post_save, sender=User)
+def user_identifiers_changed(sender, instance, update_fields=None, **kwargs):
+    # last_login etc. → nothing to do (runs on every login)
+    if update_fields is not None and not {'username', 'email'} & set(update_fields):
+        return
+
+    sync_login_identifier(instance.id, LoginIdentifier.KIND_USERNAME, instance.username)
+    sync_login_identifier(instance.id, LoginIdentifier.KIND_EMAIL, instance.email)
+
+
+@receiver(post_save, sender=StaffProfile)
+def staff_phone_changed(sender, instance, **kwargs):
+    sync_login_identifier(instance.user_id, LoginIdentifier.KIND_STAFF_PHONE, instance.phone)
+
+
+@receiver(post_delete, sender=StaffProfile)
+def staff_profile_deleted(sender, instance, **kwargs):
+    clear_login_identifier(instance.user_id, LoginIdentifier.KIND_STAFF_PHONE)
+
+
+@receiver(post_save, sender=Member)
+def member_phone_changed(sender, instance, **kwargs):
+    sync_login_identifier(instance.user_id, LoginIdentifier.KIND_MEMBER_PHONE, instance.phone)
+
+
+@receiver(post_delete, sender=Member)
+def member_deleted(sender, instance, **kwargs):
+    clear_login_identifier(instance.user_id, LoginIdentifier.KIND_MEMBER_PHONE)
@@ -19,6 +19,8 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.db.models import Sum
 from accounts.decorators import admin_required, collector_required,group_admin_required, member_required
+from accounts.first_login import remember_first_login, complete_first_login
+from accounts.identifiers import authenticate_identifier
 from subscriptions.models import GroupSubscription, SubscriptionPlan
 from .models import StaffProfile
 from accounts.decorators import admin_required
@@ -39,7 +41,8 @@ from django.contrib.auth.models import User
 from django.core.mail import send_mail
 from django.conf import settings
 from django.db import transaction
-from payments.models import Payment
+from payments.models import Payment, MemberBalance
+from chitti.dashboard import get_owner_summary
 from django.utils.crypto import get_random_string
 
 import random
@@ -463,37 +466,18 @@ def login_view(request):
     if request.method == 'POST':
         identifier = request.POST.get('identifier')
         password = request.POST.get('password')
-        user = None
-
-        # 1️⃣ Authenticate by standard username
-        user = authenticate(request, username=identifier, password=password)
+        # 🔐 Username / email / phone → one indexed lookup
+        user = authenticate_identifier(identifier, password)
 
-        # 2️⃣ Authenticate by email
-        if user is None:
-            u = User.objects.filter(email=identifier).first()
-            if u and u.check_password(password):
-                user = u
-
-        # 3️⃣ Authenticate member by phone
-        if user is None:
-            member = Member.objects.filter(phone=identifier).first()
-            if member and member.user and member.user.check_password(password):
-                user = member.user
-
-        # 4️⃣ Authenticate staff by phone
-        if user is None:
-            staff = StaffProfile.objects.filter(phone=identifier).first()
-            if staff and staff.user and staff.user.check_password(password):
-                user = staff.user
-
-        # 5️⃣ Final Login & Redirects
+        # Final Login & Redirects
         if user:
             # Check if account is active
             if not user.is_active:
                 messages.error(request, "Access denied. Your account has been disabled.")
                 return redirect('accounts:login')
 
-            login(request, user)
+            login(request, user, backend='accounts.backends.PhoneOrEmailBackend')
+            remember_first_login(request, user)
 
             # --- STAFF REDIRECTS ---
             if hasattr(user, 'staffprofile'):
@@ -550,8 +534,7 @@ def change_password(request):
             # ✅ KEEP SESSION
             update_session_auth_hash(request, user)
 
-            member.is_first_login = False
-            member.save()
+            complete_first_login(request, member)
 
             messages.success(request, "Password changed successfully")
             return redirect('members:member_dashboard')
@@ -662,37 +645,18 @@ def group_admin_dashboard(request):
     today = timezone.now().date()
     user = request.user
 
-    # ================= Groups =================
-    groups = ChittiGroup.objects.filter(owner=user)
-    total_groups = groups.count()
-    active_groups = groups.filter(is_active=True).count()
-
-    # ================= Members =================
-    total_members = ChittiMember.objects.filter(group__owner=user).count()
-
-    # ================= This Month Collection =================
-    month_start = today.replace(day=1)
-    this_month_collection = Payment.objects.filter(
-        group__owner=user,
-        payment_status='success',
-        received_by_admin=True,
-        paid_date__gte=month_start
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    # ================= Summary (cached per owner) =================
+    summary = get_owner_summary(user)
 
-    # ================= Total Collected =================
-    total_received = Payment.objects.filter(
-        group__owner=user,
-        payment_status='success',
-        received_by_admin=True
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    groups = ChittiGroup.objects.filter(owner=user).select_related('collector__user')
 
     # ================= Context =================
     context = {
-        'total_groups': total_groups,
-        'active_groups': active_groups,
-        'total_members': total_members,
-        'this_month_collection': this_month_collection,
-        'total_received': total_received,
+        'total_groups': summary['total_groups'],
+        'active_groups': summary['active_groups'],
+        'total_members': summary['total_members'],
+        'this_month_collection': summary['this_month_collection'],
+        'total_received': summary['total_received'],
         'groups': groups,
     }
 
@@ -742,10 +706,11 @@ def collector_dashboard(request):
         ~Q(payment_method='cash') | Q(received_by_admin=True)
     ).aggregate(total=Sum('amount'))['total'] or 0
 
-    # Active members
-    active_members = Member.objects.filter(
-        collections__collected_by=collector
-    ).distinct().count()
+    # Active members (ledger → no join over payments)
+    active_members = MemberBalance.objects.filter(
+        group__collector=collector,
+        total_paid__gt=0
+    ).values('member').distinct().count()
 
     context = {
         'today_collection': today_collection,
@@ -855,8 +820,7 @@ def create_group_view(request):
                         if d_val:
                             base_dates.append(datetime.strptime(d_val, '%Y-%m-%d').date())
 
-                    # 👉 call multi create
-                    new_group.create_auctions_multi(base_dates)
+                    new_group.create_auctions(base_dates=base_dates)
 
                 # =========================
                 # 🔥 PROFILE UPDATE
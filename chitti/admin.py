@@ -1,10 +1,10 @@
-import random
 from datetime import date
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import path, reverse
 from django.shortcuts import get_object_or_404, render
-from .models import ChittiGroup, ChittiMember, Auction
+from .models import ChittiGroup, ChittiMember, Auction, AuctionSettlement
+from .auctions import eligible_members as eligible_pool, pick_eligible_member
 
 @admin.register(ChittiGroup)
 class ChittiGroupAdmin(admin.ModelAdmin):
@@ -16,7 +16,7 @@ class ChittiGroupAdmin(admin.ModelAdmin):
     fields = (
         'name', 'phone', 'email', 'owner', 'parent_group', 
         'monthly_amount', 'duration_months', 'auction_type', 
-        'auctions_per_month', 'auction_interval_months', 
+        'auctions_per_month', 'auction_interval_months', 'foreman_commission_percent',
         'start_date', 'collector', 'is_active', 'total_amount', 'code'
     )
 
@@ -36,19 +36,13 @@ class ChittiGroupAdmin(admin.ModelAdmin):
     def spin_view(self, request, group_id):
         group = get_object_or_404(ChittiGroup, id=group_id)
         
-        # Get members who haven't won yet
-        past_winners_ids = Auction.objects.filter(
-            group=group, 
-            winner__isnull=False
-        ).values_list('winner_id', flat=True)
-        
-        eligible_members = ChittiMember.objects.filter(group=group).exclude(id__in=past_winners_ids)
-        
         winner = None
 
-        if request.method == "POST" and eligible_members.exists():
-            winner = random.choice(eligible_members)
+        if request.method == "POST":
+            # Random member who hasn't won yet
+            winner = pick_eligible_member(group)
 
+        if winner is not None:
             # Find the first empty pre-generated Auction slot
             current_slot = Auction.objects.filter(
                 group=group, 
@@ -56,18 +50,19 @@ class ChittiGroupAdmin(admin.ModelAdmin):
             ).order_by('month_no', 'auction_no').first()
 
             if current_slot:
-                current_slot.winner = winner
                 current_slot.auction_date = date.today()
-                current_slot.save()
             else:
-                Auction.objects.create(
+                current_slot = Auction.objects.create(
                     group=group,
                     month_no=group.current_month,
-                    auction_date=date.today(),
-                    winner=winner,
-                    bid_amount=0
+                    auction_date=date.today()
                 )
 
+            current_slot.assign_winner(winner, bid_amount=0)
+
+        # Get members who haven't won yet
+        eligible_members = eligible_pool(group)
+
         return render(request, "admin/chitti_spin.html", {
             "group": group,
             "members": eligible_members,
@@ -77,11 +72,17 @@ class ChittiGroupAdmin(admin.ModelAdmin):
 @admin.register(ChittiMember)
 class ChittiMemberAdmin(admin.ModelAdmin):
     # REMOVED 'is_active' to fix admin.E108 and admin.E116 errors
-    list_display = ('member', 'group', 'token_no')
-    list_filter = ('group',)
+    list_display = ('member', 'group', 'token_no', 'is_eligible')
+    list_filter = ('group', 'is_eligible')
+    readonly_fields = ('is_eligible', 'won_at_auction')
 
 @admin.register(Auction)
 class AuctionAdmin(admin.ModelAdmin):
     list_display = ('group', 'month_no', 'auction_no', 'winner', 'auction_date', 'bid_amount')
     list_filter = ('group', 'month_no')
-    readonly_fields = ('month_no', 'auction_no')
\ No newline at end of file
+    readonly_fields = ('month_no', 'auction_no')
+@admin.register(AuctionSettlement)
+class AuctionSettlementAdmin(admin.ModelAdmin):
+    list_display = ('auction', 'group', 'month_no', 'pot_amount', 'discount', 'dividend_per_member', 'net_payout')
+    list_filter = ('group',)
+    readonly_fields = [f.name for f in AuctionSettlement._meta.fields]
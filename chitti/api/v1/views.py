@@ -16,9 +16,14 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth.models import User
-import random
 from accounts.models import StaffProfile
 from chitti.models import Auction, ChittiGroup, ChittiMember
+from chitti.dashboard import get_owner_summary
+from chitti.snapshot import get_group_snapshot
+from chitti.auctions import (
+    schedule_signature, auction_month_grid,
+    eligible_members, pick_eligible_member, assign_winners
+)
 from payments.models import Payment
 from subscriptions.models import GroupSubscription, SubscriptionPlan
 from subscriptions.utils import (
@@ -165,16 +170,9 @@ class CreateGroupAPIView(APIView):
         )
 
         # =========================
-        # 🔥 FIXED AUCTION CREATION (IMPORTANT)
+        # 🔥 AUCTION SCHEDULE (one bulk insert)
         # =========================
-        base_dates = []
-        current_date = auction_start_date
-
-        for month in range(1, duration_months + 1):
-            base_dates.append(current_date)
-            current_date = current_date + relativedelta(months=1)
-
-        group.create_auctions(base_dates=base_dates)
+        group.create_auctions(base_dates=[auction_start_date])
 
         # =========================
         # 🔥 UPDATE PROFILE
@@ -239,16 +237,18 @@ class GroupAdminProfileAPIView(APIView):
             role="group_admin"
         )
 
-        # Groups under this admin
-        groups = ChittiGroup.objects.filter(owner=user).annotate(
-            members_count=Count("chitti_members")
-        )
+        # Groups under this admin (cached summary)
+        summary = get_owner_summary(user)
 
-        groups_count = groups.count()
-        total_members_count = sum(g.members_count for g in groups)
+        groups_count = summary["total_groups"]
+        total_members_count = summary["total_members"]
 
         # Main group for subscription
-        main_group = groups.filter(parent_group__isnull=True).first()
+        main_group_id = next(
+            (g["id"] for g in summary["groups"] if g["parent_group_id"] is None),
+            None
+        )
+        main_group = ChittiGroup.objects.filter(id=main_group_id).first() if main_group_id else None
 
         effective_sub = None
         subscription_status = {
@@ -317,82 +317,39 @@ class GroupAdminDashboardAPIView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # ================= BASE QUERYSETS =================
-        groups = ChittiGroup.objects.filter(owner=user)
-        payments = Payment.objects.filter(
-            group__owner=user,
-            payment_status="success"
-        )
-
-        # ================= GROUPS =================
-        total_groups = groups.count()
-        active_groups = groups.filter(is_active=True).count()
-
-        # ================= MEMBERS =================
-        total_members = ChittiMember.objects.filter(
-            group__owner=user
-        ).count()
-
-        # ================= THIS MONTH COLLECTION =================
-        month_start = today.replace(day=1)
-
-        this_month_collection = payments.filter(
-            received_by_admin=True,   # ✅ IMPORTANT FIX
-            paid_date__gte=month_start
-        ).aggregate(total=Sum("amount"))["total"] or 0
-
-        # ================= TOTAL RECEIVED =================
-        total_received = payments.filter(
-            received_by_admin=True   # ✅ IMPORTANT FIX
-        ).aggregate(total=Sum("amount"))["total"] or 0
-
-        # ================= EXTRA (BONUS) =================
-        pending_admin_approval = payments.filter(
-            received_by_admin=False
-        ).aggregate(total=Sum("amount"))["total"] or 0
-
-        total_expected = groups.aggregate(
-            total=Sum("total_amount")
-        )["total"] or 0
-
-        collection_percentage = 0
-        if total_expected > 0:
-            collection_percentage = round((total_received / total_expected) * 100, 2)
+        # ================= SUMMARY (cached per owner) =================
+        summary = get_owner_summary(user)
 
         # ================= RESPONSE =================
         data = {
             "stats": {
-                "total_groups": total_groups,
-                "active_groups": active_groups,
-                "total_members": total_members,
-                "this_month_collection": float(this_month_collection),
-                "total_received": float(total_received),
+                "total_groups": summary["total_groups"],
+                "active_groups": summary["active_groups"],
+                "total_members": summary["total_members"],
+                "this_month_collection": float(summary["this_month_collection"]),
+                "total_received": float(summary["total_received"]),
 
                 # 🔥 BONUS
-                "pending_admin_approval": float(pending_admin_approval),
-                "total_expected": float(total_expected),
-                "collection_percentage": collection_percentage,
+                "pending_admin_approval": float(summary["pending_admin_approval"]),
+                "total_expected": float(summary["total_expected"]),
+                "collection_percentage": summary["collection_percentage"],
             },
             "groups": [
                 {
-                    "id": g.id,
-                    "name": g.name,
-                    "code": g.code,
-                    "is_active": g.is_active,
-                    "total_members": g.total_members,
-                    "monthly_amount": float(g.monthly_amount),
-                    "duration_months": g.duration_months,
-                    "total_amount": float(g.total_amount),
-
-                    "start_date": g.start_date.strftime("%Y-%m-%d") if g.start_date else None,
-
-                    "collector_name": (
-                        g.collector.user.username
-                        if g.collector and hasattr(g.collector, "user")
-                        else "Not Assigned"
-                    ),
+                    "id": g["id"],
+                    "name": g["name"],
+                    "code": g["code"],
+                    "is_active": g["is_active"],
+                    "total_members": g["total_members"],
+                    "monthly_amount": float(g["monthly_amount"]),
+                    "duration_months": g["duration_months"],
+                    "total_amount": float(g["total_amount"]),
+
+                    "start_date": g["start_date"].strftime("%Y-%m-%d") if g["start_date"] else None,
+
+                    "collector_name": g["collector_name"],
                 }
-                for g in groups
+                for g in summary["groups"]
             ]
         }
 
@@ -599,11 +556,8 @@ class AdminGroupCreateAPIView(APIView):
                 start_date=start_date
             )
 
-            # 🔥 SAFE CALL (IMPORTANT FIX)
-            if hasattr(group, "create_auctions"):
-                group.create_auctions(base_dates=base_dates)
-            else:
-                raise Exception("create_auctions method missing in model")
+            # 🔥 AUCTION SCHEDULE (one bulk insert)
+            group.create_auctions(base_dates=base_dates)
 
             return group
 
@@ -667,43 +621,21 @@ class GroupDetailAPIView(APIView):
             owner=request.user
         )
 
-        # 2️⃣ Members & Auctions
-        members = group.chitti_members.select_related("member").all()
-        total_members = members.count()
-
-        auctions = group.auctions.select_related('winner').all().order_by('month_no', 'auction_no')
-
-        # 3️⃣ Financial Tracking
-        payments = Payment.objects.filter(
-            group=group,
-            payment_status='success'
-        )
-
-        total_collected = payments.filter(
-            received_by_admin=True
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        pending_total = payments.filter(
-            received_by_admin=False
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        # 4️⃣ Pot Logic
-        monthly_pot = group.monthly_amount * total_members
-
-        # 5️⃣ Progress Tracking
-        completed_auctions = auctions.filter(winner__isnull=False)
-        completed_count = completed_auctions.count()
+        # 2️⃣ Members & Auctions (settlement joined in)
+        members = group.chitti_members.select_related("member").prefetch_related("payments")
 
-        completed_months = completed_auctions.values('month_no').distinct().count()
+        auctions = group.auctions.select_related(
+            'winner__member', 'settlement'
+        ).order_by('month_no', 'auction_no')
 
-        current_month = completed_months + 1
-        remaining_months = max(0, (group.duration_months or 0) - completed_months)
+        # 3️⃣ Figures (cached snapshot, shared with the web view)
+        snapshot = get_group_snapshot(group)
+        monthly_pot = snapshot['monthly_pot']
 
-        # 6️⃣ Prize Calculation
+        # 4️⃣ Prize (settled figures, frozen at winner assignment)
         auction_list = []
         for auction in auctions:
-            discount = auction.bid_amount or 0
-            prize = monthly_pot - discount
+            settled = getattr(auction, 'settlement', None)
 
             auction_list.append({
                 "id": auction.id,
@@ -712,36 +644,17 @@ class GroupDetailAPIView(APIView):
                 "auction_date": auction.auction_date,
                 "winner": auction.winner.member.name if auction.winner else None,
                 "bid_amount": auction.bid_amount,
-                "prize": prize
+                "prize": settled.net_payout if settled else monthly_pot - (auction.bid_amount or 0),
+                "settlement": {
+                    "pot_amount": settled.pot_amount,
+                    "discount": settled.discount,
+                    "foreman_commission": settled.foreman_commission,
+                    "dividend_per_member": settled.dividend_per_member,
+                    "net_payout": settled.net_payout,
+                    "member_count": settled.member_count,
+                } if settled else None
             })
 
-        # 7️⃣ Last Auction
-        last_auction = completed_auctions.order_by('auction_date').last()
-
-        last_winner = last_auction.winner.member.name if last_auction and last_auction.winner else None
-        last_discount = last_auction.bid_amount if last_auction else 0
-        last_prize = (monthly_pot - last_discount) if last_auction else 0
-
-        # 8️⃣ Date Logic
-        base_date = group.registration_start_date or group.start_date
-
-        end_date = None
-        is_expired = False
-
-        if base_date and group.duration_months:
-            end_date = base_date + relativedelta(
-                months=group.duration_months
-            ) - relativedelta(days=1)
-
-            is_expired = date.today() > end_date
-
-        # 9️⃣ Efficiency
-        expected_total = group.monthly_amount * total_members * completed_months
-
-        efficiency = 0
-        if expected_total > 0:
-            efficiency = (total_collected / expected_total) * 100
-
         # 🔟 FINAL RESPONSE
         return Response({
 
@@ -755,23 +668,24 @@ class GroupDetailAPIView(APIView):
                 "start_date": group.start_date,
                 "registration_start_date": group.registration_start_date,
 
-                "end_date": end_date,
-                "is_expired": is_expired,
+                "end_date": snapshot['end_date'],
+                "is_expired": snapshot['is_expired'],
 
                 # 🔥 extra
-                "total_members": total_members,
+                "total_members": snapshot['total_members'],
                 "monthly_pot": monthly_pot,
-                "current_month": current_month,
-                "completed_months": completed_months,
-                "remaining_months": remaining_months,
-
-                "total_collected": total_collected,
-                "pending_total": pending_total,
-                "collection_efficiency": round(efficiency, 1),
-
-                "last_winner": last_winner,
-                "last_prize": last_prize,
-                "last_discount": last_discount
+                "current_month": snapshot['current_month'],
+                "completed_months": snapshot['completed_months'],
+                "remaining_months": snapshot['remaining_months'],
+
+                "total_collected": snapshot['total_collected'],
+                "pending_total": snapshot['pending_total'],
+                "collection_efficiency": snapshot['collection_efficiency'],
+
+                "last_winner": snapshot['last_winner_name'],
+                "last_prize": snapshot['last_prize'],
+                "last_discount": snapshot['last_discount'],
+                "next_installment": snapshot['next_installment']
             },
 
             # 🔹 MEMBERS
@@ -812,7 +726,14 @@ class EditGroupAPIView(APIView):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            schedule_before = schedule_signature(group)
+            start_before = group.start_date
+            group = serializer.save()
+
+            # 🔨 dates / duration / mode changed → upsert only what moved
+            if schedule_signature(group) != schedule_before:
+                group.create_auctions(previous_start=start_before)
+
             return Response({
                 "message": "Group updated successfully",
                 "total_amount": serializer.data["total_amount"]
@@ -1011,16 +932,12 @@ class AuctionListGroupAPIView(APIView):
             owner=request.user
         )
 
-        months = []
-
-        for i in range(1, group.duration_months + 1):
-
-            month_auctions = group.auctions.filter(
-                month_no=i
-            ).order_by("auction_no")
-
-            months.append({
-                "month_no": i,
+        # 🗓️ all months from one query
+        months = [
+            {
+                "month_no": m["month_no"],
+                "is_auction_month": m["is_auction_month"],
+                "auto_date": m["auto_date"],
                 "auctions": [
                     {
                         "id": a.id,
@@ -1029,9 +946,11 @@ class AuctionListGroupAPIView(APIView):
                         "is_closed": a.is_closed,
                         "winner": a.winner.member.name if a.winner else None
                     }
-                    for a in month_auctions
+                    for a in m["auctions"]
                 ]
-            })
+            }
+            for m in auction_month_grid(group)
+        ]
 
         return Response({
             "group": {
@@ -1148,13 +1067,7 @@ class AuctionSpinAPIView(APIView):
         if auction.is_closed:
             return Response({"error": "Auction completed"}, status=400)
 
-        all_members = ChittiMember.objects.filter(group=auction.group)
-
-        previous_winners = auction.group.auctions.exclude(
-            winner__isnull=True
-        ).values_list("winner_id", flat=True)
-
-        eligible = all_members.exclude(id__in=previous_winners)
+        eligible = eligible_members(auction.group_id)
 
         if not eligible.exists():
             return Response({"error": "No members left"}, status=400)
@@ -1193,20 +1106,15 @@ class AssignWinnerAPIView(APIView):
                 status=400
             )
 
-        members = ChittiMember.objects.filter(group=auction.group)
-
-        previous = auction.group.auctions.exclude(
-            winner__isnull=True
-        ).values_list("winner_id", flat=True)
+        winner = pick_eligible_member(auction.group_id)
 
-        eligible = members.exclude(id__in=previous)
-
-        if not eligible.exists():
+        if winner is None:
             return Response({"error": "No eligible members"}, status=400)
 
-        winner = random.choice(list(eligible))
-
-        auction.assign_winner(winner, bid_amount=0)
+        try:
+            auction.assign_winner(winner, bid_amount=0)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
         return Response({
             "message": "Winner assigned",
@@ -1264,86 +1172,14 @@ class AssignAllWinnersAPIView(APIView):
         if not winners_list:
             return Response({"error": "No winner data received"}, status=400)
 
-        try:
-            # 🔥 Already winners (global)
-            existing_winners = set(
-                Auction.objects.filter(
-                    group=group,
-                    winner__isnull=False
-                ).values_list('winner_id', flat=True)
-            )
+        # 🔥 Validate + assign all winners at once (future months only)
+        ok, results = assign_winners(group, winners_list, after_last_winner=True)
 
-            # 🔥 Last completed month
-            last_month = Auction.objects.filter(
-                group=group,
-                winner__isnull=False
-            ).aggregate(Max('month_no'))['month_no__max'] or 0
-
-            for item in winners_list:
-                month_no = int(item.get("month"))
-                member_id = item.get("id")
-
-                # ❌ Restrict past months
-                if month_no <= last_month:
-                    return Response({
-                        "error": f"You can only add winners after month {last_month}"
-                    }, status=400)
-
-                # ❌ Already winner check (global)
-                if member_id in existing_winners:
-                    return Response({
-                        "error": f"Member {member_id} already won"
-                    }, status=400)
-
-                winner_member = ChittiMember.objects.get(
-                    id=member_id,
-                    group=group
-                )
-
-                # 🔥 Get all auctions in that month
-                monthly_auctions = group.auctions.filter(
-                    month_no=month_no
-                ).order_by("auction_no")
-
-                # ❌ Same month duplicate check
-                if monthly_auctions.filter(winner=winner_member).exists():
-                    return Response({
-                        "error": f"Member already selected in month {month_no}"
-                    }, status=400)
-
-                # 🔥 Decide auction slot
-                if monthly_auctions.exists():
-                    next_auction_no = monthly_auctions.count() + 1
-                else:
-                    next_auction_no = 1
-
-                # 🔥 Create auction always (multi-slot support)
-                auction_date = group.start_date + relativedelta(months=month_no - 1)
-
-                auction = Auction.objects.create(
-                    group=group,
-                    month_no=month_no,
-                    auction_no=next_auction_no,
-                    auction_date=auction_date,
-                    selection_type="manual"
-                )
-
-                # 🔥 Assign winner
-                auction.assign_winner(winner_member, bid_amount=0)
-
-                # 🔥 Add to used list
-                existing_winners.add(member_id)
-
-            return Response({"success": True})
-
-        except ChittiMember.DoesNotExist:
-            return Response({"error": "Member not found"}, status=404)
+        if not ok:
+            error = next(r['error'] for r in results if r['error'])
+            return Response({"error": error, "results": results}, status=400)
 
-        except ValueError as e:
-            return Response({"error": str(e)}, status=400)
-
-        except Exception as e:
-            return Response({"error": f"Unexpected error: {str(e)}"}, status=500)
+        return Response({"success": True, "results": results})
 
 
 class EditAuctionDatesAPIView(APIView):
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ChittiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chitti'
+
+    def ready(self):
+        import chitti.signals  # noqa
@@ -0,0 +1,393 @@
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.utils import timezone
+
+from chitti.settlements import settle_auctions
+
+
+# =========================
+# 🔨 AUCTION SCHEDULE GENERATOR
+# =========================
+# A group's auctions are planned as (month_no, auction_no, auction_date):
+#   - monthly mode: every month of the duration
+#   - interval mode: months 1, 1+k, 1+2k, ... (k = auction_interval_months)
+# with ``auctions_per_month`` slots in each auction month. ``base_dates``
+# are the first-month dates of the slots; later months are the same day
+# n months on (relativedelta clamps 31st → end of shorter months).
+def auction_months(group):
+    duration = int(group.duration_months or 0)
+
+    if group.auction_type == "interval":
+        step = int(group.auction_interval_months or 0)
+        if step <= 0:
+            return []
+        return list(range(1, duration + 1, step))
+
+    return list(range(1, duration + 1))
+
+
+def auction_slots(group):
+    """[(month_no, auction_no)] for the group's mode."""
+    per_month = max(int(group.auctions_per_month or 1), 1)
+    return [
+        (month_no, auction_no)
+        for month_no in auction_months(group)
+        for auction_no in range(1, per_month + 1)
+    ]
+
+
+def default_base_dates(group, existing=None, previous_start=None):
+    """
+    First-month slot dates when none are given (re-sync after an edit).
+    Slot 1 keeps its day offset from the month's start in the existing
+    schedule (``previous_start`` = start_date before the edit), so custom
+    creation dates survive a duration change and move with a new start
+    date; other slots keep their day offset from slot 1. Offsets are
+    measured in the first month where the slots are still open; with no
+    open auction a slot falls back to start_date.
+    """
+    per_month = max(int(group.auctions_per_month or 1), 1)
+    existing = existing or {}
+    previous_start = previous_start or group.start_date
+    months = sorted({m for m, _ in existing})
+
+    base = group.start_date
+    for month_no in months:
+        anchor = existing.get((month_no, 1))
+        if anchor and anchor.winner_id is None:
+            base += anchor.auction_date - (previous_start + relativedelta(months=month_no - 1))
+            break
+
+    dates = [base]
+    for auction_no in range(2, per_month + 1):
+        offset = None
+
+        for month_no in months:
+            anchor = existing.get((month_no, 1))
+            row = existing.get((month_no, auction_no))
+            if anchor and row and anchor.winner_id is None and row.winner_id is None:
+                offset = row.auction_date - anchor.auction_date
+                break
+
+        dates.append(base + offset if offset is not None else base)
+
+    return dates
+
+
+def build_auction_plan(group, base_dates=None):
+    """{(month_no, auction_no): auction_date} for the whole duration."""
+    base_dates = list(base_dates or []) or [group.start_date]
+
+    plan = {}
+    for month_no, auction_no in auction_slots(group):
+        # fewer dates than slots → extra slots share the last date
+        base = base_dates[min(auction_no, len(base_dates)) - 1]
+        plan[(month_no, auction_no)] = base + relativedelta(months=month_no - 1)
+
+    return plan
+
+
+@transaction.atomic
+def sync_auctions(group, base_dates=None, previous_start=None):
+    """
+    Bring the group's Auction rows in line with its plan: missing slots are
+    bulk-created, open auctions with a changed date are bulk-updated, open
+    auctions outside the plan are removed. Auctions that already have a
+    winner are never touched.
+    Returns (created, updated, deleted).
+    """
+    from chitti.models import Auction
+
+    existing = {
+        (a.month_no, a.auction_no): a
+        for a in Auction.objects.select_for_update().filter(group=group)
+    }
+
+    if not base_dates:
+        base_dates = default_base_dates(group, existing, previous_start)
+
+    plan = build_auction_plan(group, base_dates)
+
+    to_create = []
+    to_update = []
+
+    for key, auction_date in plan.items():
+        auction = existing.get(key)
+
+        if auction is None:
+            to_create.append(Auction(
+                group=group,
+                month_no=key[0],
+                auction_no=key[1],
+                auction_date=auction_date
+            ))
+        elif auction.winner_id is None and auction.auction_date != auction_date:
+            auction.auction_date = auction_date
+            to_update.append(auction)
+
+    stale = [
+        auction.id for key, auction in existing.items()
+        if key not in plan and auction.winner_id is None
+    ]
+
+    if stale:
+        Auction.objects.filter(id__in=stale).delete()
+
+    Auction.objects.bulk_update(to_update, ['auction_date'], batch_size=500)
+    Auction.objects.bulk_create(to_create, batch_size=500)
+
+    return len(to_create), len(to_update), len(stale)
+
+
+SCHEDULE_FIELDS = (
+    'start_date',
+    'duration_months',
+    'auction_type',
+    'auctions_per_month',
+    'auction_interval_months',
+)
+
+
+def schedule_signature(group):
+    """Fields the auction plan depends on (compare before/after an edit)."""
+    return tuple(getattr(group, field) for field in SCHEDULE_FIELDS)
+
+
+# =========================
+# 🗓️ AUCTION MONTH GRID
+# =========================
+def auction_month_grid(group):
+    """
+    One row per month of the group, from a single query:
+        {'month_no', 'month_date', 'is_auction_month', 'auctions', 'auto_date'}
+    ``auctions`` is ordered by auction_no; ``auto_date`` (suggested date) is
+    only set for auction months that have no auction yet.
+    """
+    from chitti.models import Auction
+
+    buckets = {}
+    for auction in (
+        Auction.objects.filter(group=group)
+        .select_related('winner__member')
+        .order_by('month_no', 'auction_no')
+    ):
+        buckets.setdefault(auction.month_no, []).append(auction)
+
+    auction_month_set = set(auction_months(group))
+    months = []
+
+    for month_no in range(1, int(group.duration_months or 0) + 1):
+        month_date = group.start_date + relativedelta(months=month_no - 1)
+        auctions = buckets.get(month_no, [])
+        is_auction_month = month_no in auction_month_set
+
+        months.append({
+            'month_no': month_no,
+            'month_date': month_date,
+            'is_auction_month': is_auction_month,
+            'auctions': auctions,
+            'auto_date': month_date if is_auction_month and not auctions else None,
+        })
+
+    return months
+
+
+# =========================
+# 🎡 ELIGIBLE-WINNER POOL
+# =========================
+# ChittiMember.is_eligible is cleared by Auction.assign_winner (and set
+# again when the winning auction goes away, chitti.signals), so the pool
+# is a filtered read on the chitti_member_eligible partial index instead
+# of "all members minus everyone who won".
+def eligible_members(group):
+    """Members of ``group`` (ChittiGroup or id) who have not won yet."""
+    from chitti.models import ChittiMember
+
+    group_id = getattr(group, 'pk', group)
+
+    return ChittiMember.objects.filter(
+        group_id=group_id,
+        is_eligible=True
+    ).select_related('member')
+
+
+def pick_eligible_member(group):
+    """
+    Random member from the pool, or None when everyone has won. One
+    query: the partial index yields the group's pool (at most its member
+    count) and ORDER BY random() LIMIT 1 picks from it.
+    """
+    return eligible_members(group).order_by('?').first()
+
+
+# =========================
+# 🏆 BATCH WINNER ASSIGNMENT
+# =========================
+@transaction.atomic
+def assign_winners(group, items, selection_type='manual', after_last_winner=False):
+    """
+    Assign many winners in one go. ``items`` are {'month': n, 'id': chitti_member_id}.
+
+    The group's auctions and the submitted members are locked and loaded
+    once; each member takes the first open auction of its month, or a new
+    slot when the month has none. Everything is validated before anything
+    is written, so one bad item saves nothing.
+    ``after_last_winner`` rejects months up to the latest month with a winner.
+
+    Returns (ok, results); results follow ``items`` order with
+    {'month', 'id', 'auction_id', 'auction_no', 'error'}.
+    """
+    from chitti.models import Auction, ChittiMember
+
+    items = [item if isinstance(item, dict) else {} for item in items]
+
+    auctions = list(
+        group.auctions.select_for_update().order_by('month_no', 'auction_no')
+    )
+
+    by_month = {}
+    for auction in auctions:
+        by_month.setdefault(auction.month_no, []).append(auction)
+
+    last_month = max((a.month_no for a in auctions if a.winner_id), default=0)
+
+    member_ids = set()
+    for item in items:
+        try:
+            member_ids.add(int(item.get('id')))
+        except (TypeError, ValueError):
+            pass
+
+    members = ChittiMember.objects.select_for_update().filter(
+        group=group,
+        id__in=member_ids
+    ).in_bulk()
+
+    duration = int(group.duration_months or 0)
+    taken = set()
+    results = []
+    plan = []     # (result, auction, member)
+
+    for item in items:
+        result = {'month': item.get('month'), 'id': item.get('id'),
+                  'auction_id': None, 'auction_no': None, 'error': None}
+        results.append(result)
+
+        try:
+            month_no, member_id = int(item.get('month')), int(item.get('id'))
+        except (TypeError, ValueError):
+            result['error'] = "Invalid month or member"
+            continue
+
+        member = members.get(member_id)
+
+        if not 1 <= month_no <= duration:
+            result['error'] = f"Month {month_no} is outside the group duration"
+        elif after_last_winner and month_no <= last_month:
+            result['error'] = f"You can only add winners after month {last_month}"
+        elif member is None:
+            result['error'] = "Member not found"
+        elif not member.is_eligible or member_id in taken:
+            result['error'] = f"Member {member_id} already won"
+
+        if result['error']:
+            continue
+
+        month_auctions = by_month.setdefault(month_no, [])
+        auction = next((a for a in month_auctions if a.winner_id is None), None)
+
+        if auction is None:
+            auction = Auction(
+                group=group,
+                month_no=month_no,
+                auction_no=max((a.auction_no for a in month_auctions), default=0) + 1,
+                auction_date=group.start_date + relativedelta(months=month_no - 1),
+                selection_type=selection_type
+            )
+            month_auctions.append(auction)
+
+        auction.winner = member
+        auction.bid_amount = 0
+        taken.add(member_id)
+        plan.append((result, auction, member))
+
+    # nothing written yet → just report
+    if any(result['error'] for result in results):
+        return False, results
+
+    new = [auction for _, auction, _ in plan if auction.pk is None]
+    changed = [auction for _, auction, _ in plan if auction.pk is not None]
+
+    Auction.objects.bulk_create(new, batch_size=500)
+    Auction.objects.bulk_update(changed, ['winner', 'bid_amount'], batch_size=500)
+
+    for result, auction, member in plan:
+        member.is_eligible = False
+        member.won_at_auction = auction
+        result['auction_id'] = auction.id
+        result['auction_no'] = auction.auction_no
+
+    ChittiMember.objects.bulk_update(
+        [member for _, _, member in plan],
+        ['is_eligible', 'won_at_auction'],
+        batch_size=500
+    )
+
+    # bulk writes skip chitti.signals → settle here
+    settle_auctions([auction for _, auction, _ in plan])
+
+    return True, results
+
+
+# =========================
+# ⏰ DUE AUTO AUCTIONS
+# =========================
+# Auto-mode auctions dated today or earlier with no winner are run by
+# ``manage.py run_due_auctions`` instead of waiting for the spin page.
+# Each one runs in its own transaction under SELECT ... FOR UPDATE
+# SKIP LOCKED, so parallel workers / runner instances never share a row.
+WON, LOCKED, NO_MEMBERS = 'won', 'locked', 'no_members'
+
+
+def due_auction_ids(today=None, limit=None):
+    from chitti.models import Auction
+
+    today = today or timezone.localdate()
+
+    ids = Auction.objects.filter(
+        selection_type='auto',
+        winner__isnull=True,
+        auction_date__lte=today,
+        group__is_active=True
+    ).order_by('auction_date', 'id').values_list('id', flat=True)
+
+    return list(ids[:limit] if limit else ids)
+
+
+def run_due_auction(auction_id):
+    """Spin one due auction. Returns WON, LOCKED (taken or already done) or NO_MEMBERS."""
+    from chitti.models import Auction
+
+    with transaction.atomic():
+        auction = (
+            Auction.objects.select_for_update(skip_locked=True)
+            .filter(id=auction_id, winner__isnull=True)
+            .first()
+        )
+
+        if auction is None:
+            return LOCKED
+
+        # a concurrent spin in the same group may claim our pick first → re-pick
+        for attempt in range(3):
+            winner = pick_eligible_member(auction.group_id)
+
+            if winner is None:
+                return NO_MEMBERS
+
+            try:
+                auction.assign_winner(winner)
+                return WON
+            except ValueError:
+                if attempt == 2:
+                    raise
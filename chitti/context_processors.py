@@ -1,22 +1,26 @@
 # chitti/context_processors.py
-from django.db.models import Sum
-from payments.models import Payment
+from decimal import Decimal
+
+from django.utils.functional import SimpleLazyObject, lazy
+
+from chitti.notifications import get_pending_notifications
+
+
+def _pending_for(user):
+    if (
+        user.is_authenticated
+        and hasattr(user, 'staffprofile')
+        and user.staffprofile.role == 'group_admin'
+    ):
+        return get_pending_notifications(user)
+    return 0, Decimal('0')
+
 
 def group_admin_notifications(request):
-    if request.user.is_authenticated:
-   
-        pending_payments = Payment.objects.filter(
-            sent_to_admin=True,
-            admin_status__iexact='pending', 
-            is_seen=False
-        )
-        
+    # lazy → nothing is looked up unless the template shows the badge
+    pending = SimpleLazyObject(lambda: _pending_for(request.user))
 
-        return {
-            'total_pending_count': pending_payments.count(),
-            'pending_total_amount': pending_payments.aggregate(Sum('amount'))['amount__sum'] or 0,
-        }
     return {
-        'total_pending_count': 0,
-        'pending_total_amount': 0
-    }
\ No newline at end of file
+        'total_pending_count': lazy(lambda: pending[0], int)(),
+        'pending_total_amount': lazy(lambda: pending[1], Decimal)(),
+    }
@@ -0,0 +1,144 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum, Count, Q
+from django.utils import timezone
+
+
+# =========================
+# 📊 GROUP ADMIN DASHBOARD SUMMARY (CACHED)
+# =========================
+# One entry per owner: {'data': summary, 'fresh_until': epoch seconds}.
+# Fresh entries are returned as is. Past fresh_until the entry is still
+# served (stale-while-revalidate) and the first caller to grab the refresh
+# lock rebuilds it. Saves/deletes of Payment, ChittiMember and ChittiGroup
+# drop the owner's entry (chitti.signals).
+def summary_key(owner_id):
+    return f"dashboard:summary:{owner_id}"
+
+
+def _lock_key(owner_id):
+    return f"dashboard:summary:{owner_id}:refresh"
+
+
+def build_owner_summary(owner_id):
+    """Recompute the summary from the database (2 queries)."""
+    from chitti.models import ChittiGroup
+    from payments.models import Payment
+
+    today = timezone.now().date()
+    month_start = today.replace(day=1)
+
+    groups = list(
+        ChittiGroup.objects.filter(owner_id=owner_id)
+        .select_related('collector__user')
+        .annotate(members_count=Count('chitti_members'))
+        .order_by('id')
+    )
+
+    totals = Payment.objects.filter(
+        group__owner_id=owner_id,
+        payment_status='success'
+    ).aggregate(
+        this_month=Sum('amount', filter=Q(received_by_admin=True, paid_date__gte=month_start)),
+        received=Sum('amount', filter=Q(received_by_admin=True)),
+        pending=Sum('amount', filter=Q(received_by_admin=False)),
+    )
+
+    total_received = totals['received'] or Decimal('0')
+    total_expected = sum((g.total_amount or 0 for g in groups), Decimal('0'))
+
+    collection_percentage = 0
+    if total_expected > 0:
+        collection_percentage = round((total_received / total_expected) * 100, 2)
+
+    return {
+        'month': month_start,
+        'total_groups': len(groups),
+        'active_groups': sum(1 for g in groups if g.is_active),
+        'total_members': sum(g.members_count for g in groups),
+        'this_month_collection': totals['this_month'] or Decimal('0'),
+        'total_received': total_received,
+        'pending_admin_approval': totals['pending'] or Decimal('0'),
+        'total_expected': total_expected,
+        'collection_percentage': collection_percentage,
+        'groups': [
+            {
+                'id': g.id,
+                'name': g.name,
+                'code': g.code,
+                'parent_group_id': g.parent_group_id,
+                'is_active': g.is_active,
+                'total_members': g.members_count,
+                'monthly_amount': g.monthly_amount,
+                'duration_months': g.duration_months,
+                'total_amount': g.total_amount,
+                'start_date': g.start_date,
+                'collector_name': (
+                    g.collector.user.username
+                    if g.collector and hasattr(g.collector, 'user')
+                    else "Not Assigned"
+                ),
+            }
+            for g in groups
+        ],
+    }
+
+
+def _store(owner_id, data):
+    timeout = settings.DASHBOARD_CACHE_TIMEOUT
+    cache.set(
+        summary_key(owner_id),
+        {'data': data, 'fresh_until': time.time() + timeout},
+        timeout + settings.DASHBOARD_CACHE_STALE
+    )
+    return data
+
+
+def get_owner_summary(owner):
+    """Dashboard summary for a group admin (User or user id)."""
+    owner_id = getattr(owner, 'pk', owner)
+    entry = cache.get(summary_key(owner_id))
+
+    # month rolled over → this-month figure is wrong, not just stale
+    if entry is not None and entry['data']['month'] != timezone.now().date().replace(day=1):
+        entry = None
+
+    if entry is None:
+        return _store(owner_id, build_owner_summary(owner_id))
+
+    if entry['fresh_until'] > time.time():
+        return entry['data']
+
+    # stale: one caller revalidates, the rest keep serving the old entry
+    if not cache.add(_lock_key(owner_id), 1, settings.DASHBOARD_CACHE_TIMEOUT):
+        return entry['data']
+
+    try:
+        return _store(owner_id, build_owner_summary(owner_id))
+    finally:
+        cache.delete(_lock_key(owner_id))
+
+
+def invalidate_owner_summary(owner_id):
+    if owner_id:
+        cache.delete(summary_key(owner_id))
+
+
+def invalidate_group_owners(group_ids):
+    """Drop the summaries of the owners of ``group_ids`` once the transaction commits."""
+    from chitti.models import ChittiGroup
+
+    group_ids = [g for g in group_ids if g]
+    if not group_ids:
+        return
+
+    owner_ids = set(
+        ChittiGroup.objects.filter(id__in=group_ids).values_list('owner_id', flat=True)
+    )
+
+    # after commit → a concurrent read can't re-cache pre-commit numbers
+    transaction.on_commit(lambda: [invalidate_owner_summary(o) for o in owner_ids])
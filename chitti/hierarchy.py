@@ -0,0 +1,85 @@
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Concat, Length, Substr
+
+
+# =========================
+# 🌳 GROUP HIERARCHY (MATERIALIZED PATH)
+# =========================
+# ChittiGroup.tree_path lists the ids from the main group down to the
+# group itself, e.g. "/12/45/" for sub group 45 of main group 12. It is
+# kept by ChittiGroup.save (create and re-parent). So:
+#   - a whole subtree is one indexed prefix match (tree_path LIKE '/12/%')
+#   - the main group (where the subscription lives) is the first id
+def build_path(parent_path, pk):
+    return f"{parent_path or '/'}{pk}/"
+
+
+def root_group_id(group):
+    """Id of the main group ``group`` belongs to (no query)."""
+    if group.tree_path:
+        return int(group.tree_path.split('/')[1])
+    return group.parent_group_id or group.pk
+
+
+def subtree(group):
+    """Queryset of ``group`` and all its sub groups, at any depth."""
+    from chitti.models import ChittiGroup
+
+    return ChittiGroup.objects.filter(tree_path__startswith=group.tree_path)
+
+
+def subtree_ids(group):
+    return list(subtree(group).values_list('id', flat=True))
+
+
+def owner_group_tree(user):
+    """
+    Groups owned by ``user`` plus everything below them, in one query:
+    a group qualifies when an owned group's path is a prefix of its path.
+    """
+    from chitti.models import ChittiGroup
+
+    owned_prefix = ChittiGroup.objects.filter(
+        owner=user,
+        tree_path=Substr(OuterRef('tree_path'), 1, Length('tree_path'))
+    )
+
+    return ChittiGroup.objects.filter(Exists(owned_prefix))
+
+
+def move_subtree(old_path, new_path):
+    """Rewrite the paths below ``old_path`` after a re-parent (one UPDATE)."""
+    from chitti.models import ChittiGroup
+
+    return ChittiGroup.objects.filter(
+        tree_path__startswith=old_path
+    ).exclude(tree_path=old_path).update(
+        tree_path=Concat(Value(new_path), Substr('tree_path', len(old_path) + 1))
+    )
+
+
+def rebuild_tree_paths():
+    """Recompute every path from parent_group (top-down). Returns rows changed."""
+    from chitti.models import ChittiGroup
+
+    rows = list(ChittiGroup.objects.only('id', 'parent_group_id', 'tree_path'))
+    children = {}
+    for group in rows:
+        children.setdefault(group.parent_group_id, []).append(group)
+
+    changed = []
+    stack = [(group, '/') for group in children.get(None, [])]
+
+    while stack:
+        group, parent_path = stack.pop()
+        path = build_path(parent_path, group.id)
+
+        if group.tree_path != path:
+            group.tree_path = path
+            changed.append(group)
+
+        stack.extend((child, path) for child in children.get(group.id, []))
+
+    ChittiGroup.objects.bulk_update(changed, ['tree_path'], batch_size=500)
+
+    return len(changed)
@@ -0,0 +1,169 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from chitti.schedule import PaymentSchedule, payment_slice_row
+
+
+def legacy_rows(payments, monthly_amount, duration, current_month):
+    """The spread loop the member views used before PaymentSchedule (float, pop(0))."""
+    monthly_amount = float(monthly_amount)
+    payment_rows = []
+    payments_list = list(payments)
+
+    overflow_cash = 0.0
+    active_payment = None
+
+    for month in range(1, duration + 1):
+
+        target = monthly_amount
+        allocated_for_month = 0.0
+        month_transactions = []
+
+        while target > 0:
+
+            if overflow_cash <= 0:
+                if payments_list:
+                    active_payment = payments_list.pop(0)
+                    overflow_cash = float(active_payment.amount)
+                else:
+                    break
+
+            take = min(overflow_cash, target)
+            allocated_for_month += take
+
+            collector_display = "Admin"
+            if active_payment.collected_by:
+                user_obj = active_payment.collected_by.user
+                collector_display = (
+                    user_obj.get_full_name() or user_obj.username
+                )
+
+            month_transactions.append({
+                "amount": take,
+                "date": active_payment.paid_date,
+                "collector": collector_display
+            })
+
+            overflow_cash -= take
+            target -= take
+
+        if allocated_for_month >= monthly_amount:
+            status_label = "Paid"
+        elif allocated_for_month > 0:
+            status_label = "Partial"
+        else:
+            status_label = "Pending"
+
+        payment_rows.append({
+            "month": month,
+            "target": monthly_amount,
+            "paid": allocated_for_month,
+            "balance": monthly_amount - allocated_for_month,
+            "status": status_label,
+            "transactions": month_transactions,
+            "is_advance": month > current_month and allocated_for_month > 0
+        })
+
+    return payment_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Time PaymentSchedule.rows() against the old per-view spread loop and "
+        "check both allocate the same paise (old/new > 1 means the engine is faster)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="120x120,600x120,3000x600,20000x1200",
+            help="Comma separated <payments>x<months> cases",
+        )
+        parser.add_argument(
+            "--monthly",
+            default="1000",
+            help="Monthly amount of the group",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per case (best is reported)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+        )
+
+    def handle(self, *args, **options):
+        monthly = Decimal(options["monthly"])
+        rng = random.Random(options["seed"])
+
+        # in-memory payments → no database, only the allocation is timed
+        collectors = [
+            SimpleNamespace(user=User(username=f"collector{i}", first_name=f"C{i}"))
+            for i in range(5)
+        ] + [None]
+
+        self.stdout.write(f"{'payments':>9} {'months':>7} {'old loop':>10} {'engine':>10} {'old/new':>9}")
+
+        for case in options["sizes"].split(","):
+            count, months = (int(part) for part in case.lower().split("x"))
+
+            # amounts around a month's share of the whole term, in whole paise
+            share = monthly * months / count
+            day = date(2020, 1, 1)
+            payments = []
+            for _ in range(count):
+                day += timedelta(days=rng.randint(0, 3))
+                payments.append(SimpleNamespace(
+                    amount=(share * Decimal(rng.uniform(0.5, 1.5))).quantize(Decimal('0.01')),
+                    paid_date=day,
+                    collected_by=rng.choice(collectors),
+                ))
+
+            current_month = months // 2
+
+            def engine():
+                return PaymentSchedule(
+                    monthly, months, payments, current_month=current_month
+                ).rows(transaction_row=payment_slice_row)
+
+            def legacy():
+                return legacy_rows(payments, monthly, months, current_month)
+
+            self.check_same(engine(), legacy())
+
+            old = self.best(legacy, options["repeat"])
+            new = self.best(engine, options["repeat"])
+
+            self.stdout.write(
+                f"{count:>9} {months:>7} {old * 1000:>8.2f}ms {new * 1000:>8.2f}ms {old / new:>8.2f}x"
+            )
+
+    def best(self, run, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def check_same(self, rows, legacy):
+        """
+        Same paid amount and slices per month. The old loop's floats drift
+        (999.9999… → "Partial"), so it is compared rounded to paise.
+        """
+        for row, old in zip(rows, legacy, strict=True):
+            slices = [float(t['amount']) for t in row['transactions']]
+            old_slices = [round(t['amount'], 2) for t in old['transactions'] if round(t['amount'], 2)]
+
+            if round(float(row['paid']), 2) != round(old['paid'], 2) or slices != old_slices:
+                raise CommandError(f"month {row['month']}: engine and old loop disagree")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from chitti.hierarchy import rebuild_tree_paths
+
+
+class Command(BaseCommand):
+    help = "Recompute ChittiGroup.tree_path from parent_group"
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_tree_paths()
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} group paths rebuilt.")
+        )
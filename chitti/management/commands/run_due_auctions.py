@@ -0,0 +1,108 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from chitti.auctions import due_auction_ids, run_due_auction
+
+
+class Command(BaseCommand):
+    help = "Pick winners for auto auctions that are due (today or earlier)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Parallel workers, each with its own database connection",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Process at most this many due auctions per run",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, one pass every --interval seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Seconds between passes in --loop mode",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+
+        if workers > 1 and not connection.features.has_select_for_update_skip_locked:
+            self.stdout.write(self.style.WARNING(
+                f"{connection.vendor} has no SKIP LOCKED row locks; running with 1 worker."
+            ))
+            workers = 1
+
+        if not options["loop"]:
+            self.run_once(workers, options["limit"])
+            return
+
+        runs = 0
+        try:
+            while True:
+                runs += 1
+                close_old_connections()
+
+                started = time.monotonic()
+                self.run_once(workers, options["limit"], runs)
+
+                time.sleep(max(options["interval"] - (time.monotonic() - started), 0))
+        except KeyboardInterrupt:
+            self.stdout.write(f"Stopped after {runs} runs.")
+
+    # -------------------------
+    # ONE PASS
+    # -------------------------
+    def run_once(self, workers, limit=None, run_no=1):
+        started = time.monotonic()
+        ids = due_auction_ids(limit=limit)
+
+        # one chunk per worker → one connection per worker, closed at the end
+        chunks = [ids[i::workers] for i in range(min(workers, len(ids)))]
+        counts = Counter()
+
+        with ThreadPoolExecutor(max_workers=max(len(chunks), 1)) as pool:
+            for result in pool.map(self.run_chunk, chunks):
+                counts.update(result)
+
+        elapsed = time.monotonic() - started
+        rate = len(ids) / elapsed if elapsed else 0
+
+        line = (
+            f"run={run_no} due={len(ids)} won={counts['won']} "
+            f"locked={counts['locked']} no_members={counts['no_members']} "
+            f"failed={counts['failed']} workers={len(chunks)} "
+            f"elapsed={elapsed:.2f}s rate={rate:.1f}/s"
+        )
+
+        self.stdout.write(self.style.WARNING(line) if counts['failed'] else self.style.SUCCESS(line))
+
+        return counts
+
+    def run_chunk(self, auction_ids):
+        counts = Counter()
+
+        try:
+            for auction_id in auction_ids:
+                try:
+                    counts[run_due_auction(auction_id)] += 1
+                except Exception as e:
+                    counts['failed'] += 1
+                    self.stderr.write(f"auction {auction_id}: {e}")
+        finally:
+            # worker threads don't go through request_finished
+            connection.close()
+
+        return counts
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_pool(apps, schema_editor):
+    Auction = apps.get_model('chitti', 'Auction')
+    ChittiMember = apps.get_model('chitti', 'ChittiMember')
+
+    repeated = list(
+        Auction.objects.filter(winner__isnull=False)
+        .values('winner_id').annotate(wins=Count('id')).filter(wins__gt=1)
+        .values_list('winner_id', flat=True)
+    )
+    if repeated:
+        raise RuntimeError(
+            f"ChittiMember ids {repeated} won more than one auction; "
+            "fix those auctions before applying this migration."
+        )
+
+    members = []
+    for auction_id, member_id in Auction.objects.filter(winner__isnull=False).values_list('id', 'winner_id'):
+        members.append(ChittiMember(id=member_id, is_eligible=False, won_at_auction_id=auction_id))
+
+    ChittiMember.objects.bulk_update(members, ['is_eligible', 'won_at_auction'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chitti', '0018_alter_chittigroup_auction_interval_months_and_more'),
+        ('members', '0005_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chittimember',
+            name='is_eligible',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='chittimember',
+            name='won_at_auction',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_by', to='chitti.auction'),
+        ),
+        migrations.RunPython(backfill_pool, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chittimember',
+            index=models.Index(condition=models.Q(('is_eligible', True)), fields=['group', 'id'], name='chitti_member_eligible'),
+        ),
+        migrations.AddConstraint(
+            model_name='auction',
+            constraint=models.UniqueConstraint(condition=models.Q(('winner__isnull', False)), fields=('winner',), name='unique_auction_winner'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:38
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_settlements(apps, schema_editor):
+    # commission rate is 0 for existing groups → dividend = discount ÷ members
+    Auction = apps.get_model('chitti', 'Auction')
+    ChittiMember = apps.get_model('chitti', 'ChittiMember')
+    AuctionSettlement = apps.get_model('chitti', 'AuctionSettlement')
+
+    counts = dict(
+        ChittiMember.objects.values('group_id').annotate(n=Count('id')).values_list('group_id', 'n')
+    )
+
+    settlements = []
+    for auction in Auction.objects.filter(winner__isnull=False).select_related('group'):
+        members = counts.get(auction.group_id, 0)
+        pot = int(Decimal(auction.group.monthly_amount or 0) * 100) * members
+        discount = int(Decimal(auction.bid_amount or 0) * 100)
+        dividend = discount // members if members else 0
+
+        settlements.append(AuctionSettlement(
+            auction_id=auction.id,
+            group_id=auction.group_id,
+            month_no=auction.month_no,
+            member_count=members,
+            pot_amount=Decimal(pot) / 100,
+            discount=Decimal(discount) / 100,
+            foreman_commission=Decimal(0),
+            dividend_per_member=Decimal(dividend) / 100,
+            net_payout=Decimal(pot - discount) / 100,
+        ))
+
+    AuctionSettlement.objects.bulk_create(settlements, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chitti', '0019_eligible_winner_pool'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chittigroup',
+            name='foreman_commission_percent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+        migrations.CreateModel(
+            name='AuctionSettlement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month_no', models.PositiveIntegerField()),
+                ('member_count', models.PositiveIntegerField()),
+                ('pot_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('discount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('foreman_commission', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('dividend_per_member', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('net_payout', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('settled_at', models.DateTimeField(auto_now=True)),
+                ('auction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='settlement', to='chitti.auction')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='settlements', to='chitti.chittigroup')),
+            ],
+            options={
+                'ordering': ['month_no', 'auction_id'],
+                'indexes': [models.Index(fields=['group', 'month_no'], name='settlement_group_month')],
+            },
+        ),
+        migrations.RunPython(backfill_settlements, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    ChittiGroup = apps.get_model('chitti', 'ChittiGroup')
+
+    children = {}
+    for group in ChittiGroup.objects.only('id', 'parent_group_id'):
+        children.setdefault(group.parent_group_id, []).append(group)
+
+    groups = []
+    stack = [(group, '/') for group in children.get(None, [])]
+    while stack:
+        group, parent_path = stack.pop()
+        group.tree_path = f"{parent_path}{group.id}/"
+        groups.append(group)
+        stack.extend((child, group.tree_path) for child in children.get(group.id, []))
+
+    ChittiGroup.objects.bulk_update(groups, ['tree_path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chitti', '0020_auction_settlement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chittigroup',
+            name='tree_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
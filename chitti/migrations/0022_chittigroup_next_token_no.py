@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:45
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_next_token(apps, schema_editor):
+    ChittiGroup = apps.get_model('chitti', 'ChittiGroup')
+    ChittiMember = apps.get_model('chitti', 'ChittiMember')
+
+    last_token = (
+        ChittiMember.objects.filter(group=OuterRef('pk'))
+        .order_by('-token_no')
+        .values('token_no')[:1]
+    )
+
+    ChittiGroup.objects.update(next_token_no=Coalesce(Subquery(last_token), 0) + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chitti', '0021_chittigroup_tree_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chittigroup',
+            name='next_token_no',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(backfill_next_token, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,8 @@
 from calendar import monthrange
 from datetime import datetime
 from decimal import Decimal
-import random
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
@@ -47,6 +46,14 @@ class ChittiGroup(models.Model):
         related_name='sub_groups'
     )
 
+    # 🌳 "/<main id>/.../<own id>/" (chitti.hierarchy, kept by save)
+    tree_path = models.CharField(
+        max_length=255,
+        db_index=True,
+        editable=False,
+        default=''
+    )
+
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
     monthly_amount = models.DecimalField(max_digits=12, decimal_places=2)
     duration_months = models.PositiveIntegerField()
@@ -57,6 +64,13 @@ class ChittiGroup(models.Model):
     auctions_per_month = models.PositiveIntegerField(default=1)
     auction_interval_months = models.PositiveIntegerField(null=True, blank=True)
 
+    # 💼 foreman commission, % of the monthly pot (taken out of the discount)
+    foreman_commission_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0
+    )
+
     start_date = models.DateField()
 
     collector = models.ForeignKey(
@@ -68,10 +82,15 @@ class ChittiGroup(models.Model):
         related_name='assigned_chitti_groups'
     )
 
+    # 🎟️ token sequence: next token_no to hand out (chitti.tokens)
+    next_token_no = models.PositiveIntegerField(default=1, editable=False)
+
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COUNTER_FIELDS = ('next_token_no', 'tree_path')
+
     # -----------------------------
     # SAVE (FIXED)
     # -----------------------------
@@ -82,8 +101,39 @@ class ChittiGroup(models.Model):
         if not self.code:
             self.code = f"CH-{uuid.uuid4().hex[:6].upper()}"
 
+        # 🔒 the token counter and the tree path are kept by their own
+        # UPDATEs (chitti.tokens / hierarchy) → a full save of an instance
+        # loaded earlier must not write its stale copies back
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent_group' not in update_fields and self.tree_path:
+            return super().save(*args, **kwargs)
+
+        from chitti.hierarchy import build_path, move_subtree
+
+        parent_path = self.parent_group.tree_path if self.parent_group_id else ''
+        old_path = self.tree_path
+
+        # ❌ moving a group under its own sub group would make a cycle
+        if old_path and parent_path.startswith(old_path):
+            raise ValueError("A group can't be moved under its own sub group!")
+
         super().save(*args, **kwargs)
 
+        # 🌳 path needs the pk → set after insert; re-parent moves the subtree
+        new_path = build_path(parent_path, self.pk)
+        if new_path != old_path:
+            ChittiGroup.objects.filter(pk=self.pk).update(tree_path=new_path)
+            self.tree_path = new_path
+
+            if old_path:
+                move_subtree(old_path, new_path)
+
     def __str__(self):
         return f"{self.name} ({self.code})"
 
@@ -146,74 +196,23 @@ class ChittiGroup(models.Model):
     # AUCTION STRUCTURE
     # -----------------------------
     def generate_auctions_structure(self):
-        auctions = []
-
-        if self.auction_type == "monthly":
-            for m in range(1, self.duration_months + 1):
-                for a in range(1, self.auctions_per_month + 1):
-                    auctions.append((m, a))
-
-        elif self.auction_type == "interval" and self.auction_interval_months:
-            for m in range(1, self.duration_months + 1):
-                if (m - 1) % self.auction_interval_months == 0:
-                    for a in range(1, self.auctions_per_month + 1):
-                        auctions.append((m, a))
-
-        return auctions
+        from chitti.auctions import auction_slots
+        return auction_slots(self)
 
     # -----------------------------
-    # CREATE AUCTIONS (FINAL FIX)
+    # CREATE / SYNC AUCTIONS
     # -----------------------------
-    from calendar import monthrange
-
-
-    def create_auctions(self, base_dates=None):
-        from .models import Auction
-
-        # 🧹 clear old auctions
-        Auction.objects.filter(group=self).delete()
-
-        # =========================
-        # 🟢 MANUAL MODE
-        # =========================
-        if base_dates:
-            for i, d in enumerate(base_dates, start=1):
-                Auction.objects.create(
-                    group=self,
-                    month_no=i,
-                    auction_no=i,
-                    auction_date=d
-                )
-            return
-
-        # =========================
-        # 🔵 AUTO MODE (FIXED)
-        # =========================
-        start = self.start_date
-        base_day = start.day
-
-        for month_no in range(1, self.duration_months + 1):
-
-            temp_date = start + relativedelta(months=month_no - 1)
-
-            year = temp_date.year
-            month = temp_date.month
-
-            last_day = monthrange(year, month)[1]
-            safe_day = min(base_day, last_day)
+    def create_auctions(self, base_dates=None, previous_start=None):
+        """
+        Create (or re-sync after an edit) the auction schedule.
+        ``base_dates``: first-month date of each auction slot.
+        ``previous_start``: start_date before an edit (keeps custom dates).
+        """
+        from chitti.auctions import sync_auctions
+        return sync_auctions(self, base_dates, previous_start)
 
-            auction_date = date(year, month, safe_day)
 
-            Auction.objects.create(
-                group=self,
-                month_no=month_no,
-                auction_no=1,   # (or remove if not needed per month logic)
-                auction_date=auction_date
-        )
-    # -----------------------------
-    # CREATE AUCTIONS (FIXED)
-    # -----------------------------
-    
+# ==================================================
 # Chitti Member
 # ==================================================
 
@@ -234,13 +233,45 @@ class ChittiMember(models.Model):
     token_no = models.PositiveIntegerField()
     joined_at = models.DateTimeField(auto_now_add=True)
 
+    # 🏆 eligible-winner pool (kept in step by Auction.assign_winner)
+    is_eligible = models.BooleanField(default=True)
+    won_at_auction = models.OneToOneField(
+        'Auction',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='won_by'
+    )
+
     class Meta:
         unique_together = ('group', 'token_no')
         ordering = ['token_no']
+        indexes = [
+            models.Index(
+                fields=['group', 'id'],
+                name='chitti_member_eligible',
+                condition=models.Q(is_eligible=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.member.name} (Token {self.token_no})"
 
+    def save(self, *args, **kwargs):
+        # 🎟️ new members take the group's next token; hand-picked ones move the counter past them
+        if self._state.adding and self.group_id:
+            from chitti.tokens import allocate_token, claim_token
+
+            with transaction.atomic():
+                if self.token_no is None:
+                    self.token_no = allocate_token(self.group_id)
+                else:
+                    claim_token(self.group_id, self.token_no)
+
+                return super().save(*args, **kwargs)
+
+        return super().save(*args, **kwargs)
+
     @property
     def total_paid(self):
         return sum(p.amount for p in self.payments.all())
@@ -324,6 +355,14 @@ class Auction(models.Model):
     class Meta:
         unique_together = ('group', 'month_no', 'auction_no')
         ordering = ['month_no', 'auction_no']
+        constraints = [
+            # a member wins at most once
+            models.UniqueConstraint(
+                fields=['winner'],
+                condition=models.Q(winner__isnull=False),
+                name='unique_auction_winner',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.group.name} - Month {self.month_no} Auction {self.auction_no}"
@@ -351,54 +390,52 @@ class Auction(models.Model):
         Manual winner assignment
         """
 
-        # 🔥 1️⃣ Already closed check
-        if self.is_closed:
-            raise ValueError("Auction already closed!")
+        with transaction.atomic():
+            # 🔥 1️⃣ Already closed check (row locked → a concurrent spin
+            # waits here, then sees the winner)
+            locked = Auction.objects.select_for_update().only('winner').get(pk=self.pk)
+            if locked.winner_id:
+                raise ValueError("Auction already closed!")
+
+            # 🔥 2️⃣ Member validation
+            if chitti_member.group_id != self.group_id:
+                raise ValueError("Member not in this group!")
 
-        # 🔥 2️⃣ Member validation
-        if chitti_member.group != self.group:
-            raise ValueError("Member not in this group!")
+            # 🔥 3️⃣ Take the member out of the pool (fails if already won)
+            claimed = ChittiMember.objects.filter(
+                id=chitti_member.id,
+                is_eligible=True
+            ).update(is_eligible=False, won_at_auction=self)
 
-        # 🔥 3️⃣ Prevent duplicate winner
-        already_won = Auction.objects.filter(
-            group=self.group,
-            winner=chitti_member
-        ).exists()
+            if not claimed:
+                raise ValueError("Member already won an auction!")
 
-        if already_won:
-            raise ValueError("Member already won an auction!")
+            chitti_member.is_eligible = False
+            chitti_member.won_at_auction = self
 
-        # 🔥 4️⃣ Assign winner
-        self.winner = chitti_member
+            # 🔥 4️⃣ Assign winner
+            self.winner = chitti_member
+            self._loaded_winner_id = chitti_member.id   # pool already updated
 
-        if bid_amount is not None:
-            self.bid_amount = bid_amount
+            if bid_amount is not None:
+                self.bid_amount = bid_amount
 
-        self.save()
+            self.save()
 
     # -----------------------------
     # AUTO WINNER (SPIN)
     # -----------------------------
     def auto_select_winner(self):
+        from chitti.auctions import pick_eligible_member
 
         if self.is_closed:
             raise ValueError("Auction already closed!")
 
-        # 🔥 FIXED HERE
-        members = self.group.chitti_members.all()
-
-        previous_winners = Auction.objects.filter(
-            group=self.group,
-            winner__isnull=False
-        ).values_list('winner_id', flat=True)
-
-        eligible_members = members.exclude(id__in=previous_winners)
+        winner = pick_eligible_member(self.group_id)
 
-        if not eligible_members.exists():
+        if winner is None:
             raise ValueError("No eligible members left!")
 
-        winner = random.choice(list(eligible_members))
-
         self.assign_winner(winner)
 
         return winner
@@ -421,6 +458,46 @@ class Auction(models.Model):
             self.assign_winner(member, bid_amount)
             return member
 
+
+# ==================================================
+# Auction Settlement
+# ==================================================
+# Figures of a completed auction, frozen when the winner is assigned
+# (chitti.settlements): later member changes don't rewrite history.
+class AuctionSettlement(models.Model):
+
+    auction = models.OneToOneField(
+        Auction,
+        on_delete=models.CASCADE,
+        related_name='settlement'
+    )
+
+    group = models.ForeignKey(
+        ChittiGroup,
+        on_delete=models.CASCADE,
+        related_name='settlements'
+    )
+
+    month_no = models.PositiveIntegerField()
+    member_count = models.PositiveIntegerField()
+
+    pot_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    discount = models.DecimalField(max_digits=12, decimal_places=2)
+    foreman_commission = models.DecimalField(max_digits=12, decimal_places=2)
+    dividend_per_member = models.DecimalField(max_digits=12, decimal_places=2)
+    net_payout = models.DecimalField(max_digits=12, decimal_places=2)
+
+    settled_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['month_no', 'auction_id']
+        indexes = [
+            models.Index(fields=['group', 'month_no'], name='settlement_group_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.auction} - ₹{self.net_payout}"
+
 # ==================================================
 # Member Payment
 # ==================================================
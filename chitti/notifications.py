@@ -0,0 +1,100 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum, Count, Q
+
+from core.money import HUNDRED, to_paise
+
+
+# =========================
+# 🔔 GROUP ADMIN NOTIFICATION COUNTER
+# =========================
+# Per owner: payments handed over by collectors and not yet seen
+# (sent_to_admin, admin_status pending, is_seen False).
+# Kept as two integer cache keys (count, amount in paise) so single-row
+# transitions are applied with atomic cache.incr (chitti.signals).
+# Queryset .update() sites drop the counter; the next read recounts it
+# with one query (served by the pay_pending_unseen partial index).
+PENDING_NOTIFICATION = Q(sent_to_admin=True, admin_status='pending', is_seen=False)
+
+NOTIFICATION_FIELDS = ('group_id', 'amount', 'sent_to_admin', 'admin_status', 'is_seen')
+
+
+def _keys(owner_id):
+    return f"notifications:{owner_id}:count", f"notifications:{owner_id}:paise"
+
+
+def is_pending_notification(payment):
+    return bool(
+        payment.sent_to_admin
+        and payment.admin_status == 'pending'
+        and not payment.is_seen
+    )
+
+
+def count_pending_notifications(owner_id):
+    """(count, paise) straight from the database."""
+    from payments.models import Payment
+
+    totals = Payment.objects.filter(
+        PENDING_NOTIFICATION,
+        group__owner_id=owner_id
+    ).aggregate(count=Count('id'), amount=Sum('amount'))
+
+    return totals['count'], to_paise(totals['amount'])
+
+
+def get_pending_notifications(owner):
+    """(count, amount) of pending handovers for a group admin (User or user id)."""
+    owner_id = getattr(owner, 'pk', owner)
+    count_key, paise_key = _keys(owner_id)
+
+    values = cache.get_many([count_key, paise_key])
+
+    if len(values) == 2:
+        count, paise = values[count_key], values[paise_key]
+    else:
+        count, paise = count_pending_notifications(owner_id)
+        cache.set_many(
+            {count_key: count, paise_key: paise},
+            settings.NOTIFICATION_CACHE_TIMEOUT
+        )
+
+    return count, Decimal(paise) / HUNDRED
+
+
+def invalidate_notifications(owner_id):
+    if owner_id:
+        cache.delete_many(_keys(owner_id))
+
+
+def adjust_notifications(owner_id, count, paise):
+    """Apply a +/- change to a cached counter; a missing counter is left to recount."""
+    if not owner_id:
+        return
+
+    count_key, paise_key = _keys(owner_id)
+
+    try:
+        cache.incr(count_key, count)
+        cache.incr(paise_key, paise)
+    except ValueError:
+        # expired between the two keys (or never read) → drop both
+        invalidate_notifications(owner_id)
+
+
+def invalidate_group_notifications(group_ids):
+    """Drop the counters of the owners of ``group_ids`` once the transaction commits."""
+    from chitti.models import ChittiGroup
+
+    group_ids = [g for g in group_ids if g]
+    if not group_ids:
+        return
+
+    owner_ids = set(
+        ChittiGroup.objects.filter(id__in=group_ids).values_list('owner_id', flat=True)
+    )
+
+    transaction.on_commit(lambda: [invalidate_notifications(o) for o in owner_ids])
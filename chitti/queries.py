@@ -0,0 +1,116 @@
+from django.db.models import (
+    BooleanField, Count, DateField, ExpressionWrapper, Func, Min, OuterRef, Q,
+    Subquery, Sum, DecimalField, Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+# -----------------------------
+# 📅 DATABASE-SIDE GROUP DATES
+# -----------------------------
+class GroupEndDate(Func):
+    """
+    Last day of a group: start + ``months`` months − 1 day.
+    PostgreSQL month intervals clamp to month end, like relativedelta.
+    """
+    output_field = DateField()
+
+    def _parts(self, compiler, connection):
+        start_sql, start_params = compiler.compile(self.source_expressions[0])
+        months_sql, months_params = compiler.compile(self.source_expressions[1])
+        return start_sql, months_sql, (*start_params, *months_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        start, months, params = self._parts(compiler, connection)
+        return (
+            f"(({start}) + make_interval(months => ({months})::int) - interval '1 day')::date",
+            params,
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite rolls Jan 31 + 1 month over into March → clamp to month end
+        start, months, params = self._parts(compiler, connection)
+        shifted = f"date({start}, '+' || ({months}) || ' months')"
+        month_end = f"date({start}, 'start of month', '+' || (({months}) + 1) || ' months', '-1 day')"
+        return f"date(min({shifted}, {month_end}), '-1 day')", params * 2
+
+
+# -----------------------------
+# 📋 GROUP MANAGEMENT LISTING
+# -----------------------------
+# Every column of the owner's group list comes from one query: dates are
+# computed by the database and per-group figures are correlated
+# subqueries (served by the group FK indexes), so there's no join
+# fan-out and no per-group query while rendering.
+def per_group(queryset, value):
+    """Correlated subquery: ``value`` aggregated over ``queryset`` rows of the outer group."""
+    return Subquery(
+        queryset.filter(group=OuterRef('pk'))
+        .order_by()
+        .values('group')
+        .annotate(value=value)
+        .values('value')[:1]
+    )
+
+
+def group_listing(owner, today=None):
+    from chitti.models import Auction, ChittiGroup, ChittiMember
+    from payments.models import Payment
+
+    today = today or timezone.localdate()
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    last_winner = (
+        Auction.objects.filter(group=OuterRef('pk'), winner__isnull=False)
+        .order_by('-month_no', '-auction_no')
+        .values('winner__member__name')[:1]
+    )
+
+    return (
+        ChittiGroup.objects.filter(owner=owner)
+        .select_related('subscription', 'parent_group__subscription')
+        .annotate(
+            end_date_calculated=GroupEndDate(
+                Coalesce('registration_start_date', 'start_date'),
+                'duration_months'
+            ),
+            first_auction_date=per_group(Auction.objects.all(), Min('auction_date')),
+            members_count=Coalesce(per_group(ChittiMember.objects.all(), Count('id')), 0),
+            last_winner_name=Subquery(last_winner),
+            total_collected=Coalesce(
+                per_group(
+                    Payment.objects.filter(payment_status='success', received_by_admin=True),
+                    Sum('amount')
+                ),
+                Value(0, output_field=money),
+                output_field=money
+            ),
+        )
+        .annotate(
+            is_expired=ExpressionWrapper(
+                Q(end_date_calculated__lt=today),
+                output_field=BooleanField()
+            ),
+        )
+    )
+
+
+def group_listing_page(owner, after=None, limit=50):
+    """
+    One keyset page of ``group_listing`` in creation order.
+    Returns (groups, next_cursor); the cursor is the last group id.
+    """
+    groups = group_listing(owner)
+
+    if after and str(after).isdigit():
+        groups = groups.filter(id__gt=int(after))
+
+    rows = list(groups.order_by('id')[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+
+    return rows, next_cursor
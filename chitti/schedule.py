@@ -0,0 +1,209 @@
+from array import array
+from bisect import bisect_left
+from decimal import Decimal
+from itertools import accumulate
+
+from core.money import HUNDRED, from_paise, to_paise
+
+
+# =========================
+# 📅 PAYMENT SCHEDULE ENGINE
+# =========================
+# Spreads a member's payments over the months of a group, oldest payment
+# first. Amounts live in compact int-paise arrays (exact for two-place
+# Decimals), with prefix[i] = paise paid before payment i, so
+#   - month m covers the paise interval [(m-1)*monthly, m*monthly)
+#   - paid for a month is int arithmetic on the running total
+#   - the payments that fund a month are found with one bisect from the
+#     previous month's last payment (no pop(0), no per-month rescans)
+# Rows carry Decimals without building one per row: the target, zero and
+# the payment's own amount (a whole slice) are shared; only the partial
+# month and the edge slices of a month are converted from paise.
+# Cost is O(payments + months) with exact amounts. It is not faster than
+# the old float loop at everyday sizes, only on very long histories
+# (`manage.py benchmark_schedule` prints both).
+ZERO = Decimal('0.00')
+
+
+def to_decimal(amount):
+    if isinstance(amount, Decimal):
+        return amount
+    return Decimal(str(amount or 0))
+
+
+class PaymentSchedule:
+
+    def __init__(self, monthly_amount, duration_months, payments=(), current_month=0):
+        self.monthly = to_decimal(monthly_amount)
+        self.monthly_paise = to_paise(self.monthly)
+        self.duration = int(duration_months or 0)
+        self.current_month = int(current_month or 0)
+
+        payments = list(payments)
+        amounts = [getattr(payment, 'amount', payment) for payment in payments]
+
+        # model rows carry Decimals already; anything else (or a refund /
+        # zero row, which funds no month) takes the slow path
+        if not all(amount.__class__ is Decimal and amount > 0 for amount in amounts):
+            kept = []
+            for payment, amount in zip(payments, amounts):
+                amount = to_decimal(amount)
+                if amount > 0:
+                    kept.append((payment, amount))
+            payments = [payment for payment, _ in kept]
+            amounts = [amount for _, amount in kept]
+
+        self.payments = payments
+        self.amounts = amounts
+        self.paise = array('q', [int(amount * HUNDRED) for amount in amounts])
+        self.prefix = array('q', accumulate(self.paise, initial=0))
+
+    @classmethod
+    def for_group(cls, group, payments=()):
+        return cls(
+            group.monthly_amount,
+            group.duration_months,
+            payments,
+            current_month=group.current_month
+        )
+
+    @classmethod
+    def from_total(cls, group, total_paid):
+        """Schedule from a running total only (no per-payment slices)."""
+        return cls.for_group(group, [total_paid])
+
+    # -------------------------
+    # TOTALS
+    # -------------------------
+    @property
+    def total_paid(self):
+        return from_paise(self.prefix[-1])
+
+    @property
+    def monthly_amount(self):
+        return self.monthly
+
+    @property
+    def total_due(self):
+        """Dues up to the current month not yet covered."""
+        return from_paise(max(self.current_month * self.monthly_paise - self.prefix[-1], 0))
+
+    @property
+    def months_paid(self):
+        if not self.monthly_paise:
+            return self.duration
+        return min(self.prefix[-1] // self.monthly_paise, self.duration)
+
+    # -------------------------
+    # PER MONTH
+    # -------------------------
+    def paid_for(self, month):
+        covered = self.prefix[-1] - (month - 1) * self.monthly_paise
+        return from_paise(min(max(covered, 0), self.monthly_paise))
+
+    def rows(self, transaction_row=None):
+        """
+        Month-wise table:
+            {'month', 'target', 'paid', 'balance', 'status', 'is_advance'}
+        plus 'transactions' when ``transaction_row(payment)`` is given: one
+        {'amount', **transaction_row(payment)} per payment slice of the month.
+        """
+        monthly = self.monthly
+        monthly_paise = self.monthly_paise
+        prefix = self.prefix
+        total = prefix[-1]
+        current_month = self.current_month
+
+        payments = self.payments
+        amounts = self.amounts
+
+        # a payment's fields are built once, however many months it funds
+        fields = [None] * len(payments)
+        first = 0   # first payment with cash left for the month
+
+        table = []
+        append = table.append
+
+        for month in range(1, self.duration + 1):
+            covered = total - (month - 1) * monthly_paise
+
+            if covered >= monthly_paise:
+                paid, balance, status = monthly, ZERO, "Paid"
+            elif covered > 0:
+                paid = from_paise(covered)
+                balance, status = monthly - paid, "Partial"
+            else:
+                paid, balance, status = ZERO, monthly, "Pending"
+
+            row = {
+                'month': month,
+                'target': monthly,
+                'paid': paid,
+                'balance': balance,
+                'status': status,
+                'is_advance': month > current_month and covered > 0 and monthly_paise > 0,
+            }
+
+            if transaction_row is not None:
+                transactions = []
+
+                if covered > 0:
+                    start = total - covered
+                    end = start + monthly_paise if covered > monthly_paise else total
+                    last = bisect_left(prefix, end, first)   # prefix[last] >= end
+
+                    for i in range(first, last):
+                        low, high = prefix[i], prefix[i + 1]
+                        if low >= start and high <= end:
+                            amount = amounts[i]              # whole payment
+                        else:
+                            amount = from_paise(min(high, end) - max(low, start))
+
+                        if fields[i] is None:
+                            fields[i] = transaction_row(payments[i])
+                        transactions.append({'amount': amount, **fields[i]})
+
+                    # the month's last payment may carry on into the next
+                    first = last - 1 if prefix[last] > end else last
+
+                row['transactions'] = transactions
+
+            append(row)
+
+        return table
+
+
+def collector_month_status(schedule, month_key='month'):
+    """
+    Collector view of the schedule: fully paid future months show as
+    "Advance", fully paid past/current months as "Full Paid".
+    """
+    rows = []
+
+    for row in schedule.rows():
+        status = row['status']
+        if status == "Paid":
+            status = "Advance" if row['month'] > schedule.current_month else "Full Paid"
+
+        rows.append({
+            month_key: row['month'],
+            'target': row['target'],
+            'received': row['paid'],
+            'remaining': row['balance'],
+            'status': status
+        })
+
+    return rows
+
+
+def payment_slice_row(payment):
+    """Transaction fields for PaymentSchedule.rows() (collector full name → username)."""
+    collector_display = "Admin"
+    if payment.collected_by:
+        user_obj = payment.collected_by.user
+        collector_display = user_obj.get_full_name() or user_obj.username
+
+    return {
+        "date": payment.paid_date,
+        "collector": collector_display
+    }
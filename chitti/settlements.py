@@ -0,0 +1,169 @@
+from decimal import Decimal, ROUND_DOWN
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, Q, Sum
+
+from core.money import HUNDRED, to_paise
+from chitti.snapshot import invalidate_group_snapshots
+
+
+# =========================
+# 🧾 AUCTION SETTLEMENT
+# =========================
+# Written when an auction gets its winner (Auction.assign_winner via
+# chitti.signals, assign_winners in bulk). All arithmetic in paise:
+#   pot        = monthly_amount × members
+#   discount   = bid_amount (what the winner gives up)
+#   commission = foreman % of the pot, never more than the discount
+#   dividend   = (discount − commission) ÷ members, rounded down
+#   net payout = pot − discount
+# Dividends of month m lower the installment of month m + 1: the
+# Installment rows of that month get amount_due = monthly − dividends.
+SETTLEMENT_FIELDS = (
+    'group', 'month_no', 'member_count', 'pot_amount', 'discount',
+    'foreman_commission', 'dividend_per_member', 'net_payout', 'settled_at',
+)
+
+
+def compute_settlement(group, bid_amount, member_count):
+    """Settlement figures (Decimals) for one auction of ``group``."""
+    pot = to_paise(group.monthly_amount) * member_count
+    discount = to_paise(bid_amount)
+
+    rate = Decimal(group.foreman_commission_percent or 0)
+    commission = min(int((pot * rate / HUNDRED).to_integral_value(ROUND_DOWN)), discount)
+
+    dividend = (discount - commission) // member_count if member_count else 0
+
+    return {
+        'member_count': member_count,
+        'pot_amount': Decimal(pot) / HUNDRED,
+        'discount': Decimal(discount) / HUNDRED,
+        'foreman_commission': Decimal(commission) / HUNDRED,
+        'dividend_per_member': Decimal(dividend) / HUNDRED,
+        'net_payout': Decimal(pot - discount) / HUNDRED,
+    }
+
+
+def member_counts(group_ids):
+    """{group_id: members} in one query."""
+    from chitti.models import ChittiMember
+
+    return dict(
+        ChittiMember.objects.filter(group_id__in=set(group_ids))
+        .values('group_id')
+        .annotate(n=Count('id'))
+        .values_list('group_id', 'n')
+    )
+
+
+def settle_auctions(auctions):
+    """Upsert the settlements of ``auctions`` that have a winner (one write)."""
+    from chitti.models import AuctionSettlement
+
+    auctions = [a for a in auctions if a.winner_id]
+    if not auctions:
+        return []
+
+    counts = member_counts(a.group_id for a in auctions)
+
+    settlements = [
+        AuctionSettlement(
+            auction=auction,
+            group_id=auction.group_id,
+            month_no=auction.month_no,
+            **compute_settlement(auction.group, auction.bid_amount, counts.get(auction.group_id, 0))
+        )
+        for auction in auctions
+    ]
+
+    settlements = AuctionSettlement.objects.bulk_create(
+        settlements,
+        update_conflicts=True,
+        unique_fields=['auction'],
+        update_fields=SETTLEMENT_FIELDS,
+        batch_size=500
+    )
+
+    # bulk upsert sends no signals
+    invalidate_group_snapshots(s.group_id for s in settlements)
+
+    apply_dividends(auctions)
+
+    return settlements
+
+
+def apply_dividends(auctions):
+    """
+    Set amount_due of the installments of the month after each of
+    ``auctions`` to the monthly amount less that month's settled dividends
+    (one aggregate, one read, one bulk_update). Also used when a winner
+    is cleared, so the installment goes back up.
+    Returns the number of installments updated.
+    """
+    from chitti.models import AuctionSettlement
+    from payments.models import Installment
+    from payments.services import installment_status
+
+    groups = {auction.group_id: auction.group for auction in auctions}
+    keys = {(auction.group_id, auction.month_no) for auction in auctions}
+    if not keys:
+        return 0
+
+    dividends = {
+        (group_id, month_no): total
+        for group_id, month_no, total in (
+            AuctionSettlement.objects.filter(
+                group_id__in=groups,
+                month_no__in={month_no for _, month_no in keys}
+            )
+            .values('group_id', 'month_no')
+            .annotate(total=Sum('dividend_per_member'))
+            .values_list('group_id', 'month_no', 'total')
+        )
+    }
+
+    # installment month = calendar month of start_date + month_no months
+    due = {}
+    window = Q(pk__in=[])
+    for group_id, month_no in keys:
+        group = groups[group_id]
+        month_start = (group.start_date + relativedelta(months=month_no)).replace(day=1)
+
+        due[(group_id, month_start.year, month_start.month)] = (
+            group.monthly_amount - (dividends.get((group_id, month_no)) or 0)
+        )
+        window |= Q(
+            group_id=group_id,
+            month__gte=month_start,
+            month__lt=month_start + relativedelta(months=1)
+        )
+
+    installments = list(Installment.objects.select_for_update().filter(window))
+
+    for inst in installments:
+        inst.amount_due = due[(inst.group_id, inst.month.year, inst.month.month)]
+        inst.status = installment_status(inst)
+
+    Installment.objects.bulk_update(installments, ['amount_due', 'status'], batch_size=500)
+
+    return len(installments)
+
+
+def installment_schedule(group):
+    """
+    {month_no: installment} for the whole duration: the monthly amount less
+    the dividends settled in the month before (one query).
+    """
+    dividends = dict(
+        group.settlements.values('month_no')
+        .annotate(total=Sum('dividend_per_member'))
+        .values_list('month_no', 'total')
+    )
+
+    monthly = group.monthly_amount
+
+    return {
+        month_no: monthly - (dividends.get(month_no - 1) or 0)
+        for month_no in range(1, int(group.duration_months or 0) + 1)
+    }
@@ -0,0 +1,182 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from chitti.dashboard import invalidate_owner_summary, invalidate_group_owners
+from chitti.models import ChittiGroup, ChittiMember, Auction, AuctionSettlement
+from chitti.notifications import (
+    NOTIFICATION_FIELDS,
+    is_pending_notification,
+    adjust_notifications,
+    invalidate_notifications,
+    invalidate_group_notifications,
+)
+from core.money import to_paise
+from chitti.settlements import apply_dividends, settle_auctions
+from chitti.snapshot import invalidate_group_snapshots
+from payments.models import Payment
+
+
+# -----------------------------
+# 📊 DASHBOARD CACHE INVALIDATION
+# -----------------------------
+@receiver([post_save, post_delete], sender=ChittiGroup)
+def group_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_owner_summary(instance.owner_id))
+    # owner change / delete moves the group's handovers → recount
+    transaction.on_commit(lambda: invalidate_notifications(instance.owner_id))
+    invalidate_group_snapshots([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ChittiMember)
+def chitti_member_changed(sender, instance, **kwargs):
+    invalidate_group_owners([instance.group_id])
+    invalidate_group_snapshots([instance.group_id])
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def payment_changed(sender, instance, **kwargs):
+    invalidate_group_owners([instance.group_id])
+    invalidate_group_snapshots([instance.group_id])
+
+
+@receiver([post_save, post_delete], sender=Auction)
+@receiver([post_save, post_delete], sender=AuctionSettlement)
+def auction_changed(sender, instance, **kwargs):
+    invalidate_group_snapshots([instance.group_id])
+
+
+# -----------------------------
+# 🔔 NOTIFICATION COUNTER
+# -----------------------------
+# Each Payment remembers whether it was counted when loaded; a save or
+# delete applies the difference to the owner's counter after commit.
+UNKNOWN = object()
+
+
+def _notification_state(payment):
+    """(group_id, paise) when counted, None when not."""
+    if is_pending_notification(payment) and payment.group_id:
+        return payment.group_id, to_paise(payment.amount)
+    return None
+
+
+def _apply_notification_change(old, new):
+    if old == new:
+        return
+
+    deltas = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is not None:
+            count, paise = deltas.get(state[0], (0, 0))
+            deltas[state[0]] = (count + sign, paise + sign * state[1])
+
+    owners = dict(
+        ChittiGroup.objects.filter(id__in=deltas).values_list('id', 'owner_id')
+    )
+
+    def apply():
+        for group_id, (count, paise) in deltas.items():
+            adjust_notifications(owners.get(group_id), count, paise)
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_init, sender=Payment)
+def remember_notification_state(sender, instance, **kwargs):
+    deferred = instance.get_deferred_fields()
+    if any(f in deferred for f in NOTIFICATION_FIELDS):
+        # .only()/.defer() load → reading the fields here would query
+        instance._notification_state = UNKNOWN
+    else:
+        instance._notification_state = _notification_state(instance)
+
+
+@receiver(post_save, sender=Payment)
+def update_notifications_on_save(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, '_notification_state', UNKNOWN)
+    new = _notification_state(instance)
+
+    if old is UNKNOWN:
+        invalidate_group_notifications([instance.group_id])
+    else:
+        _apply_notification_change(old, new)
+
+    instance._notification_state = new
+
+
+@receiver(post_delete, sender=Payment)
+def update_notifications_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_notification_state', UNKNOWN)
+
+    if old is UNKNOWN:
+        invalidate_group_notifications([instance.group_id])
+    else:
+        _apply_notification_change(old, None)
+
+
+# -----------------------------
+# 🎡 ELIGIBLE-WINNER POOL
+# -----------------------------
+# Auction.assign_winner keeps ChittiMember.is_eligible in step itself.
+# Winner changes made any other way (admin form, clearing a winner,
+# deleting an auction) are caught here.
+@receiver(post_init, sender=Auction)
+def remember_winner(sender, instance, **kwargs):
+    instance._loaded_winner_id = instance.__dict__.get('winner_id')
+
+
+@receiver(post_save, sender=Auction)
+def sync_winner_pool(sender, instance, **kwargs):
+    if 'winner_id' not in instance.__dict__:
+        return
+
+    old, new = getattr(instance, '_loaded_winner_id', None), instance.winner_id
+
+    if old != new:
+        if old:
+            ChittiMember.objects.filter(id=old).update(is_eligible=True, won_at_auction=None)
+        if new:
+            ChittiMember.objects.filter(id=new).update(is_eligible=False, won_at_auction=instance)
+
+    instance._loaded_winner_id = new
+
+
+@receiver(post_delete, sender=Auction)
+def release_winner(sender, instance, **kwargs):
+    if instance.__dict__.get('winner_id'):
+        ChittiMember.objects.filter(id=instance.winner_id).update(
+            is_eligible=True,
+            won_at_auction=None
+        )
+
+
+# -----------------------------
+# 🧾 AUCTION SETTLEMENT
+# -----------------------------
+# Settled figures follow the winner / bid of single saves; bulk winner
+# assignment (chitti.auctions.assign_winners) settles on its own.
+def _settlement_key(auction):
+    return auction.__dict__.get('winner_id'), auction.__dict__.get('bid_amount')
+
+
+@receiver(post_init, sender=Auction)
+def remember_settlement(sender, instance, **kwargs):
+    instance._loaded_settlement = _settlement_key(instance)
+
+
+@receiver(post_save, sender=Auction)
+def update_settlement(sender, instance, created, **kwargs):
+    if not {'winner_id', 'bid_amount'} <= instance.__dict__.keys():
+        return
+
+    key = _settlement_key(instance)
+
+    if key != getattr(instance, '_loaded_settlement', None):
+        if instance.winner_id:
+            settle_auctions([instance])
+        elif not created:
+            AuctionSettlement.objects.filter(auction=instance).delete()
+            apply_dividends([instance])
+
+    instance._loaded_settlement = key
@@ -0,0 +1,130 @@
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum, DecimalField, Value
+from django.db.models.functions import Coalesce
+
+from chitti.queries import per_group
+
+
+# =========================
+# 🧮 GROUP SNAPSHOT (CACHED)
+# =========================
+# The figures on top of view_group / GroupDetailAPIView: member count,
+# collected / pending totals, completed auctions and months, last winner
+# with its settled prize, next installment. Built with 2 queries:
+#   1. the group row annotated with correlated aggregates
+#   2. settled dividends per month (for the installment)
+# and cached per group; saves/deletes of Payment, ChittiMember, Auction,
+# AuctionSettlement and ChittiGroup drop the entry (chitti.signals).
+# Date-dependent values (end date, expired) are added on every read.
+def snapshot_key(group_id):
+    return f"group:snapshot:{group_id}"
+
+
+def build_group_snapshot(group_id):
+    from chitti.models import Auction, AuctionSettlement, ChittiGroup, ChittiMember
+    from chitti.settlements import installment_schedule
+    from payments.models import Payment
+
+    money = DecimalField(max_digits=14, decimal_places=2)
+    payments = Payment.objects.filter(payment_status='success')
+    completed = Auction.objects.filter(winner__isnull=False)
+
+    last_auction = Auction.objects.filter(
+        group=OuterRef('pk'), winner__isnull=False
+    ).order_by('-auction_date', '-id')
+
+    last_settlement = AuctionSettlement.objects.filter(
+        group=OuterRef('pk')
+    ).order_by('-auction__auction_date', '-auction_id')
+
+    group = ChittiGroup.objects.filter(pk=group_id).annotate(
+        members_count=Coalesce(per_group(ChittiMember.objects.all(), Count('id')), 0),
+        total_collected=Coalesce(
+            per_group(payments.filter(received_by_admin=True), Sum('amount')),
+            Value(0, output_field=money), output_field=money
+        ),
+        pending_total=Coalesce(
+            per_group(payments.filter(received_by_admin=False), Sum('amount')),
+            Value(0, output_field=money), output_field=money
+        ),
+        completed_count=Coalesce(per_group(completed, Count('id')), 0),
+        completed_months=Coalesce(per_group(completed, Count('month_no', distinct=True)), 0),
+        last_auction_id=Subquery(last_auction.values('id')[:1]),
+        last_winner_name=Subquery(last_auction.values('winner__member__name')[:1]),
+        last_discount=Subquery(last_settlement.values('discount')[:1]),
+        last_prize=Subquery(last_settlement.values('net_payout')[:1]),
+    ).first()
+
+    if group is None:
+        return None
+
+    installments = installment_schedule(group)
+
+    total_members = group.members_count
+    completed_months = group.completed_months
+    current_month = completed_months + 1
+
+    monthly_pot = group.monthly_amount * total_members
+    expected_total = monthly_pot * completed_months
+
+    efficiency = 0
+    if expected_total > 0:
+        efficiency = (group.total_collected / expected_total) * 100
+
+    return {
+        'group_id': group.id,
+        'total_members': total_members,
+        'monthly_pot': monthly_pot,
+        'completed_count': group.completed_count,
+        'completed_months': completed_months,
+        'current_month': current_month,
+        'remaining_months': max(0, (group.duration_months or 0) - completed_months),
+        'total_collected': group.total_collected,
+        'pending_total': group.pending_total,
+        'collection_efficiency': round(efficiency, 1),
+        'last_auction_id': group.last_auction_id,
+        'last_winner_name': group.last_winner_name,
+        'last_discount': group.last_discount or Decimal('0'),
+        'last_prize': group.last_prize or Decimal('0'),
+        'next_installment': installments.get(current_month, group.monthly_amount),
+        'base_date': group.registration_start_date or group.start_date,
+        'duration_months': group.duration_months,
+    }
+
+
+def get_group_snapshot(group):
+    """Snapshot dict for a ChittiGroup (or id), plus end_date / is_expired."""
+    group_id = getattr(group, 'pk', group)
+    key = snapshot_key(group_id)
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_group_snapshot(group_id)
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, settings.GROUP_SNAPSHOT_CACHE_TIMEOUT)
+
+    snapshot = dict(snapshot)
+    base_date = snapshot['base_date']
+
+    end_date = None
+    if base_date and snapshot['duration_months']:
+        end_date = base_date + relativedelta(months=snapshot['duration_months']) - relativedelta(days=1)
+
+    snapshot['end_date'] = end_date
+    snapshot['is_expired'] = bool(end_date and date.today() > end_date)
+
+    return snapshot
+
+
+def invalidate_group_snapshots(group_ids):
+    """Drop the snapshots of ``group_ids`` once the transaction commits."""
+    group_ids = {g for g in group_ids if g}
+    if group_ids:
+        transaction.on_commit(lambda: cache.delete_many([snapshot_key(g) for g in group_ids]))
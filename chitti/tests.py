@@ -1,3 +1,222 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import StaffProfile
+from chitti.models import Auction, ChittiGroup, ChittiMember
+from chitti.snapshot import build_group_snapshot, get_group_snapshot, snapshot_key
+from members.models import Member
+from payments.models import Installment, Payment
+
+
+# =========================
+# 🧮 GROUP SNAPSHOT QUERY BUDGET
+# =========================
+class GroupSnapshotQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        StaffProfile.objects.create(user=cls.owner, phone="9000000000", role="group_admin")
+
+        collector_user = User.objects.create_user("collector", "collector@example.com", "pw")
+        cls.collector = StaffProfile.objects.create(
+            user=collector_user, phone="9000000001", role="collector"
+        )
+
+        cls.group = ChittiGroup.objects.create(
+            name="G1",
+            owner=cls.owner,
+            monthly_amount=Decimal("1000"),
+            duration_months=12,
+            start_date=date(2026, 1, 5),
+            collector=cls.collector,
+        )
+
+        cls.members = []
+        for i in range(3):
+            user = User.objects.create_user(f"member{i}", f"member{i}@example.com", "pw")
+            member = Member.objects.create(
+                user=user, name=f"M{i}", phone=f"800000000{i}",
+                assigned_chitti_group=cls.group
+            )
+            cls.members.append(ChittiMember.objects.create(group=cls.group, member=member))
+
+        cls.group.create_auctions()
+        Auction.objects.get(group=cls.group, month_no=1).assign_winner(
+            cls.members[0], bid_amount=Decimal("300")
+        )
+
+        Payment.objects.create(
+            member=cls.members[0].member,
+            group=cls.group,
+            amount=Decimal("500"),
+            payment_status="success",
+            collected_by=cls.collector,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cold_snapshot_is_two_queries(self):
+        with self.assertNumQueries(2):
+            snapshot = build_group_snapshot(self.group.id)
+
+        self.assertEqual(snapshot["total_members"], 3)
+        self.assertEqual(snapshot["completed_months"], 1)
+        self.assertEqual(snapshot["pending_total"], Decimal("500"))
+        self.assertEqual(snapshot["last_winner_name"], "M0")
+
+    def test_warm_snapshot_is_cached(self):
+        get_group_snapshot(self.group)
+
+        with self.assertNumQueries(0):
+            snapshot = get_group_snapshot(self.group)
+
+        self.assertEqual(snapshot["total_members"], 3)
+
+    def test_view_group_queries(self):
+        self.client.force_login(self.owner)
+        url = f"/chitti/groups/view/{self.group.id}/"
+        self.client.get(url)   # warm session, notification counter, snapshot
+
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        # a cold snapshot costs its 2 queries on top
+        cache.delete(snapshot_key(self.group.id))
+        with self.assertNumQueries(9):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_group_detail_api_queries(self):
+        api = APIClient()
+        api.force_authenticate(self.owner)
+        url = f"/api/v1/admin/groups/{self.group.id}/"
+        api.get(url)
+
+        with self.assertNumQueries(4):
+            response = api.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["group"]["total_members"], 3)
+
+        cache.delete(snapshot_key(self.group.id))
+        with self.assertNumQueries(6):
+            response = api.get(url)
+        self.assertEqual(response.status_code, 200)
+
+
+# =========================
+# 🔨 AUCTION SCHEDULE EDITS
+# =========================
+class AuctionScheduleEditTests(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        StaffProfile.objects.create(user=self.owner, phone="9000000000", role="group_admin")
+
+        # two auctions a month on custom days (10th / 20th), not on start_date
+        self.group = ChittiGroup.objects.create(
+            name="G1",
+            owner=self.owner,
+            monthly_amount=Decimal("1000"),
+            duration_months=4,
+            auctions_per_month=2,
+            start_date=date(2026, 1, 1),
+        )
+        self.group.create_auctions(base_dates=[date(2026, 1, 10), date(2026, 1, 20)])
+
+    def auction_dates(self):
+        return dict(
+            ((month_no, auction_no), auction_date)
+            for month_no, auction_no, auction_date in
+            Auction.objects.filter(group=self.group).values_list('month_no', 'auction_no', 'auction_date')
+        )
+
+    def test_duration_edit_keeps_open_auction_dates(self):
+        before = self.auction_dates()
+
+        api = APIClient()
+        api.force_authenticate(self.owner)
+        response = api.put(
+            f"/api/v1/admin/groups/{self.group.id}/edit/",
+            {"duration_months": 5},
+            format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+        after = self.auction_dates()
+        self.assertEqual({key: after[key] for key in before}, before)
+        self.assertEqual(after[(5, 1)], date(2026, 5, 10))
+        self.assertEqual(after[(5, 2)], date(2026, 5, 20))
+
+    def test_start_date_edit_moves_custom_dates_along(self):
+        self.group.start_date = date(2026, 1, 3)
+        self.group.save()
+        self.group.create_auctions(previous_start=date(2026, 1, 1))
+
+        after = self.auction_dates()
+        self.assertEqual(after[(1, 1)], date(2026, 1, 12))
+        self.assertEqual(after[(1, 2)], date(2026, 1, 22))
+        self.assertEqual(after[(4, 1)], date(2026, 4, 12))
+
+
+# =========================
+# 🧾 DIVIDENDS → NEXT INSTALLMENT
+# =========================
+class SettlementInstallmentTests(TestCase):
+
+    def setUp(self):
+        owner = User.objects.create_user("owner", "owner@example.com", "pw")
+        self.group = ChittiGroup.objects.create(
+            name="G1",
+            owner=owner,
+            monthly_amount=Decimal("1000"),
+            duration_months=3,
+            start_date=date(2026, 1, 5),
+        )
+
+        self.members = []
+        for i in range(4):
+            user = User.objects.create_user(f"member{i}", f"member{i}@example.com", "pw")
+            member = Member.objects.create(user=user, name=f"M{i}", phone=f"800000000{i}")
+            self.members.append(ChittiMember.objects.create(group=self.group, member=member))
+
+            for month in (date(2026, 1, 1), date(2026, 2, 1)):
+                Installment.objects.create(
+                    member=member, group=self.group, month=month,
+                    amount_due=Decimal("1000"), amount_paid=Decimal("900") if i == 0 else 0,
+                    status="partial" if i == 0 else "pending"
+                )
+
+        self.group.create_auctions()
+
+    def test_winner_lowers_next_month_installments(self):
+        auction = Auction.objects.get(group=self.group, month_no=1)
+        auction.assign_winner(self.members[1], bid_amount=Decimal("400"))
+
+        dividend = auction.settlement.dividend_per_member
+        self.assertGreater(dividend, 0)
+
+        february = Installment.objects.filter(group=self.group, month=date(2026, 2, 1))
+        self.assertEqual({i.amount_due for i in february}, {Decimal("1000") - dividend})
+        self.assertEqual(
+            february.get(member=self.members[0].member).status,
+            "paid" if Decimal("900") >= Decimal("1000") - dividend else "partial"
+        )
+
+        # the auction month itself is not touched
+        january = Installment.objects.filter(group=self.group, month=date(2026, 1, 1))
+        self.assertEqual({i.amount_due for i in january}, {Decimal("1000")})
+
+        # clearing the winner puts the installment back
+        auction.winner = None
+        auction.bid_amount = 0
+        auction.save()
+        self.assertEqual({i.amount_due for i in february.all()}, {Decimal("1000")})
 
-# Create your tests here.
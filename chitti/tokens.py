@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+# =========================
+# 🎟️ TOKEN NUMBERS (PER-GROUP SEQUENCE)
+# =========================
+# ChittiGroup.next_token_no is the group's counter row. Allocating is one
+# UPDATE ... SET next_token_no = next_token_no + n (the row stays locked
+# until commit, so concurrent joins queue instead of colliding) and one
+# read of the new value → no MAX(token_no) scan, no IntegrityError retries.
+# A block of n tokens for a bulk import costs the same two queries.
+def allocate_tokens(group, count=1):
+    """Reserve ``count`` consecutive token numbers of ``group``; returns a range."""
+    from chitti.models import ChittiGroup
+
+    group_id = getattr(group, 'pk', group)
+
+    if count < 1:
+        raise ValueError("Token count must be at least 1")
+
+    with transaction.atomic():
+        updated = ChittiGroup.objects.filter(pk=group_id).update(
+            next_token_no=F('next_token_no') + count
+        )
+        if not updated:
+            raise ValueError("Group not found!")
+
+        end = ChittiGroup.objects.filter(pk=group_id).values_list(
+            'next_token_no', flat=True
+        ).get()
+
+    return range(end - count, end)
+
+
+def allocate_token(group):
+    """Next token number of ``group``."""
+    return allocate_tokens(group, 1)[0]
+
+
+def claim_token(group, token_no):
+    """
+    Keep the counter ahead of a hand-picked token (admin / form entry),
+    so the sequence never hands it out again.
+    """
+    from chitti.models import ChittiGroup
+
+    ChittiGroup.objects.filter(pk=getattr(group, 'pk', group)).update(
+        next_token_no=Greatest(F('next_token_no'), token_no + 1)
+    )
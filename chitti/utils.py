@@ -1,4 +1,5 @@
 from django.db.models import Sum
+from django.db.models.functions import TruncMonth
 from dateutil.relativedelta import relativedelta
 
 
@@ -24,6 +25,20 @@ def get_month_index(group, year, month):
 
 
 
+def _month_status_row(group, month_index, paid):
+    if paid >= group.monthly_amount:
+        status = "Completed"
+    else:
+        status = "Pending"
+
+    return {
+        'month_index': month_index,
+        'paid': paid,
+        'due': max(group.monthly_amount - paid, 0),
+        'status': status
+    }
+
+
 def get_member_month_status(chitti_member, year, month):
     from payments.models import Payment  # circular avoid
 
@@ -41,36 +56,89 @@ def get_member_month_status(chitti_member, year, month):
         payment_status='success'
     ).aggregate(total=Sum('amount'))['total'] or 0
 
-    if paid >= group.monthly_amount:
-        status = "Completed"
-    else:
-        status = "Pending"
+    return _month_status_row(group, month_index, paid)
+
+
+# -----------------------------
+# 🔁 BULK ROTATION (ONE QUERY)
+# -----------------------------
+def get_month_totals(chitti_members):
+    """
+    {(member_id, group_id, first_day_of_month): total} for all the given
+    ChittiMembers, from a single TruncMonth group-by query.
+    """
+    from payments.models import Payment  # circular avoid
+
+    chitti_members = list(chitti_members)
+    if not chitti_members:
+        return {}
+
+    rows = (
+        Payment.objects.filter(
+            member_id__in={cm.member_id for cm in chitti_members},
+            group_id__in={cm.group_id for cm in chitti_members},
+            payment_status='success'
+        )
+        .annotate(month=TruncMonth('paid_date'))
+        .values('member_id', 'group_id', 'month')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
 
     return {
-        'month_index': month_index,
-        'paid': paid,
-        'due': max(group.monthly_amount - paid, 0),
-        'status': status
+        (row['member_id'], row['group_id'], row['month']): row['total']
+        for row in rows
     }
 
 
-def get_full_rotation(chitti_member):
-    group = chitti_member.group
-    result = []
+def get_full_rotations(chitti_members):
+    """
+    Bulk get_full_rotation: {chitti_member.id: [month rows]} with one
+    Payment query for all members (pass select_related('group') rows).
+    """
+    chitti_members = list(chitti_members)
+    totals = get_month_totals(chitti_members)
 
-    current = group.start_date
+    rotations = {}
+
+    for cm in chitti_members:
+        group = cm.group
+        result = []
+
+        current = group.start_date.replace(day=1)
+
+        for month_index in range(1, group.duration_months + 1):
+            paid = totals.get((cm.member_id, group.id, current), 0)
 
-    for _ in range(group.duration_months):
-        status = get_member_month_status(
-            chitti_member,
-            current.year,
-            current.month
-        )
-        if status:
             result.append({
                 'month': current.strftime('%B %Y'),
-                **status
+                **_month_status_row(group, month_index, paid)
             })
+            current += relativedelta(months=1)
+
+        rotations[cm.id] = result
+
+    return rotations
+
+
+def get_group_rotation_grid(group):
+    """
+    "Who paid which month" matrix for a whole group in O(1) queries:
+    (month labels, [(chitti_member, [month rows])]) ordered by token.
+    """
+    chitti_members = list(
+        group.chitti_members.select_related('member', 'group').order_by('token_no')
+    )
+    rotations = get_full_rotations(chitti_members)
+
+    months = []
+    current = group.start_date
+    for _ in range(group.duration_months):
+        months.append(current.strftime('%B %Y'))
         current += relativedelta(months=1)
 
-    return result
+    return months, [(cm, rotations[cm.id]) for cm in chitti_members]
+
+
+def get_full_rotation(chitti_member):
+    return get_full_rotations([chitti_member])[chitti_member.id]
@@ -25,7 +25,17 @@ from dateutil.relativedelta import relativedelta
 from subscriptions.utils import can_create_group, get_effective_subscription
 from datetime import date
 from payments.models import Payment 
-from django.db.models import Sum
+from payments.services import approve_payments, reject_payments
+from payments.queries import group_payment_totals, group_pages, parse_page_size
+from chitti.notifications import invalidate_notifications
+from chitti.snapshot import get_group_snapshot
+from chitti.queries import group_listing_page
+from chitti.hierarchy import owner_group_tree
+from chitti.auctions import (
+    schedule_signature, auction_month_grid,
+    eligible_members as eligible_pool, pick_eligible_member, assign_winners
+)
+from django.db.models import Sum, Max
 from datetime import timedelta
 
 
@@ -56,42 +66,22 @@ def currency(amount):
 @login_required
 def group_management(request):
 
-    groups = ChittiGroup.objects.filter(owner=request.user).prefetch_related('auctions')
+    after = request.GET.get('after')
 
-    if not groups.exists():
-        return redirect('chitti:create_group')
-
-    updated_groups = []
-
-    for group in groups:
-
-        # ✅ BASE START
-        base_start = group.registration_start_date or group.start_date
-
-        # ✅ FIX END DATE
-        end_date = None
-        if base_start and group.duration_months:
-            end_date = base_start + relativedelta(months=group.duration_months) - relativedelta(days=1)
-
-        # ✅ EXPIRED CHECK
-        is_expired = end_date and date.today() > end_date
-
-        # ✅ GET FIRST AUCTION (CORRECT)
-        first_auction = group.auctions.all().order_by('auction_date').first()
-
-        # ✅ ATTACH VALUES
-        group.end_date_calculated = end_date
-        group.is_expired = is_expired
-        group.first_auction_date = first_auction.auction_date if first_auction else None
-
-        # ✅ DAYS LEFT
-        if group.start_date:
-            group.days_until_first_auction = (group.start_date - date.today()).days
+    # ✅ One annotated query per page (end date, first auction, members,
+    #    last winner, collected total all computed by the database)
+    groups, next_cursor = group_listing_page(
+        request.user,
+        after=after,
+        limit=parse_page_size(request.GET.get('page_size'))
+    )
 
-        updated_groups.append(group)
+    if not groups and not after:
+        return redirect('chitti:create_group')
 
     return render(request, 'chitti/group_management.html', {
-        'groups': updated_groups
+        'groups': groups,
+        'next_cursor': next_cursor,
     })
 @login_required
 @transaction.atomic
@@ -279,84 +269,48 @@ def view_group(request, group_id):
         owner=request.user
     )
 
-    # 2. Members & Auctions
-    members = group.chitti_members.all()
-    total_members = members.count()
-
-    auctions = group.auctions.select_related('winner').all().order_by('month_no', 'auction_no')
-
-    # 3. Financial Tracking
-    payments = Payment.objects.filter(group=group, payment_status='success')
-    
-    total_collected = payments.filter(received_by_admin=True).aggregate(
-        total=Sum('amount'))['total'] or 0
-        
-    pending_total = payments.filter(received_by_admin=False).aggregate(
-        total=Sum('amount'))['total'] or 0
+    # 2. Members & Auctions (settlement joined in)
+    members = group.chitti_members.select_related('member').prefetch_related('payments')
 
-    # 4. Pot Logic
-    monthly_pot = group.monthly_amount * total_members
+    auctions = group.auctions.select_related(
+        'winner__member', 'settlement'
+    ).order_by('month_no', 'auction_no')
 
-    # 5. Progress Tracking
-    completed_auctions = auctions.filter(winner__isnull=False)
-    completed_count = completed_auctions.count()
+    # 3. Figures (cached snapshot: counts, totals, last winner, installment)
+    snapshot = get_group_snapshot(group)
+    monthly_pot = snapshot['monthly_pot']
 
-    completed_months = completed_auctions.values('month_no').distinct().count()
-    
-    current_month = completed_months + 1
-    remaining_months = max(0, (group.duration_months or 0) - completed_months)
-
-    # 6. Prize Calculation
+    # 4. Prize (settled figures, frozen at winner assignment)
     for auction in auctions:
-        discount = auction.bid_amount or 0
-        auction.calculated_prize = monthly_pot - discount
-
-    # ✅ FIXED LAST AUCTION (SAFE)
-    last_auction = completed_auctions.order_by('auction_date').last()
-
-    last_winner = last_auction.winner if last_auction else None
-    last_discount = last_auction.bid_amount if last_auction else 0
-    last_prize = (monthly_pot - last_discount) if last_auction else 0
+        auction.settled = getattr(auction, 'settlement', None)
+        if auction.settled:
+            auction.calculated_prize = auction.settled.net_payout
+        else:
+            auction.calculated_prize = monthly_pot - (auction.bid_amount or 0)
 
-    # 8. Date Logic
-    base_date = group.registration_start_date or group.start_date
-    
-    end_date = None
-    is_expired = False
-    
-    if base_date and group.duration_months:
-        # ✅ FIXED END DATE
-        end_date = base_date + relativedelta(months=group.duration_months) - relativedelta(days=1)
-        is_expired = date.today() > end_date
-
-    # 9. Efficiency
-    expected_total = group.monthly_amount * total_members * completed_months
-    efficiency = 0
-    if expected_total > 0:
-        efficiency = (total_collected / expected_total) * 100
-
-    # 10. Context
+    # 5. Context
     context = {
         'group': group,
         'members': members,
         'auctions': auctions,
 
-        'total_members': total_members,
+        'total_members': snapshot['total_members'],
         'monthly_pot': monthly_pot,
-        'current_month': current_month,
-        'completed_months': completed_months,
-        'remaining_months': remaining_months,
+        'current_month': snapshot['current_month'],
+        'completed_months': snapshot['completed_months'],
+        'remaining_months': snapshot['remaining_months'],
 
-        'last_winner': last_winner,
-        'last_prize': last_prize,
-        'last_discount': last_discount,
+        'last_winner': snapshot['last_winner_name'],
+        'last_prize': snapshot['last_prize'],
+        'last_discount': snapshot['last_discount'],
+        'next_installment': snapshot['next_installment'],
 
-        'total_collected': total_collected,
-        'pending_total': pending_total,  
-        'collection_efficiency': round(efficiency, 1),
+        'total_collected': snapshot['total_collected'],
+        'pending_total': snapshot['pending_total'],
+        'collection_efficiency': snapshot['collection_efficiency'],
 
-        'end_date': end_date,
-        'is_expired': is_expired,
+        'end_date': snapshot['end_date'],
+        'is_expired': snapshot['is_expired'],
         'today': date.today(),
     }
 
@@ -389,6 +343,8 @@ def edit_group(request, group_id):
     group = get_object_or_404(ChittiGroup, id=group_id, owner=request.user)
 
     if request.method == 'POST':
+        schedule_before = schedule_signature(group)
+        start_before = group.start_date
         try:
             group.name = request.POST.get('name', group.name)
             group.monthly_amount = Decimal(request.POST.get('monthly_amount', group.monthly_amount))
@@ -406,6 +362,11 @@ def edit_group(request, group_id):
             group.total_amount = group.monthly_amount * group.duration_months
 
             group.save()
+
+            # 🔨 dates / duration changed → upsert only what moved
+            if schedule_signature(group) != schedule_before:
+                group.create_auctions(previous_start=start_before)
+
             messages.success(request, "Group updated successfully!")
             return redirect('chitti:group_management')
 
@@ -701,43 +662,8 @@ def auction_list_group_view(request, group_id):
         owner=request.user
     )
 
-    months = []
-
-    auction_type = group.auction_type
-
-    # ✅ correct field name
-    interval_months = int(getattr(group, "auction_interval_months", 1) or 1)
-
-    auctions = group.auctions.all()
-
-    for i in range(1, group.duration_months + 1):
-
-        month_date = group.start_date + relativedelta(months=i-1)
-
-        month_data = {
-            'month_no': i,
-            'auctions': [],
-            'is_auction_month': True,
-            'auto_date': None
-        }
-
-        # 🔴 INTERVAL LOGIC
-        if auction_type == "interval":
-            if (i - 1) % interval_months != 0:
-                month_data['is_auction_month'] = False
-                months.append(month_data)
-                continue
-
-        # 🟢 GET AUCTIONS
-        month_auctions = auctions.filter(month_no=i).order_by('auction_no')
-
-        if month_auctions.exists():
-            month_data['auctions'] = month_auctions
-        else:
-            # 🔥 auto date only for valid auction months
-            month_data['auto_date'] = month_date
-
-        months.append(month_data)
+    # 🗓️ all months (interval gaps + auto dates) from one query
+    months = auction_month_grid(group)
 
     return render(request, 'chitti/auction_list_group.html', {
         'group': group,
@@ -884,22 +810,9 @@ def auction_spin_view(request, auction_id):
         return redirect('chitti:auction_detail', auction_id=auction.id)
 
     # =========================
-    # 👥 ALL MEMBERS
+    # ✅ ELIGIBLE MEMBERS (not won yet)
     # =========================
-    all_members = ChittiMember.objects.filter(group=auction.group)
-
-    # =========================
-    # 🏆 PREVIOUS WINNERS
-    # =========================
-    previous_winners = Auction.objects.filter(
-        group=auction.group,
-        winner__isnull=False
-    ).exclude(id=auction.id).values_list('winner_id', flat=True)
-
-    # =========================
-    # ✅ ELIGIBLE MEMBERS
-    # =========================
-    eligible_members = all_members.exclude(id__in=previous_winners)
+    eligible_members = eligible_pool(auction.group_id)
 
     # =========================
     # 🚫 NO MEMBERS CHECK
@@ -942,34 +855,25 @@ def assign_winner_ajax(request, auction_id):
 
     member_id = request.POST.get('member_id')
     
-    # 🔹 Get currently eligible members
-    all_members = ChittiMember.objects.filter(group=auction.group)
-    previous_winners = Auction.objects.filter(
-        group=auction.group, 
-        winner__isnull=False
-    ).values_list('winner_id', flat=True)
-    
-    eligible_members = all_members.exclude(id__in=previous_winners)
-
-    if not eligible_members.exists():
-        return JsonResponse({'success': False, 'error': 'No eligible members left'}, status=400)
-
-    # 🔹 Winner Selection
+    # 🔹 Winner Selection (from the eligible pool)
     if member_id:
         try:
             # Ensure the selected member is actually eligible
-            winner = eligible_members.get(id=member_id)
-        except ChittiMember.DoesNotExist:
+            winner = eligible_pool(auction.group_id).get(id=member_id)
+        except (ChittiMember.DoesNotExist, ValueError):
             return JsonResponse({'success': False, 'error': 'Member is already a winner or invalid'}, status=400)
     else:
         # Fallback to random if JS fails to send ID
-        import random
-        winner = random.choice(list(eligible_members))
+        winner = pick_eligible_member(auction.group_id)
 
-    # ✅ Assign and Save
-    auction.assign_winner(winner, bid_amount=0)
-    auction.is_closed = True
-    auction.save()
+        if winner is None:
+            return JsonResponse({'success': False, 'error': 'No eligible members left'}, status=400)
+
+    # ✅ Assign and Save (locks the auction, takes the member out of the pool)
+    try:
+        auction.assign_winner(winner, bid_amount=0)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
     return JsonResponse({
         'success': True,
@@ -1014,45 +918,20 @@ def assign_all_winners_ajax(request, auction_id):
     try:
         data = json.loads(request.body)
         winners_list = data.get('winners', [])
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
 
-        if not winners_list:
-            return JsonResponse({'success': False, 'error': 'No winner data received'}, status=400)
-
-        with transaction.atomic():
-            for item in winners_list:
-                month_num = int(item.get('month'))
-                member_id = item.get('id')
-                
-                # Get the member object
-                winner_member = ChittiMember.objects.get(id=member_id, group=group)
-
-                # 2. Get or Create the auction record for that specific month
-                # Note: We use 'month_no' as per your model
-                auction, created = Auction.objects.get_or_create(
-                    group=group, 
-                    month_no=month_num,
-                    auction_no=1, # Defaulting to 1 as per your model
-                    defaults={
-                        # Calculate a future date if creating a new month record
-                        'auction_date': initial_auction.auction_date + timedelta(days=30 * (month_num - initial_auction.month_no)),
-                        'selection_type': 'manual', 
-                    }
-                )
+    if not winners_list:
+        return JsonResponse({'success': False, 'error': 'No winner data received'}, status=400)
 
-                # 3. Assign the winner using your model's method
-                # This method handles self.winner assignment and self.save()
-                if not auction.is_closed:
-                    auction.assign_winner(winner_member, bid_amount=0)
+    # 2. Validate + assign the whole roster at once
+    ok, results = assign_winners(group, winners_list)
 
-        return JsonResponse({'success': True})
+    if not ok:
+        error = next(r['error'] for r in results if r['error'])
+        return JsonResponse({'success': False, 'error': error, 'results': results}, status=400)
 
-    except ChittiMember.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Member not found'}, status=404)
-    except ValueError as e:
-        # This catches "Member already won!" or "Auction already closed!" from your model
-        return JsonResponse({'success': False, 'error': str(e)}, status=400)
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': "Unexpected error: " + str(e)}, status=500)
+    return JsonResponse({'success': True, 'results': results})
     
 
 
@@ -1082,63 +961,35 @@ def manual_auction_select_winner(request, group_id):
     members = ChittiMember.objects.filter(group=group).select_related('member')
 
     # ✅ last completed auction
-    last_auction = Auction.objects.filter(
+    last_month = Auction.objects.filter(
         group=group,
         winner__isnull=False   # 🔥 FIXED
-    ).order_by('-month_no').first()
+    ).aggregate(Max('month_no'))['month_no__max']
 
-    if last_auction:
-        current_installment = last_auction.month_no + 1
-    else:
-        current_installment = 1
+    current_installment = (last_month or 0) + 1
 
-    # ✅ previous winners
+    # ✅ previous winners (out of the eligible pool)
     previous_winner_ids = list(
-        Auction.objects.filter(
-            group=group,
-            winner__isnull=False   # 🔥 FIXED
-        ).values_list('winner_id', flat=True)
+        members.filter(is_eligible=False).values_list('id', flat=True)
     )
 
     if request.method == "POST":
         try:
             data = json.loads(request.body)
             winner_list = data.get('winners', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'Invalid JSON'})
 
-            if not winner_list:
-                return JsonResponse({'success': False, 'error': 'No data received'})
+        if not winner_list:
+            return JsonResponse({'success': False, 'error': 'No data received'})
 
-            with transaction.atomic():
+        ok, results = assign_winners(group, winner_list)
 
-                for item in winner_list:
-                    month_no = int(item['month'])
-                    member_id = item['id']
+        if not ok:
+            error = next(r['error'] for r in results if r['error'])
+            return JsonResponse({'success': False, 'error': error, 'results': results})
 
-                    # ✅ prevent duplicate
-                    if member_id in previous_winner_ids:
-                        raise ValueError("Member already won!")
-
-                    winner_member = ChittiMember.objects.get(id=member_id, group=group)
-
-                    auction, created = Auction.objects.get_or_create(
-                        group=group,
-                        month_no=month_no,
-                        defaults={
-                            'selection_type': 'manual',
-                            'auction_date': timezone.now()
-                        }
-                    )
-
-                    # ✅ prevent overwrite
-                    if auction.winner:
-                        raise ValueError(f"Month {month_no} already has winner!")
-
-                    auction.assign_winner(winner_member, bid_amount=0)
-
-            return JsonResponse({'success': True})
-
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': str(e)})
+        return JsonResponse({'success': True, 'results': results})
 
     context = {
         'group': group,
@@ -1210,9 +1061,7 @@ def admin_pending_payments(request):
         groups = ChittiGroup.objects.all()
 
     elif staff.role == 'group_admin':
-        main_groups = ChittiGroup.objects.filter(owner=staff.user)
-        sub_groups = ChittiGroup.objects.filter(parent_group__in=main_groups)
-        groups = (main_groups | sub_groups).distinct()
+        groups = owner_group_tree(staff.user)
 
     else:
         messages.error(request, "You are not authorized")
@@ -1224,35 +1073,37 @@ def admin_pending_payments(request):
         collected_by__isnull=False,
         collected_by__role='collector',
         sent_to_admin=True
-    ).select_related('member', 'group', 'collected_by') \
-     .order_by('-paid_date', '-id')
+    )
 
-    payments_by_group = defaultdict(list)
+    # ✅ totals/counts per group & status → one grouped query
+    totals = group_payment_totals(payments)
+    group_map = ChittiGroup.objects.in_bulk([row['group_id'] for row in totals])
 
-    for payment in payments:
-        payments_by_group[payment.group].append(payment)
+    # ✅ only pending rows are listed (verify tray), keyset paged
+    pages = group_pages(
+        payments.filter(admin_status='pending').select_related('member', 'collected_by'),
+        limit=parse_page_size(request.GET.get('page_size')),
+        group_id=request.GET.get('group'),
+        cursor=request.GET.get('after')
+    )
 
     group_list = []
 
-    for group, group_payments in payments_by_group.items():
-
-        pending = [p for p in group_payments if p.admin_status == 'pending']
-        approved = [p for p in group_payments if p.admin_status == 'approved']
-        rejected = [p for p in group_payments if p.admin_status == 'rejected']
+    for row in totals:
+        pending, next_cursor = pages.get(row['group_id'], ([], None))
 
         group_list.append({
-            'group': group,
+            'group': group_map[row['group_id']],
             'pending_payments': pending,
-            'approved_payments': approved,
-            'rejected_payments': rejected,   # 🔥 ADDED
+            'next_cursor': next_cursor,
 
-            'total_pending': sum(p.amount for p in pending),
-            'total_approved': sum(p.amount for p in approved),
-            'total_rejected': sum(p.amount for p in rejected),  # 🔥 ADDED
+            'total_pending': row['total_pending'],
+            'total_approved': row['total_approved'],
+            'total_rejected': row['total_rejected'],  # 🔥 ADDED
 
-            'count_pending': len(pending),
-            'count_approved': len(approved),
-            'count_rejected': len(rejected),  # 🔥 ADDED
+            'count_pending': row['count_pending'],
+            'count_approved': row['count_approved'],
+            'count_rejected': row['count_rejected'],  # 🔥 ADDED
         })
 
     return render(request, 'chitti/admin_pending_payments.html', {
@@ -1354,15 +1205,10 @@ def admin_approve_payment_group(request, group_id):
         sent_to_admin=True
     )
 
-    total = payments.aggregate(total=Sum('amount'))['total'] or 0
+    # ⚡ bulk approve + FIFO allocation (constant queries)
+    count, total = approve_payments(payments)
 
     if total > 0:
-
-        for p in payments:
-            p.admin_status = 'approved'
-            p.save()
-            p.allocate_payment()
-
         messages.success(request, f"All ₹{total} approved & added")
 
     return redirect('chitti:admin_pending_payments')
@@ -1382,10 +1228,8 @@ def admin_reject_payment_group(request, group_id):
         sent_to_admin=True
     )
 
-    total = payments.aggregate(total=Sum('amount'))['total'] or 0
-
-    if total > 0:
-        payments.update(admin_status='rejected')
+    # ⚡ bulk reject (reverses any allocation, resyncs ledger)
+    reject_payments(payments)
 
     return redirect('chitti:admin_pending_payments')
 
@@ -1416,12 +1260,18 @@ def group_admin_notifications(request):
         'total_pending_count': 0
     }
 
+@login_required
+@group_admin_required
 def clear_all_notifications(request):
     # Admin ippo kandu kondirikkunna ella pending notifications-um 'seen' aayi mark cheyyunnu
     Payment.objects.filter(
+        group__owner=request.user,
         sent_to_admin=True,
         admin_status='pending',
         is_seen=False
     ).update(is_seen=True)
+
+    # 🔔 .update() skips signals → recount this admin's counter
+    invalidate_notifications(request.user.id)
     
     return redirect(request.META.get('HTTP_REFERER', '/'))
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     AddCollectionAPIView,
+    BulkCollectionAPIView,
     CollectorDashboardAPIView,
     CollectorProfileAPIView,
     ListMembersAPIView,
@@ -21,6 +22,7 @@ urlpatterns = [
     path('collector/list-members/', ListMembersAPIView.as_view(), name='collector-list-members'),
     path("collector/members/<int:member_id>/history/", MemberHistoryAPIView.as_view(), name="member-history-api"),
     path("collector/add-collection/", AddCollectionAPIView.as_view(), name="api_add_collection"),
+    path("collector/collections/bulk/", BulkCollectionAPIView.as_view(), name="api_bulk_collections"),
     path("collector/today-collections/", TodayCollectionsAPIView.as_view(), name="api_today_collections"),
     path("collector/pending-members/", PendingMembersAPIView.as_view(), name="collector-pending-members"),
 
@@ -7,7 +7,17 @@ from rest_framework.generics import ListAPIView
 from chitti.models import ChittiGroup, ChittiMember
 from collectors.api.v1.pagination import CollectorPagination
 from collectors.api.v1.serializers import AssignedMemberSerializer
-from payments.models import Payment
+from payments.models import Payment, MemberBalance
+from payments.services import (
+    COUNTED_PAYMENTS, get_balance_map, get_balance, get_member_balance, lock_member_balance,
+    balance_keys, refresh_member_balances
+)
+from payments.queries import group_payment_totals, group_pages, parse_page_size
+from payments.api.v1.pagination import OptInPaymentCursorPagination
+from payments.collections import MAX_BATCH_SIZE, record_collections
+from core.idempotency import idempotent
+from chitti.schedule import PaymentSchedule, collector_month_status
+from chitti.notifications import invalidate_group_notifications
 from members.models import Member
 from accounts.models import StaffProfile
 from django.db.models import Q
@@ -16,6 +26,7 @@ from django.shortcuts import get_object_or_404
 from datetime import datetime
 from decimal import Decimal
 from rest_framework import status
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from collections import defaultdict
@@ -60,10 +71,10 @@ class CollectorDashboardAPIView(APIView):
         # =========================
         # ACTIVE MEMBERS
         # =========================
-        active_members = Member.objects.filter(
-            collections__collected_by=collector,
-            collections__payment_status='success'
-        ).distinct().count()
+        active_members = MemberBalance.objects.filter(
+            group__collector=collector,
+            total_paid__gt=0
+        ).values('member').distinct().count()
 
         # =========================
         # RECENT PAYMENTS
@@ -132,63 +143,40 @@ class MemberHistoryAPIView(APIView):
             assigned_chitti_group__collector=staff
         )
 
+        # ✅ same payments the ledger counts (rejected ones are left out)
         payments = Payment.objects.filter(
-            member=member,
-            payment_status='success'
-        ).order_by('-paid_date')
+            COUNTED_PAYMENTS,
+            member=member
+        ).select_related('collected_by__user')
 
-        total_paid = payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        # ✅ keyset page on ?cursor=&page_size=, every payment without them
+        paginator = OptInPaymentCursorPagination()
+        page = paginator.paginate_queryset(payments, request, view=self)
+        paged = page is not None
+        if not paged:
+            page = payments.order_by('-paid_date', '-id')
 
         group = member.assigned_chitti_group
 
-        start_date = group.start_date if group.start_date else current_date
+        # ✅ ledger (no aggregate over payments)
+        balance = get_member_balance(member, group)
+        total_paid = balance.total_paid
 
         total_months = group.duration_months
-        monthly_amount = float(group.monthly_amount)
-        total_kuri_amount = float(group.total_amount) if group.total_amount else (monthly_amount * total_months)
-
-        temp_total_paid = float(total_paid)
-        pending_amount = max(total_kuri_amount - temp_total_paid, 0)
-
-        # ✅ Month-wise status
-        month_status = []
-
-        for i in range(1, total_months + 1):
-
-            target = monthly_amount
-            received = 0
-            remaining = target
+        monthly_amount = group.monthly_amount
+        total_kuri_amount = group.total_amount if group.total_amount else (monthly_amount * total_months)
 
-            month_due_date = start_date + timedelta(days=30 * (i - 1))
-            is_future_month = month_due_date > current_date
+        pending_amount = max(total_kuri_amount - total_paid, 0)
 
-            if temp_total_paid >= target:
-                received = target
-                remaining = 0
-                status = "Advance" if is_future_month else "Full Paid"
-                temp_total_paid -= target
-
-            elif temp_total_paid > 0:
-                received = temp_total_paid
-                remaining = target - received
-                status = "Partial"
-                temp_total_paid = 0
-
-            else:
-                status = "Pending"
-
-            month_status.append({
-                "month": i,
-                "target": target,
-                "received": received,
-                "remaining": remaining,
-                "status": status
-            })
+        # ✅ Month-wise status (shared schedule engine)
+        month_status = collector_month_status(
+            PaymentSchedule.from_total(group, total_paid)
+        )
 
         # ✅ Payment list
         payment_data = []
 
-        for payment in payments:
+        for payment in page:
 
             collected_by = None
 
@@ -208,7 +196,7 @@ class MemberHistoryAPIView(APIView):
                 "collected_by": collected_by
             })
 
-        return Response({
+        data = {
             "member": {
                 "id": member.id,
                 "name": getattr(member, "name", None),
@@ -220,10 +208,16 @@ class MemberHistoryAPIView(APIView):
                 "total_kuri_amount": total_kuri_amount,
                 "total_paid": total_paid,
                 "pending_amount": pending_amount,
+                "months_covered": balance.months_covered,
+                "last_payment_date": balance.last_payment_date,
             },
             "month_status": month_status,  # ✅ NEW
-            "payments": payment_data
-        })
+            "payments": payment_data,
+        }
+        if paged:
+            data["pagination"] = paginator.page_info()
+
+        return Response(data)
 
 # ==================================================
 # ➕ Add Collection API (Collector)
@@ -232,6 +226,8 @@ class AddCollectionAPIView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent  # 🔁 retried POST (Idempotency-Key) → stored response
+    @transaction.atomic
     def post(self, request):
         try:
             staff = request.user.staffprofile
@@ -301,30 +297,12 @@ class AddCollectionAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # -----------------------------
-        # ✅ Duplicate check (same day)
-        # -----------------------------
-        if Payment.objects.filter(
-            member=member,
-            group=group,
-            paid_date=paid_date,
-            payment_status='success'
-        ).exists():
-            return Response(
-                {"error": "Already payment exists for this date"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         # -----------------------------
         # ✅ LIMIT CHECK (IMPORTANT 🔥)
         # -----------------------------
         full_total_amount = Decimal(group.monthly_amount) * group.duration_months
 
-        actual_paid = Payment.objects.filter(
-            member=member,
-            group=group,
-            payment_status='success'
-        ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+        actual_paid = lock_member_balance(member, group).total_paid
 
         if actual_paid + amount > full_total_amount:
             remaining = full_total_amount - actual_paid
@@ -362,6 +340,48 @@ class AddCollectionAPIView(APIView):
 
 
 
+# ==================================================
+# 📲 Bulk Collection Sync API (Collector app, offline queue)
+# ==================================================
+class BulkCollectionAPIView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            staff = request.user.staffprofile
+        except StaffProfile.DoesNotExist:
+            return Response(
+                {"error": "Staff profile not found"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        items = request.data.get("collections")
+
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "collections must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(items) > MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"At most {MAX_BATCH_SIZE} collections per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = record_collections(staff, items)
+
+        summary = {"created": 0, "duplicate": 0, "error": 0}
+        for result in results:
+            summary[result["status"]] += 1
+
+        return Response(
+            {"summary": summary, "results": results},
+            status=status.HTTP_201_CREATED if summary["created"] else status.HTTP_200_OK
+        )
+
+
 # -----------------------------
 # 📤 Send Payments to Admin API
 # -----------------------------
@@ -396,12 +416,17 @@ class SendToAdminAPIView(APIView):
             total=Sum('amount')
         )['total'] or 0
 
+        group_ids = set(payments.values_list('group_id', flat=True))
+
         # ✅ Mark as sent
         payments.update(
             sent_to_admin=True,
             admin_status='pending'
         )
 
+        # 🔔 .update() skips signals → recount admin notifications
+        invalidate_group_notifications(group_ids)
+
         return Response({
             "message": "Payments sent to admin successfully ✅",
             "total_amount": float(total_amount),
@@ -472,6 +497,8 @@ class ResendGroupPaymentsAPIView(APIView):
 
         count = payments.count()
 
+        keys = balance_keys(payments)
+
         # ⚡ Bulk update (fast)
         payments.update(
             admin_status='pending',
@@ -479,6 +506,10 @@ class ResendGroupPaymentsAPIView(APIView):
             received_by_admin=False
         )
 
+        # 📒 .update() skips signals → resync ledger, recount admin notifications
+        refresh_member_balances(keys)
+        invalidate_group_notifications([group_id])
+
         return Response({
             "message": "All rejected payments resent successfully ✅",
             "total_resent": count
@@ -497,25 +528,36 @@ class TodayCollectionsAPIView(APIView):
             collected_by=staff,
             paid_date=date.today(),
             payment_status='success'
-        ).order_by('-id')
+        ).select_related('member')
 
         total_collected = payments.aggregate(total=Sum('amount'))['total'] or 0
 
+        # keyset page on ?cursor=&page_size=, every payment without them
+        paginator = OptInPaymentCursorPagination()
+        page = paginator.paginate_queryset(payments, request, view=self)
+        paged = page is not None
+        if not paged:
+            page = payments.order_by('-id')
+
         payment_data = [
             {
                 "id": p.id,
-                "member": p.member.name if p.member else None,  
+                "member": p.member.name if p.member else None,
                 "amount": float(p.amount),
                 "payment_method": p.payment_method,
                 "paid_date": p.paid_date,
             }
-            for p in payments
+            for p in page
         ]
 
-        return Response({
-            "total_collected": total_collected,
-            "payments": payment_data
-        })
+        data = {
+            "total_collected": float(total_collected),
+            "payments": payment_data,
+        }
+        if paged:
+            data["pagination"] = paginator.page_info()
+
+        return Response(data)
     
 
 class AllCollectionsAPIView(APIView):
@@ -528,45 +570,30 @@ class AllCollectionsAPIView(APIView):
         payments = Payment.objects.filter(
             collected_by=staff,
             payment_status='success'
-        ).select_related('member', 'group').order_by('-paid_date')
+        )
 
-        payments_by_group = defaultdict(list)
+        # 🔹 Totals per group (single grouped query)
+        totals = group_payment_totals(payments)
+        groups = ChittiGroup.objects.in_bulk([row['group_id'] for row in totals])
 
-        # 🔹 Group payments
-        for payment in payments:
-            payment.is_today = (payment.paid_date == today)
-            payments_by_group[payment.group].append(payment)
+        # 🔹 Rows → keyset pages (?group_id=&cursor=&page_size=)
+        pages = group_pages(
+            payments.select_related('member'),
+            limit=parse_page_size(request.query_params.get('page_size')),
+            group_id=request.query_params.get('group_id'),
+            cursor=request.query_params.get('cursor')
+        )
 
         group_list = []
 
-        for group, group_payments in payments_by_group.items():
-
-            total_collector = sum(p.amount for p in group_payments)
-
-            total_admin = sum(
-                p.amount for p in group_payments
-                if p.received_by_admin
-            )
-
-            sent = sum(
-                p.amount for p in group_payments
-                if p.sent_to_admin
-            )
+        for row in totals:
+            group = groups[row['group_id']]
+            group_payments, next_cursor = pages.get(group.id, ([], None))
 
-            draft = sum(
-                p.amount for p in group_payments
-                if not p.sent_to_admin
-            )
-
-            pending = sent - total_admin
+            pending = row['total_sent'] - row['total_received']
             if pending < 0:
                 pending = 0
 
-            has_rejected = any(
-                p.admin_status == "rejected"
-                for p in group_payments
-            )
-
             # 🔥 Serialize payments
             payments_data = []
             for p in group_payments:
@@ -575,7 +602,7 @@ class AllCollectionsAPIView(APIView):
                     "member_name": p.member.name if p.member else None,
                     "amount": float(p.amount),
                     "paid_date": p.paid_date,
-                    "is_today": p.is_today,
+                    "is_today": p.paid_date == today,
                     "sent_to_admin": p.sent_to_admin,
                     "received_by_admin": p.received_by_admin,
                     "admin_status": p.admin_status
@@ -584,12 +611,14 @@ class AllCollectionsAPIView(APIView):
             group_list.append({
                 "group_id": group.id,
                 "group_name": group.name,
-                "total_collector": float(total_collector),
-                "total_admin": float(total_admin),
+                "total_collector": float(row['total_total']),
+                "total_admin": float(row['total_received']),
                 "pending": float(pending),
-                "not_sent": float(draft),
-                "has_rejected": has_rejected,
-                "payments": payments_data
+                "not_sent": float(row['total_draft']),
+                "has_rejected": row['count_rejected'] > 0,
+                "payment_count": row['count_total'],
+                "payments": payments_data,
+                "next_cursor": next_cursor
             })
 
         return Response({
@@ -614,6 +643,11 @@ class PendingMembersAPIView(APIView):
             group__is_active=True
         ).select_related('member', 'group')
 
+        # ✅ All balances in one query
+        balance_map = get_balance_map(
+            groups=ChittiGroup.objects.filter(collector=staff, is_active=True)
+        )
+
         member_list = []
 
         for cm in chitti_members:
@@ -628,14 +662,8 @@ class PendingMembersAPIView(APIView):
             if current_month < 1 or current_month > group.duration_months:
                 continue
 
-            # Total paid this month
-            paid_amount = Payment.objects.filter(
-                member=cm.member,  # ✅ cm.member is Member
-                group=group,
-                paid_date__year=today.year,
-                paid_date__month=today.month,
-                payment_status='success'
-            ).aggregate(total=Sum('amount'))['total'] or 0
+            # Paid towards this month (running total, advance counts)
+            paid_amount = get_balance(balance_map, cm.member, group).paid_towards(current_month)
 
             if status == "pending" and paid_amount < group.monthly_amount:
                 member_list.append({
@@ -672,6 +700,7 @@ class EditPaymentAPIView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def put(self, request, payment_id):
         staff = request.user.staffprofile
         payment = get_object_or_404(
@@ -725,19 +754,6 @@ class EditPaymentAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check duplicate monthly payment
-        exists = Payment.objects.filter(
-            member=member,
-            paid_date__year=paid_date.year,
-            paid_date__month=paid_date.month
-        ).exclude(id=payment.id).exists()
-
-        if exists:
-            return Response(
-                {"error": "This month payment already exists."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         # Update payment
         payment.member = member
         payment.amount = amount
@@ -1,5 +1,6 @@
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+import uuid
 from typing import Collection
 from django.db import transaction
 
@@ -15,7 +16,12 @@ from rest_framework.permissions import IsAuthenticated
 from members.models import Member
 from chitti.models import ChittiGroup, ChittiMember
 from payments.models import Payment
+from payments.services import get_balance_map, get_balance, get_member_balance, lock_member_balance
+from payments.queries import group_payment_totals, group_pages, parse_page_size
+from chitti.schedule import PaymentSchedule, collector_month_status
+from chitti.notifications import invalidate_group_notifications
 from accounts.decorators import collector_required
+from core.idempotency import idempotent_view
 from django.utils import timezone
 
 
@@ -40,6 +46,7 @@ def assigned_members(request):
 
 @login_required
 @collector_required
+@idempotent_view  # 🔁 double-submitted form → first response again
 @transaction.atomic
 def add_collection(request):
     staff = request.user.staffprofile
@@ -61,6 +68,9 @@ def add_collection(request):
         assigned_chitti_group__collector=staff
     ).select_related('assigned_chitti_group')
 
+    # ✅ one query for all balances (ledger)
+    balance_map = get_balance_map(groups=ChittiGroup.objects.filter(collector=staff))
+
     member_data = []
 
     for member in members:
@@ -71,19 +81,12 @@ def add_collection(request):
         monthly_rate = Decimal(group.monthly_amount)
         current_month_no = int(group.current_month or 0)
 
-        total_expected_to_date = current_month_no * monthly_rate
+        balance = get_balance(balance_map, member, group)
+        actual_paid = balance.total_paid
 
-        actual_paid = Payment.objects.filter(   # ✅ FIX (fresh query)
-            member=member,
-            group=group,
-            payment_status='success'
-        ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
+        next_installment = balance.months_covered + 1
 
-        months_covered = int(actual_paid // monthly_rate) if monthly_rate else 0
-        next_installment = months_covered + 1
-
-        pending = max(Decimal('0'), total_expected_to_date - actual_paid)
-        advance = max(Decimal('0'), actual_paid - total_expected_to_date)
+        pending, advance = balance.position(current_month_no)
 
         full_total_amount = Decimal(group.total_amount)
 
@@ -131,21 +134,8 @@ def add_collection(request):
 
                 full_total_amount = Decimal(group.monthly_amount) * group.duration_months
 
-                actual_paid = Payment.objects.filter(   # ✅ FIX
-                    member=member,
-                    group=group,
-                    payment_status='success'
-                ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0')
-
-                # duplicate check
-                if Payment.objects.filter(
-                    member=member,
-                    group=group,
-                    paid_date=paid_date or today,
-                    payment_status='success'
-                ).exists():
-                    messages.error(request, "Already payment exists for this date")
-                    return redirect('collector:add')
+                # 🔒 lock ledger row → no double collection over the limit
+                actual_paid = lock_member_balance(member, group).total_paid
 
                 # limit check
                 if actual_paid + amount_input > full_total_amount:
@@ -184,7 +174,10 @@ def add_collection(request):
             total_sending = draft_payments.aggregate(Sum('amount'))['amount__sum'] or 0
 
             if total_sending > 0:
+                group_ids = set(draft_payments.values_list('group_id', flat=True))
                 draft_payments.update(sent_to_admin=True)
+                # 🔔 .update() skips signals → recount admin notifications
+                invalidate_group_notifications(group_ids)
                 messages.success(request, f"₹{total_sending} sent to admin")
             else:
                 messages.warning(request, "No draft payments")
@@ -194,6 +187,7 @@ def add_collection(request):
     return render(request, 'collector/add.html', {
         'members_data': member_data,
         'today': today,
+        'idempotency_key': uuid.uuid4().hex,
         'total_amount': total_amount,
         'admin_received': admin_received,
         'sent_amount': sent_amount,
@@ -260,54 +254,41 @@ def all_collections(request):
     payments = Payment.objects.filter(
         collected_by=staff,
         payment_status='success'
-    ).select_related('member', 'group').order_by('-paid_date')
+    )
 
-    payments_by_group = defaultdict(list)
+    # ✅ totals → one grouped query, rows → keyset pages
+    totals = group_payment_totals(payments)
+    groups = ChittiGroup.objects.in_bulk([row['group_id'] for row in totals])
 
-    for payment in payments:
-        payment.is_today = (payment.paid_date == today)
-        payments_by_group[payment.group].append(payment)
+    pages = group_pages(
+        payments.select_related('member', 'group'),
+        limit=parse_page_size(request.GET.get('page_size')),
+        group_id=request.GET.get('group'),
+        cursor=request.GET.get('after')
+    )
 
     group_list = []
 
-    for group, group_payments in payments_by_group.items():
+    for row in totals:
+        group_payments, next_cursor = pages.get(row['group_id'], ([], None))
 
-        total_collector = sum(p.amount for p in group_payments)
-
-        total_admin = sum(
-            p.amount for p in group_payments
-            if p.received_by_admin
-        )
-
-        sent = sum(
-            p.amount for p in group_payments
-            if p.sent_to_admin
-        )
-
-        draft = sum(
-            p.amount for p in group_payments
-            if not p.sent_to_admin
-        )
+        for payment in group_payments:
+            payment.is_today = (payment.paid_date == today)
 
         # ✅ FIXED pending logic
-        pending = sent - total_admin
+        pending = row['total_sent'] - row['total_received']
         if pending < 0:
             pending = 0
 
-        # 🔥 IMPORTANT: detect rejected payments (for resend button)
-        has_rejected = any(
-            p.admin_status == "rejected"
-            for p in group_payments
-        )
-
         group_list.append({
-            'group': group,
+            'group': groups[row['group_id']],
             'payments': group_payments,
-            'total_collector': total_collector,
-            'total_admin': total_admin,
+            'next_cursor': next_cursor,
+            'total_collector': row['total_total'],
+            'total_admin': row['total_received'],
             'pending': pending,
-            'not_sent': draft,
-            'has_rejected': has_rejected,   # 🔥 ADD THIS
+            'not_sent': row['total_draft'],
+            'has_rejected': row['count_rejected'] > 0,   # 🔥 ADD THIS
         })
 
     return render(request, 'collector/today.html', {
@@ -331,6 +312,7 @@ def request_admin_approval(request, group_id):
 
     if total_amount > 0:
         payments.update(sent_to_admin=True)
+        invalidate_group_notifications([group_id])
         messages.success(request, f"₹{total_amount} sent to admin for approval ✅")
     else:
         messages.info(request, "No pending payments to send.")
@@ -350,6 +332,10 @@ def pending_members(request):
         group__is_active=True
     ).select_related('member', 'group')
 
+    balance_map = get_balance_map(
+        groups=ChittiGroup.objects.filter(collector=staff, is_active=True)
+    )
+
     member_list = []
 
     for cm in chitti_members:
@@ -364,13 +350,8 @@ def pending_members(request):
         if current_month < 1 or current_month > group.duration_months:
             continue
 
-        paid_amount = Payment.objects.filter(
-            member=cm.member,
-            group=group,
-            paid_date__year=today.year,
-            paid_date__month=today.month,
-            payment_status='success'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        # ✅ this month's share of the running total (advance counts)
+        paid_amount = get_balance(balance_map, cm.member, group).paid_towards(current_month)
 
         # ================= LOGIC =================
 
@@ -529,56 +510,23 @@ def member_history(request, member_id):
     payments = Payment.objects.filter(
         member=member,
         payment_status='success'
-    ).order_by('-paid_date')
+    ).select_related('collected_by__user').order_by('-paid_date')
 
-    # Financial Calculations
-    total_paid = payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    # Financial Calculations (ledger)
     group = member.assigned_chitti_group
-    
-    # Logic to handle the starting date of the Chitti
-    start_date = group.start_date if hasattr(group, 'start_date') and group.start_date else current_date
+    total_paid = get_member_balance(member, group).total_paid
     
     total_months = group.duration_months
-    monthly_amount = float(group.monthly_amount)
-    total_kuri_amount = float(group.total_amount) if hasattr(group, 'total_amount') and group.total_amount else (monthly_amount * total_months)
-    
-    temp_total_paid = float(total_paid)
-    pending_amount = max(float(total_kuri_amount) - temp_total_paid, 0)
+    monthly_amount = group.monthly_amount
+    total_kuri_amount = group.total_amount if group.total_amount else (monthly_amount * total_months)
 
-    month_status = []
-    
-    for i in range(1, total_months + 1):
-        target = monthly_amount
-        received = 0
-        remaining = target
-        
-        # Calculate the approximate due date for this specific month
-        month_due_date = start_date + timedelta(days=30 * (i - 1))
-        is_future_month = month_due_date > current_date
-
-        if temp_total_paid >= target:
-            received = target
-            remaining = 0
-            # If paid for a month in the future, status is "Advance"
-            status = "Advance" if is_future_month else "Full Paid"
-            temp_total_paid -= target
-        elif temp_total_paid > 0:
-            received = temp_total_paid
-            remaining = target - received
-            status = "Partial"
-            temp_total_paid = 0
-        else:
-            received = 0
-            remaining = target
-            status = "Pending"
-
-        month_status.append({
-            'month_num': i,
-            'target': target,
-            'received': received,
-            'remaining': remaining,
-            'status': status
-        })
+    pending_amount = max(total_kuri_amount - total_paid, 0)
+
+    # Month-wise status (shared schedule engine)
+    month_status = collector_month_status(
+        PaymentSchedule.from_total(group, total_paid),
+        month_key='month_num'
+    )
 
     context = {
         'member': member,
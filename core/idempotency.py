@@ -0,0 +1,207 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+
+# =========================
+# 🔁 IDEMPOTENT WRITE REQUESTS
+# =========================
+# A client sends "Idempotency-Key: <uuid>" (or an ``idempotency_key``
+# form field) with a write request. The first request with that key
+# inserts an IdempotencyRecord in the same transaction as the view's
+# writes and stores the response there. A retry of the same key:
+#   - waits on the unique (user, key) index while the first one runs
+#   - then gets the stored response back, without running the view
+# A key reused with another payload is refused (422). Responses ≥ 500
+# and exceptions leave no record, so those can be retried. Requests
+# without a key run as before.
+KEY_HEADER = "HTTP_IDEMPOTENCY_KEY"
+KEY_FIELD = "idempotency_key"
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# form noise that changes between two submits of the same request
+IGNORED_FIELDS = {"csrfmiddlewaretoken", KEY_FIELD}
+REPLAYED_HEADERS = ("Content-Type", "Location")
+
+
+def request_key(request, data=None):
+    """Idempotency key of ``request`` (header first, then form / body field)."""
+    key = request.META.get(KEY_HEADER)
+
+    if not key and hasattr(data, "get"):
+        key = data.get(KEY_FIELD)
+
+    key = str(key or "").strip()
+    return key[:MAX_KEY_LENGTH] or None
+
+
+def request_fingerprint(request, data):
+    if hasattr(data, "getlist"):
+        data = {k: data.getlist(k) for k in data if k not in IGNORED_FIELDS}
+    elif isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k not in IGNORED_FIELDS}
+
+    payload = json.dumps(data, sort_keys=True, default=str)
+
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n{payload}".encode()
+    ).hexdigest()
+
+
+def _claim(user, key, fingerprint):
+    """
+    (record, fresh). The insert blocks while another transaction holds
+    the same key; once that commits we read its record instead.
+    """
+    from core.models import IdempotencyRecord
+
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyRecord.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=expires_at
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyRecord.objects.select_for_update().filter(
+                user=user, key=key
+            ).first()
+
+        if record is None:
+            # purged in between → try the insert again
+            continue
+
+        if record.expires_at <= now:
+            # ⌛ expired → the key is free again
+            record.fingerprint = fingerprint
+            record.status_code = None
+            record.response_body = None
+            record.response_headers = {}
+            record.expires_at = expires_at
+            record.save()
+            return record, True
+
+        return record, False
+
+    raise IntegrityError("Idempotency key could not be claimed")
+
+
+def _run_once(request, data, run, dump, replay, refuse):
+    user = getattr(request, "user", None)
+    key = request_key(request, data)
+
+    if not key or not (user and user.is_authenticated):
+        return run()
+
+    fingerprint = request_fingerprint(request, data)
+
+    with transaction.atomic():
+        record, fresh = _claim(user, key, fingerprint)
+
+        if not fresh:
+            if record.fingerprint != fingerprint:
+                return refuse("Idempotency-Key was already used for a different request")
+            return replay(record)
+
+        response = run()
+
+        if response.status_code >= 500:
+            record.delete()
+            return response
+
+        record.status_code = response.status_code
+        record.response_body, record.response_headers = dump(response)
+        record.save(update_fields=["status_code", "response_body", "response_headers"])
+
+    return response
+
+
+# -------------------------
+# DRF HANDLERS (post / put / patch)
+# -------------------------
+def idempotent(handler):
+    """Decorator for APIView methods: replay the stored Response for a repeated key."""
+    from rest_framework.response import Response
+
+    def dump(response):
+        return response.data, {}
+
+    def replay(record):
+        return Response(
+            record.response_body,
+            status=record.status_code,
+            headers={REPLAY_HEADER: "true"}
+        )
+
+    def refuse(message):
+        return Response({"error": message}, status=422)
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        return _run_once(
+            request,
+            request.data,
+            lambda: handler(self, request, *args, **kwargs),
+            dump, replay, refuse
+        )
+
+    return wrapper
+
+
+# -------------------------
+# FUNCTION VIEWS (HTML forms)
+# -------------------------
+def idempotent_view(view):
+    """Decorator for function views: a re-submitted form gets the first response back."""
+
+    def dump(response):
+        headers = {h: response[h] for h in REPLAYED_HEADERS if response.has_header(h)}
+        body = "" if response.streaming else response.content.decode(response.charset)
+        return body, headers
+
+    def replay(record):
+        response = HttpResponse(record.response_body or "", status=record.status_code)
+        for header, value in record.response_headers.items():
+            response[header] = value
+        response[REPLAY_HEADER] = "true"
+        return response
+
+    def refuse(message):
+        return JsonResponse({"error": message}, status=422)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return view(request, *args, **kwargs)
+
+        return _run_once(
+            request,
+            request.POST,
+            lambda: view(request, *args, **kwargs),
+            dump, replay, refuse
+        )
+
+    return wrapper
+
+
+def purge_expired_records(now=None):
+    """Delete records past their TTL. Returns the number removed."""
+    from core.models import IdempotencyRecord
+
+    deleted, _ = IdempotencyRecord.objects.filter(
+        expires_at__lte=now or timezone.now()
+    ).delete()
+    return deleted
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from core.idempotency import purge_expired_records
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency records older than IDEMPOTENCY_KEY_TTL"
+
+    def handle(self, *args, **kwargs):
+        count = purge_expired_records()
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} expired idempotency records deleted.")
+        )
@@ -1,3 +1,37 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-# Create your models here.
+
+# ----------------------------
+# IDEMPOTENCY RECORD
+# ----------------------------
+class IdempotencyRecord(models.Model):
+    """
+    Response of a write request sent with an Idempotency-Key, replayed
+    when the same user retries it (see core.idempotency).
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_records'
+    )
+    key = models.CharField(max_length=255)
+
+    # sha256 of method + path + payload → a reused key with another request is refused
+    fingerprint = models.CharField(max_length=64)
+
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    response_headers = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+
+# =========================
+# 💰 MONEY IN PAISE
+# =========================
+# Amounts are DecimalField(decimal_places=2) everywhere, so whole paise
+# (int) hold them exactly. Hot paths (schedule tables, settlements,
+# notification counters) add and compare ints and turn the result back
+# into a Decimal once at the end.
+HUNDRED = Decimal(100)
+CENT = Decimal('0.01')
+
+
+def to_paise(amount):
+    if not isinstance(amount, Decimal):
+        amount = Decimal(amount or 0)
+    return int(amount * HUNDRED)
+
+
+def from_paise(paise):
+    """Decimal rupees with two places (15050 → Decimal('150.50'))."""
+    return Decimal(paise) * CENT
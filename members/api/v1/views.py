@@ -4,7 +4,7 @@ import string
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Max
+from django.db.models import Q
 from django.db.models import Sum
 from django.db import transaction
 from rest_framework.views import APIView
@@ -16,6 +16,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from chitti.api.v1.serializers import AuctionSerializer
 from members.models import Member
 from chitti.models import Auction, ChittiGroup, ChittiMember
+from chitti.schedule import PaymentSchedule, payment_slice_row
 from payments.api.v1.serializers import PaymentSerializer
 from payments.models import Payment
 from subscriptions.utils import can_add_member
@@ -103,27 +104,10 @@ class MemberCreateAPIView(APIView):
         )
 
         # =============================
-        # 🎟️ SAFE TOKEN CREATION
+        # 🎟️ TOKEN (group sequence, chitti.tokens)
         # =============================
         if group:
-            for _ in range(3):  # retry max 3 times
-                try:
-                    last_token = ChittiMember.objects.filter(group=group).aggregate(
-                        max_token=Max("token_no")
-                    )["max_token"] or 0
-
-                    next_token = last_token + 1
-
-                    ChittiMember.objects.create(
-                        group=group,
-                        member=member,
-                        token_no=next_token
-                    )
-                    break
-
-                except Exception:
-                    # retry if duplicate token issue
-                    continue
+            ChittiMember.objects.create(group=group, member=member)
 
         # =============================
         # ✅ RESPONSE
@@ -192,49 +176,20 @@ class MemberDetailAPIView(APIView):
         member = member_record.member
         group = member_record.group
 
-        monthly_amount = float(group.monthly_amount)
-        duration = int(group.duration_months)
-        current_grp_month = int(group.current_month)
-
         payments = list(
             Payment.objects.filter(
                 member=member,
                 group=group,
                 payment_status="success"
-            ).order_by("paid_date", "created_at")
+            ).select_related("collected_by__user").order_by("paid_date", "created_at")
         )
 
         # -----------------------------
-        # CALCULATION (ADVANCED)
+        # CALCULATION (schedule engine)
         # -----------------------------
-        total_paid = float(sum(p.amount for p in payments))
-        temp_balance = total_paid
-
-        month_wise = []
-
-        for month in range(1, duration + 1):
-            target = monthly_amount
-            allocated = 0
-
-            if temp_balance >= target:
-                allocated = target
-                temp_balance -= target
-                status = "Paid"
-            elif temp_balance > 0:
-                allocated = temp_balance
-                temp_balance = 0
-                status = "Partial"
-            else:
-                status = "Pending"
-
-            month_wise.append({
-                "month": month,
-                "target": target,
-                "paid": allocated,
-                "balance": target - allocated,
-                "status": status,
-                "is_advance": month > current_grp_month and allocated > 0
-            })
+        schedule = PaymentSchedule.for_group(group, payments)
+
+        month_wise = schedule.rows()
 
         # -----------------------------
         # RESPONSE
@@ -247,15 +202,15 @@ class MemberDetailAPIView(APIView):
                 "address": member.address,
                 "aadhaar_no": member.aadhaar_no,
                 "chitti_group": group.name,
-                "monthly_amount": monthly_amount,
+                "monthly_amount": schedule.monthly_amount,
                 "status": member.member_status
             },
 
             "financial_summary": {
-                "total_paid": total_paid,
-                "total_due": max(0, (current_grp_month * monthly_amount) - total_paid),
-                "months_paid": sum(1 for m in month_wise if m["status"] == "Paid"),
-                "duration_months": duration
+                "total_paid": schedule.total_paid,
+                "total_due": schedule.total_due,
+                "months_paid": schedule.months_paid,
+                "duration_months": schedule.duration
             },
 
             "month_wise_payments": month_wise,
@@ -364,96 +319,23 @@ class MemberPaymentsAPIView(APIView):
             .order_by("paid_date", "created_at")
         )
 
-        monthly_amount = float(group.monthly_amount)
-        duration = int(group.duration_months)
-        current_grp_month = int(group.current_month)
-
-        total_paid = float(
-            payments_qs.aggregate(total=Sum("amount"))["total"] or 0
-        )
-
-        payment_rows = []
-        payments_list = list(payments_qs)
-
-        overflow_cash = 0.0
-        active_payment = None
-
-        # 🔥 SAME LOGIC AS HTML
-        for month in range(1, duration + 1):
+        # 🔥 SAME ENGINE AS HTML
+        schedule = PaymentSchedule.for_group(group, payments_qs)
 
-            target = monthly_amount
-            allocated_for_month = 0.0
-            month_transactions = []
-
-            while target > 0:
-
-                if overflow_cash <= 0:
-                    if payments_list:
-                        active_payment = payments_list.pop(0)
-                        overflow_cash = float(active_payment.amount)
-                    else:
-                        break
-
-                take = min(overflow_cash, target)
-                allocated_for_month += take
-
-                # collector name
-                collector_display = "Admin"
-                if active_payment.collected_by:
-                    user_obj = active_payment.collected_by.user
-                    collector_display = (
-                        user_obj.get_full_name() or user_obj.username
-                    )
-
-                month_transactions.append({
-                    "amount": take,
-                    "date": active_payment.paid_date,
-                    "collector": collector_display
-                })
-
-                overflow_cash -= take
-                target -= take
-
-            # ✅ Status
-            if allocated_for_month >= monthly_amount:
-                status_label = "Paid"
-            elif allocated_for_month > 0:
-                status_label = "Partial"
-            else:
-                status_label = "Pending"
-
-            payment_rows.append({
-                "month": month,
-                "target": monthly_amount,
-                "paid": allocated_for_month,
-                "balance": monthly_amount - allocated_for_month,
-                "status": status_label,
-                "transactions": month_transactions,
-                "is_advance": month > current_grp_month and allocated_for_month > 0
-            })
-
-        # ✅ Summary
-        total_due = max(
-            0.0,
-            (current_grp_month * monthly_amount) - total_paid
-        )
-
-        collections_paid = sum(
-            1 for p in payment_rows if p["status"] == "Paid"
-        )
+        payment_rows = schedule.rows(transaction_row=payment_slice_row)
 
         return Response({
             "group": {
                 "id": group.id,
                 "name": group.name,
-                "monthly_amount": monthly_amount,
-                "duration": duration,
-                "current_month": current_grp_month
+                "monthly_amount": schedule.monthly_amount,
+                "duration": schedule.duration,
+                "current_month": schedule.current_month
             },
             "summary": {
-                "total_paid": total_paid,
-                "total_due": total_due,
-                "collections_paid": collections_paid
+                "total_paid": schedule.total_paid,
+                "total_due": schedule.total_due,
+                "collections_paid": schedule.months_paid
             },
             "payment_rows": payment_rows
         }, status=status.HTTP_200_OK)
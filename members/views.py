@@ -16,6 +16,7 @@ from accounts.models import StaffProfile
 from members.models import Member
 from payments.models import Payment
 from chitti.models import Auction, ChittiGroup, ChittiMember
+from chitti.schedule import PaymentSchedule, payment_slice_row
 from subscriptions.utils import can_add_member, get_effective_subscription, get_subscription_status, get_time_left
 from .forms import MemberAddForm, MemberEditForm
 from django.db import models
@@ -128,73 +129,15 @@ def member_payment_history(request):
         payment_status="success"
     ).select_related('collected_by__user').order_by("paid_date", "created_at")
 
-    # 4. Calculation Logic
-    monthly_amount = float(group.monthly_amount)
-    duration = int(group.duration_months)
-    current_grp_month = int(group.current_month)
-    
-    total_paid = float(all_payments_qs.aggregate(total=Sum("amount"))["total"] or 0)
-    
-    payment_rows = []
-    payments_list = list(all_payments_qs)
-    overflow_cash = 0.0
-    active_payment = None
-
-    for month in range(1, duration + 1):
-        target = monthly_amount
-        allocated_for_month = 0.0
-        month_transactions = []
-
-        while target > 0:
-            # If no overflow remains, get the next payment from the list
-            if overflow_cash <= 0:
-                if payments_list:
-                    active_payment = payments_list.pop(0)
-                    overflow_cash = float(active_payment.amount)
-                else:
-                    break # No more payments available
-
-            # Calculate the portion of payment to apply to this month
-            take = min(overflow_cash, target)
-            allocated_for_month += take
-            
-            # Logic to get collector name (Full Name fallback to Username)
-            collector_display = "Admin"
-            if active_payment.collected_by:
-                user_obj = active_payment.collected_by.user
-                collector_display = user_obj.get_full_name() or user_obj.username
-
-            # Record this specific transaction slice
-            month_transactions.append({
-                "amount": take,
-                "date": active_payment.paid_date,
-                "collector": collector_display
-            })
-
-            overflow_cash -= take
-            target -= take
-
-        # Determine Payment Status for the month
-        if allocated_for_month >= monthly_amount:
-            status = "Paid"
-        elif allocated_for_month > 0:
-            status = "Partial"
-        else:
-            status = "Pending"
-
-        payment_rows.append({
-            "month": month,
-            "target": monthly_amount,
-            "paid": allocated_for_month,
-            "balance": monthly_amount - allocated_for_month,
-            "status": status,
-            "transactions": month_transactions,
-            "is_advance": month > current_grp_month and allocated_for_month > 0
-        })
+    # 4. Calculation Logic (shared schedule engine)
+    schedule = PaymentSchedule.for_group(group, all_payments_qs)
+
+    payment_rows = schedule.rows(transaction_row=payment_slice_row)
 
     # 5. Financial Summary
-    total_due = max(0.0, (current_grp_month * monthly_amount) - total_paid)
-    collections_paid = sum(1 for p in payment_rows if p["status"] == "Paid")
+    total_paid = schedule.total_paid
+    total_due = schedule.total_due
+    collections_paid = schedule.months_paid
 
     context = {
         "group": group,
@@ -372,18 +315,11 @@ def member_create(request):
                 member.is_first_login = True
                 member.save()
 
-                # Assign to ChittiMember table with Token Logic
+                # Assign to ChittiMember table (token from the group sequence)
                 if assigned_group:
-                    existing_tokens = ChittiMember.objects.filter(
-                        group=assigned_group
-                    ).values_list('token_no', flat=True)
-
-                    next_token = max(existing_tokens, default=0) + 1
-
                     ChittiMember.objects.create(
                         group=assigned_group,
-                        member=member,
-                        token_no=next_token
+                        member=member
                     )
 
                 messages.success(request, f"Member '{member.name}' added successfully!")
@@ -455,11 +391,6 @@ def member_details(request, pk):
     group = member_record.group
     member_profile = member_record.member # The actual 'Member' object
 
-    # Configuration
-    monthly_amount = float(group.monthly_amount)
-    duration = int(group.duration_months)
-    current_grp_month = int(group.current_month)
-    
     # FIX: Use 'member' and 'group' instead of 'chitti_member'
     # Based on your error, these are the correct keywords for your Payment model
     all_payments = Payment.objects.filter(
@@ -467,44 +398,16 @@ def member_details(request, pk):
         group=group,
         payment_status='success'
     ).order_by('paid_date', 'created_at')
-    
-    # ... rest of your calculation logic ...
-    total_paid = float(all_payments.aggregate(total=Sum('amount'))['total'] or 0)
-    temp_balance = total_paid 
-    payment_rows = []
-
-    for month in range(1, duration + 1):
-        target = monthly_amount
-        allocated = 0
-        
-        if temp_balance >= target:
-            allocated = target
-            temp_balance -= target
-            status = "Paid"
-        elif temp_balance > 0:
-            allocated = temp_balance
-            temp_balance = 0
-            status = "Partial"
-        else:
-            allocated = 0
-            status = "Pending"
-
-        payment_rows.append({
-            'month': month,
-            'target': target,
-            'paid': allocated,
-            'balance': target - allocated,
-            'status': status,
-            'is_advance': month > current_grp_month and allocated > 0
-        })
+
+    schedule = PaymentSchedule.for_group(group, all_payments)
 
     context = {
         'member': member_record,
-        'payment_rows': payment_rows,
-        'total_paid': total_paid,
-        'total_due': max(0, (current_grp_month * monthly_amount) - total_paid),
+        'payment_rows': schedule.rows(),
+        'total_paid': schedule.total_paid,
+        'total_due': schedule.total_due,
         'recent_transactions': all_payments,
-        'total_collections': duration,
-        'collections_paid': sum(1 for p in payment_rows if p['status'] == 'Paid'),
+        'total_collections': schedule.duration,
+        'collections_paid': schedule.months_paid,
     }
     return render(request, 'chitti/member_details.html', context)
\ No newline at end of file
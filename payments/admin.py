@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment, Installment, PaymentAllocation
+from .models import Payment, Installment, PaymentAllocation, MemberBalance
 
 # This allows you to see the allocation details directly inside the Payment view
 class PaymentAllocationInline(admin.TabularInline):
@@ -63,4 +63,13 @@ class PaymentAdmin(admin.ModelAdmin):
     )
     
     # Adding the inline helps you track which months the money went to
-    inlines = [PaymentAllocationInline]
\ No newline at end of file
+    inlines = [PaymentAllocationInline]
+
+
+# ✅ MEMBER BALANCE ADMIN (ledger, read only)
+@admin.register(MemberBalance)
+class MemberBalanceAdmin(admin.ModelAdmin):
+    list_display = ('member', 'group', 'total_paid', 'months_covered', 'advance', 'last_payment_date')
+    list_filter = ('group',)
+    search_fields = ('member__name', 'member__phone')
+    readonly_fields = ('member', 'group', 'total_paid', 'months_covered', 'advance', 'last_payment_date', 'updated_at')
@@ -1,7 +1,126 @@
-from rest_framework.pagination import PageNumberPagination
+import math
+
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from payments.queries import approximate_count, keyset_page, offset_page, parse_page_size
 
 
 class PaymentPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class PaymentCursorPagination(BasePagination):
+    """
+    Keyset pages of a Payment queryset, newest first by (paid_date, id).
+    ?cursor=<opaque>&page_size=N; ?with_total=1 adds a cached approximate
+    total. No COUNT(*) or OFFSET on a plain page.
+    """
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    total_query_param = "with_total"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        params = request.query_params
+
+        limit = parse_page_size(
+            params.get(self.page_size_query_param), self.page_size, self.max_page_size
+        )
+
+        rows, self.next_cursor = keyset_page(
+            queryset, params.get(self.cursor_query_param), limit
+        )
+
+        self.total = None
+        if params.get(self.total_query_param) in ("1", "true"):
+            self.total = approximate_count(queryset)
+
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    def page_info(self):
+        """Pagination block for views that build their own response body."""
+        return {
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+            "has_next": self.next_cursor is not None,
+            "approximate_total": self.total,
+        }
+
+    def get_paginated_response(self, data):
+        return Response({**self.page_info(), "results": data})
+
+
+
+class OptInPaymentCursorPagination(PaymentCursorPagination):
+    """
+    Keyset pages only when the client asks (?cursor= or ?page_size=);
+    otherwise None, like DRF paginators → the view returns every row as
+    before. For endpoints older app versions read without paging.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if not (params.get(self.cursor_query_param) or params.get(self.page_size_query_param)):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+class GroupPaymentPagination(PaymentCursorPagination):
+    """
+    Keyset pages for the group payment list that keep its page-number
+    contract: current_page / total_pages / total_items / has_previous
+    next to the cursor keys (total from the cached approximate count).
+    A plain ?page=N makes one OFFSET jump, its next link goes on by cursor.
+    """
+    page_size = 10
+    max_page_size = 100
+    page_query_param = "page"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        params = request.query_params
+
+        self.limit = parse_page_size(
+            params.get(self.page_size_query_param), self.page_size, self.max_page_size
+        )
+        self.page_number = parse_page_size(params.get(self.page_query_param), 1, 10 ** 6)
+
+        cursor = params.get(self.cursor_query_param)
+        if cursor or self.page_number == 1:
+            rows, self.next_cursor = keyset_page(queryset, cursor, self.limit)
+        else:
+            rows, self.next_cursor = offset_page(
+                queryset, (self.page_number - 1) * self.limit, self.limit
+            )
+
+        self.total = approximate_count(queryset)
+        return rows
+
+    def get_next_link(self):
+        link = super().get_next_link()
+        if link:
+            link = replace_query_param(link, self.page_query_param, self.page_number + 1)
+        return link
+
+    def page_info(self):
+        return {
+            "current_page": self.page_number,
+            "total_pages": max(math.ceil(self.total / self.limit), 1),
+            "total_items": self.total,
+            "has_next": self.next_cursor is not None,
+            "has_previous": self.page_number > 1,
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+        }
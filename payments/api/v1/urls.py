@@ -13,6 +13,7 @@ from payments.api.v1.views import (
     AdminNotificationAPI,
     RejectGroupPaymentsAPI,
     RejectPaymentAPI,
+    ExportAPIView,
 )
 
 urlpatterns = [
@@ -42,4 +43,10 @@ urlpatterns = [
     path("admin/reject/group/<int:group_id>/", RejectGroupPaymentsAPI.as_view(), name="reject-group-payments"),
     path("admin/notifications/", AdminNotificationAPI.as_view(), name="admin-notifications"),
 
+
+    # =====================================================
+    # 📤 EXPORTS (CSV / XLSX)
+    # =====================================================
+    path("exports/<str:dataset>/", ExportAPIView.as_view(), name="export-data"),
+
 ]
\ No newline at end of file
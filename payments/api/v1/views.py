@@ -10,9 +10,16 @@ from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from chitti.models import ChittiGroup
 from payments.models import Payment
+from payments.queries import (
+    group_payment_totals, group_pages, group_totals_key, parse_page_size, payment_totals
+)
+from payments.services import approve_payments, reject_payments
 from members.models import Member
 from chitti.models import ChittiGroup, ChittiMember
-from django.core.paginator import Paginator
+from chitti.hierarchy import subtree, owner_group_tree
+from core.idempotency import idempotent
+from payments.api.v1.pagination import GroupPaymentPagination
+from payments.exports import EXPORTS, EXPORT_FORMATS, export_scope, export_rows, export_response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 # =====================================================
@@ -39,35 +46,27 @@ class GroupPaymentListAPI(APIView):
         # ✅ Main group
         main_group = staff_profile.group
 
-        # ✅ Include subgroups
-        group_ids = [main_group.id] + list(
-            main_group.sub_groups.values_list('id', flat=True)
-        )
+        # ✅ Include subgroups (any depth)
+        group_ids = subtree(main_group).values('id')
 
         # ✅ Fetch payments
         payments_qs = Payment.objects.filter(group_id__in=group_ids) \
-            .select_related('member', 'collected_by', 'group') \
-            .order_by('-paid_date')
+            .select_related('member', 'collected_by__user', 'group')
 
         # =====================================================
-        # 🔥 TOTALS
+        # 🔥 PAGINATION (keyset ?cursor=, legacy ?page= still works)
         # =====================================================
-        total_collector_collected = payments_qs.filter(
-            payment_status='success'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        total_admin_collected = payments_qs.filter(
-            payment_status='success',
-            received_by_admin=True
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        paginator = GroupPaymentPagination()
+        page = paginator.paginate_queryset(payments_qs, request, view=self)
 
         # =====================================================
-        # 🔥 PAGINATION (FIXED)
+        # 🔥 TOTALS (summed on the first page, cached for the rest)
         # =====================================================
-        page_number = request.GET.get('page', 1)
-
-        paginator = Paginator(payments_qs, 10)  # ✅ FIXED
-        page_obj = paginator.get_page(page_number)
+        totals = payment_totals(
+            payments_qs,
+            group_totals_key(main_group),
+            refresh=paginator.page_number == 1 and not request.query_params.get(paginator.cursor_query_param)
+        )
 
         # =====================================================
         # 🔥 FORMAT DATA
@@ -84,32 +83,26 @@ class GroupPaymentListAPI(APIView):
         payments_data = [
             {
                 "id": p.id,
-                "member": p.member.name,
-                "group": p.group.name if hasattr(p.group, "name") else p.group.id,
+                "member": p.member.name if p.member else None,
+                "group": p.group.name if p.group else None,
                 "amount": float(p.amount),
                 "paid_date": p.paid_date,
                 "status": p.payment_status,
-                "payment_method": getattr(p, "payment_method", None),
+                "payment_method": p.payment_method,
                 "collected_by": get_collector_name(p.collected_by),
-                "received_by_admin": getattr(p, "received_by_admin", False)
+                "received_by_admin": p.received_by_admin
             }
-            for p in page_obj
+            for p in page
         ]
 
         # =====================================================
         # ✅ FINAL RESPONSE
         # =====================================================
         return Response({
-            "total_collector_collected": float(total_collector_collected),
-            "total_admin_collected": float(total_admin_collected),
+            "total_collector_collected": float(totals['collected']),
+            "total_admin_collected": float(totals['received']),
 
-            "pagination": {
-                "current_page": page_obj.number,
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "has_next": page_obj.has_next(),
-                "has_previous": page_obj.has_previous(),
-            },
+            "pagination": paginator.page_info(),
 
             "payments": payments_data
 
@@ -118,6 +111,7 @@ class GroupPaymentListAPI(APIView):
 class GroupPaymentCreateAPI(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @idempotent  # 🔁 retried POST (Idempotency-Key) → stored response
     @transaction.atomic
     def post(self, request):
 
@@ -151,15 +145,10 @@ class GroupPaymentCreateAPI(APIView):
         # =========================
         # AUTO ADD CHITTI MEMBER (SAFE)
         # =========================
+        # token_no comes from the group sequence on create
         chitti_member, created = ChittiMember.objects.get_or_create(
             member=member,
-            group=group,
-            defaults={
-                "token_no": (
-                    ChittiMember.objects.filter(group=group)
-                    .aggregate(max_token=Sum("token_no"))["max_token"] or 0
-                ) + 1
-            }
+            group=group
         )
 
         # =========================
@@ -371,9 +360,7 @@ class AdminPendingPaymentsAPI(APIView):
             groups = ChittiGroup.objects.all()
 
         elif staff.role == 'group_admin':
-            main_groups = ChittiGroup.objects.filter(owner=staff.user)
-            sub_groups = ChittiGroup.objects.filter(parent_group__in=main_groups)
-            groups = (main_groups | sub_groups).distinct()
+            groups = owner_group_tree(staff.user)
 
         else:
             return Response({"error": "Not authorized"}, status=403)
@@ -384,33 +371,37 @@ class AdminPendingPaymentsAPI(APIView):
             collected_by__isnull=False,
             collected_by__role='collector',
             sent_to_admin=True
-        ).select_related('member', 'group', 'collected_by') \
-         .order_by('-paid_date', '-id')
+        )
 
-        grouped = defaultdict(list)
+        # 🔹 Totals & counts (single grouped query)
+        totals = group_payment_totals(payments)
+        group_map = ChittiGroup.objects.in_bulk([row['group_id'] for row in totals])
 
-        for p in payments:
-            grouped[p.group].append(p)
+        # 🔹 Pending rows → keyset pages (?group_id=&cursor=&page_size=)
+        pages = group_pages(
+            payments.filter(admin_status='pending').select_related('member'),
+            limit=parse_page_size(request.query_params.get('page_size')),
+            group_id=request.query_params.get('group_id'),
+            cursor=request.query_params.get('cursor')
+        )
 
         group_list = []
 
-        for group, group_payments in grouped.items():
-
-            pending = [p for p in group_payments if p.admin_status == 'pending']
-            approved = [p for p in group_payments if p.admin_status == 'approved']
-            rejected = [p for p in group_payments if p.admin_status == 'rejected']
+        for row in totals:
+            group = group_map[row['group_id']]
+            pending, next_cursor = pages.get(group.id, ([], None))
 
             group_list.append({
                 "group_id": group.id,
                 "group_name": group.name,
 
-                "total_pending": sum(p.amount for p in pending),
-                "total_approved": sum(p.amount for p in approved),
-                "total_rejected": sum(p.amount for p in rejected),
+                "total_pending": row['total_pending'],
+                "total_approved": row['total_approved'],
+                "total_rejected": row['total_rejected'],
 
-                "count_pending": len(pending),
-                "count_approved": len(approved),
-                "count_rejected": len(rejected),
+                "count_pending": row['count_pending'],
+                "count_approved": row['count_approved'],
+                "count_rejected": row['count_rejected'],
 
                 "pending_payments": [
                     {
@@ -420,6 +411,7 @@ class AdminPendingPaymentsAPI(APIView):
                         "date": p.paid_date
                     } for p in pending
                 ],
+                "next_cursor": next_cursor,
             })
 
         return Response({"groups": group_list})
@@ -556,19 +548,12 @@ class ApproveGroupPaymentsAPI(APIView):
             sent_to_admin=True
         )
 
-        total = payments.aggregate(total=Sum('amount'))['total'] or 0
+        # ⚡ bulk approve + FIFO allocation (constant queries)
+        count, total = approve_payments(payments, mark_seen=True)
 
         if total == 0:
             return Response({"message": "No pending payments"})
 
-        for p in payments:
-            p.admin_status = 'approved'
-            p.is_seen = True
-            p.save()
-
-            if not p.allocations.exists():
-                p.allocate_payment()
-
         return Response({
             "message": "All payments approved",
             "total_amount": total
@@ -591,19 +576,12 @@ class RejectGroupPaymentsAPI(APIView):
             sent_to_admin=True
         )
 
-        total = payments.aggregate(total=Sum('amount'))['total'] or 0
+        # ⚡ bulk reject (reverses any allocation, resyncs ledger)
+        count, total = reject_payments(payments, mark_seen=True)
 
         if total == 0:
             return Response({"message": "No pending payments"})
 
-        for p in payments:
-            if p.admin_status == 'approved':
-                p.reverse_allocation()
-
-            p.admin_status = 'rejected'
-            p.is_seen = True
-            p.save()
-
         return Response({
             "message": "All payments rejected",
             "total_amount": total
@@ -614,16 +592,6 @@ class RejectGroupPaymentsAPI(APIView):
 # 🔔 ADMIN NOTIFICATION API
 # ============================================
 from django.db.models import Sum, Count, F
-def get_all_subgroup_ids(group):
-    ids = [group.id]
-    children = group.sub_groups.all()
-
-    for child in children:
-        ids.extend(get_all_subgroup_ids(child))
-
-    return ids
-
-
 class AdminNotificationAPI(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
@@ -646,8 +614,7 @@ class AdminNotificationAPI(APIView):
 
         # 🔥 group_admin → main + all subgroups
         if staff.role == "group_admin" and staff.group:
-            all_group_ids = get_all_subgroup_ids(staff.group)
-            qs = qs.filter(group_id__in=all_group_ids)
+            qs = qs.filter(group__in=subtree(staff.group))
 
         pending_groups = list(
             qs.values(
@@ -662,4 +629,38 @@ class AdminNotificationAPI(APIView):
         return Response({
             "pending_groups": pending_groups,
             "total_pending_count": qs.count()
-        })
\ No newline at end of file
+        })
+
+
+# =====================================================
+# 📤 EXPORTS (CSV / XLSX, streamed)
+# =====================================================
+class ExportAPIView(APIView):
+    """
+    GET exports/<payments|installments|auctions|balances>/
+        ?format=csv|xlsx&from=YYYY-MM-DD&to=YYYY-MM-DD&group=<id>&collector=<id>
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= picks the file type here, not a DRF renderer
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, dataset):
+        if dataset not in EXPORTS:
+            return Response({"error": "Unknown export"}, status=status.HTTP_404_NOT_FOUND)
+
+        fmt = request.query_params.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return Response({"error": "format must be csv or xlsx"}, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = export_scope(request.user, dataset)
+        if scope is None:
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            rows = export_rows(dataset, scope, request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return export_response(dataset, rows, fmt)
@@ -0,0 +1,246 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from payments.models import Payment, MemberBalance
+from payments.services import compute_balance_fields
+from payments.numbering import number_payments
+from chitti.dashboard import invalidate_group_owners
+from chitti.snapshot import invalidate_group_snapshots
+
+
+# -----------------------------
+# 📲 COLLECTOR BULK SYNC
+# -----------------------------
+# The collector app queues collections while offline and sends them as
+# one batch, each item with its own client-generated idempotency_key.
+# A batch costs a fixed number of queries whatever its size:
+#   members (1), ledger rows ensured + locked (2), known keys (1),
+#   payment numbers (1 block), payments bulk_create (1), ledger bulk_update (1)
+# Limits are checked against the locked MemberBalance rows (the ledger
+# already holds each member's counted total), so concurrent syncs for
+# the same members queue instead of both passing the check.
+# Items whose key is already stored come back as "duplicate" with the
+# original payment → replaying a batch is safe and inserts nothing.
+MAX_BATCH_SIZE = 500
+DATE_FORMATS = ("%d-%m-%Y", "%Y-%m-%d")
+PAYMENT_METHODS = {method for method, _ in Payment.PAYMENT_METHODS}
+
+
+def parse_paid_date(value):
+    """Date from the app's "DD-MM-YYYY" / "YYYY-MM-DD" strings, or None."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value), fmt).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _clean_item(item):
+    """(fields, error) for one raw batch item."""
+    if not isinstance(item, dict):
+        return None, "Invalid item"
+
+    key = str(item.get("idempotency_key") or "").strip()
+    if not key or len(key) > 64:
+        return None, "idempotency_key required (max 64 chars)"
+
+    member_id = str(item.get("member") or "")
+    amount = item.get("amount")
+    paid_date = item.get("paid_date")
+    method = str(item.get("payment_method") or "").lower()
+
+    if not all([member_id, amount, paid_date, method]):
+        return {"key": key}, "All fields are required"
+
+    if not member_id.isdigit():
+        return {"key": key}, "Invalid member"
+
+    try:
+        amount = Decimal(str(amount))
+    except InvalidOperation:
+        return {"key": key}, "Invalid amount format"
+
+    if not amount.is_finite() or amount <= 0:
+        return {"key": key}, "Amount must be greater than 0"
+
+    paid_date = parse_paid_date(paid_date)
+    if not paid_date:
+        return {"key": key}, "Invalid date format"
+
+    if method not in PAYMENT_METHODS:
+        return {"key": key}, "Invalid payment method"
+
+    return {
+        "key": key,
+        "member_id": int(member_id),
+        "amount": amount,
+        "paid_date": paid_date,
+        "method": method,
+    }, None
+
+
+def _result(key, status, payment=None, error=None):
+    return {
+        "idempotency_key": key,
+        "status": status,
+        "payment_id": payment.id if payment else None,
+        "invoice_number": payment.invoice_number if payment else None,
+        "error": error,
+    }
+
+
+NUMBER_RETRIES = 3
+
+
+def _insert_one_by_one(payments):
+    """
+    Insert ``payments`` one per savepoint; a row whose invoice /
+    transaction number collides gets fresh numbers and is retried, so one
+    clash doesn't fail the batch. Anything else still raises.
+    """
+    for payment in payments:
+        for attempt in range(NUMBER_RETRIES):
+            try:
+                with transaction.atomic():
+                    Payment.objects.bulk_create([payment])
+                break
+            except IntegrityError:
+                if attempt == NUMBER_RETRIES - 1:
+                    raise
+                payment.invoice_number = payment.transaction_id = ""
+                number_payments([payment])
+
+
+@transaction.atomic
+def record_collections(staff, items):
+    """
+    Record a batch of collections for ``staff`` (collector StaffProfile).
+    Returns one result per item, in order, with status "created",
+    "duplicate" or "error". Valid items are saved even when others fail.
+    """
+    from members.models import Member
+
+    cleaned = [_clean_item(item) for item in items]
+
+    member_ids = {f["member_id"] for f, error in cleaned if not error}
+    members = Member.objects.filter(
+        id__in=member_ids,
+        assigned_chitti_group__collector=staff
+    ).select_related("assigned_chitti_group").in_bulk()
+
+    # 🔒 ledger rows of every (member, group) in the batch, locked in one go
+    pairs = {(m.id, m.assigned_chitti_group_id) for m in members.values()}
+    MemberBalance.objects.bulk_create(
+        [MemberBalance(member_id=m, group_id=g) for m, g in pairs],
+        ignore_conflicts=True
+    )
+    balances = {
+        (b.member_id, b.group_id): b
+        for b in MemberBalance.objects.select_for_update().filter(
+            member_id__in={m for m, _ in pairs},
+            group_id__in={g for _, g in pairs}
+        )
+    }
+
+    # keys read after the lock → a concurrent replay sees our rows
+    known = {
+        p.idempotency_key: p
+        for p in Payment.objects.filter(
+            collected_by=staff,
+            idempotency_key__in={f["key"] for f, _ in cleaned if f}
+        ).only("id", "idempotency_key", "invoice_number")
+    }
+
+    results = []
+    new_payments = []
+    touched = {}
+
+    for fields, error in cleaned:
+        key = fields["key"] if fields else None
+
+        if key in known:
+            results.append(_result(key, "duplicate", known[key]))
+            continue
+
+        if error:
+            results.append(_result(key, "error", error=error))
+            continue
+
+        member = members.get(fields["member_id"])
+        if member is None:
+            results.append(_result(key, "error", error="Member not found"))
+            continue
+
+        group = member.assigned_chitti_group
+        balance = balances[(member.id, group.id)]
+
+        full_total_amount = Decimal(group.monthly_amount) * group.duration_months
+        if balance.total_paid + fields["amount"] > full_total_amount:
+            remaining = full_total_amount - balance.total_paid
+            results.append(_result(key, "error", error=f"Only ₹{remaining} allowed"))
+            continue
+
+        payment = Payment(
+            member=member,
+            collected_by=staff,
+            group=group,
+            amount=fields["amount"],
+            paid_date=fields["paid_date"],
+            payment_method=fields["method"],
+            payment_status="success",
+            sent_to_admin=False,
+            received_by_admin=False,
+            admin_status="pending",
+            idempotency_key=key,
+        )
+
+        # running totals → later items of the same member see earlier ones
+        last = balance.last_payment_date
+        for field, value in compute_balance_fields(
+            group,
+            balance.total_paid + payment.amount,
+            max(last, payment.paid_date) if last else payment.paid_date
+        ).items():
+            setattr(balance, field, value)
+        touched[(member.id, group.id)] = balance
+
+        known[key] = payment
+        new_payments.append(payment)
+        results.append(_result(key, "created", payment))
+
+    if new_payments:
+        # bulk_create skips save / signals → numbers, ledger and caches here
+        number_payments(new_payments)
+        try:
+            with transaction.atomic():
+                Payment.objects.bulk_create(new_payments, batch_size=500)
+        except IntegrityError:
+            # a number already taken (hand-entered / legacy) → row by row
+            _insert_one_by_one(new_payments)
+
+        now = timezone.now()
+        for balance in touched.values():
+            balance.updated_at = now
+
+        MemberBalance.objects.bulk_update(
+            touched.values(),
+            ["total_paid", "months_covered", "advance", "last_payment_date", "updated_at"],
+            batch_size=500
+        )
+
+        group_ids = {p.group_id for p in new_payments}
+        invalidate_group_owners(group_ids)
+        invalidate_group_snapshots(group_ids)
+
+    # results were built before the insert → fill in ids and numbers
+    for result in results:
+        if result["payment_id"] is None and result["status"] != "error":
+            payment = known[result["idempotency_key"]]
+            result["payment_id"] = payment.id
+            result["invoice_number"] = payment.invoice_number
+
+    return results
@@ -0,0 +1,333 @@
+import csv
+import io
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from chitti.hierarchy import owner_group_tree, subtree
+from chitti.models import Auction
+from payments.collections import parse_paid_date
+from payments.models import Payment, Installment, MemberBalance
+
+
+# =========================
+# 📤 STREAMING EXPORTS
+# =========================
+# Rows come from values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+# (a server-side cursor on PostgreSQL) and are written out chunk by
+# chunk through a StreamingHttpResponse → memory stays flat however
+# many rows the export has (`manage.py benchmark_export` checks it).
+# Each dataset: columns (header, field), the date / group / collector
+# lookups behind ?from=&to=&group=&collector=, and a stable order.
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORTS = {
+    'payments': {
+        'model': Payment,
+        'columns': (
+            ('Invoice', 'invoice_number'),
+            ('Transaction', 'transaction_id'),
+            ('Paid Date', 'paid_date'),
+            ('Member', 'member__name'),
+            ('Phone', 'member__phone'),
+            ('Group', 'group__name'),
+            ('Amount', 'amount'),
+            ('Method', 'payment_method'),
+            ('Status', 'payment_status'),
+            ('Admin Status', 'admin_status'),
+            ('Collected By', 'collected_by__user__username'),
+        ),
+        'date_field': 'paid_date',
+        'collector_field': 'collected_by',
+        'order_by': ('paid_date', 'id'),
+    },
+    'installments': {
+        'model': Installment,
+        'columns': (
+            ('Month', 'month'),
+            ('Member', 'member__name'),
+            ('Phone', 'member__phone'),
+            ('Group', 'group__name'),
+            ('Due', 'amount_due'),
+            ('Paid', 'amount_paid'),
+            ('Status', 'status'),
+        ),
+        'date_field': 'month',
+        'collector_field': 'group__collector',
+        'order_by': ('month', 'id'),
+    },
+    'auctions': {
+        'model': Auction,
+        'columns': (
+            ('Group', 'group__name'),
+            ('Month', 'month_no'),
+            ('Auction No', 'auction_no'),
+            ('Auction Date', 'auction_date'),
+            ('Selection', 'selection_type'),
+            ('Winner', 'winner__member__name'),
+            ('Token', 'winner__token_no'),
+            ('Bid', 'bid_amount'),
+            ('Net Payout', 'settlement__net_payout'),
+            ('Dividend / Member', 'settlement__dividend_per_member'),
+        ),
+        'date_field': 'auction_date',
+        'collector_field': 'group__collector',
+        'order_by': ('auction_date', 'id'),
+    },
+    'balances': {
+        'model': MemberBalance,
+        'columns': (
+            ('Member', 'member__name'),
+            ('Phone', 'member__phone'),
+            ('Group', 'group__name'),
+            ('Total Paid', 'total_paid'),
+            ('Months Covered', 'months_covered'),
+            ('Advance', 'advance'),
+            ('Last Payment', 'last_payment_date'),
+        ),
+        'date_field': 'last_payment_date',
+        'collector_field': 'group__collector',
+        'order_by': ('group_id', 'member_id'),
+    },
+}
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+# -------------------------
+# ROWS
+# -------------------------
+def export_scope(user, dataset):
+    """
+    Q limiting ``dataset`` to what ``user`` may export, or None:
+    admins everything, group admins their group (and owned groups) with
+    sub groups, collectors their own collections / assigned groups.
+    """
+    if user.is_superuser:
+        return Q()
+
+    staff = getattr(user, 'staffprofile', None)
+    if staff is None:
+        return None
+
+    if staff.role == 'admin':
+        return Q()
+
+    if staff.role == 'group_admin':
+        scope = Q(group__in=owner_group_tree(user))
+        if staff.group:
+            scope |= Q(group__in=subtree(staff.group))
+        return scope
+
+    if staff.role == 'collector':
+        return Q(**{EXPORTS[dataset]['collector_field']: staff})
+
+    return None
+
+
+def export_rows(dataset, scope, params):
+    """
+    Iterator of value tuples for ``dataset`` inside ``scope``, filtered by
+    ``params`` (from, to, group, collector). Raises ValueError on bad filters.
+    """
+    spec = EXPORTS[dataset]
+    date_field = spec['date_field']
+
+    filters = scope
+    for param, lookup in (('from', 'gte'), ('to', 'lte')):
+        value = params.get(param)
+        if value:
+            day = parse_paid_date(value)
+            if day is None:
+                raise ValueError(f"Invalid {param} date")
+            filters &= Q(**{f"{date_field}__{lookup}": day})
+
+    for param, field in (('group', 'group'), ('collector', spec['collector_field'])):
+        value = params.get(param)
+        if value:
+            if not str(value).isdigit():
+                raise ValueError(f"Invalid {param}")
+            filters &= Q(**{f"{field}__id": int(value)})
+
+    return (
+        spec['model'].objects.filter(filters)
+        .order_by(*spec['order_by'])
+        .values_list(*[field for _, field in spec['columns']])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+# text a spreadsheet would run as a formula (member names, notes … are
+# user input) → prefixed with ' so Excel / Sheets show it as text
+_FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+
+def _safe_text(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _chunks(rows, size=EXPORT_CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# -------------------------
+# CSV
+# -------------------------
+def stream_csv(header, rows):
+    """CSV bytes, one piece per chunk of rows (BOM first so Excel reads UTF-8)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write('\ufeff')
+    writer.writerow(header)
+
+    for chunk in _chunks(rows):
+        writer.writerows([_safe_text(v) for v in row] for row in chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+# -------------------------
+# XLSX
+# -------------------------
+# A minimal single-sheet workbook written straight into a zip stream
+# (zipfile handles unseekable output): inline strings, no shared string
+# table or styles, so nothing has to be held back until the end.
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        _XML +
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        _XML +
+        f'<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        _XML +
+        f'<Relationships xmlns="{_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# characters XML 1.0 can't carry
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _ZipSink:
+    """Write-only target for zipfile; what was written is drained after each chunk."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    text = escape(_safe_text(_INVALID_XML.sub('', str(value))))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(values):
+    return '<row>' + ''.join(_cell(v) for v in values) + '</row>'
+
+
+def stream_xlsx(header, rows, sheet_name='Export'):
+    """XLSX bytes, one piece per chunk of rows."""
+    sink = _ZipSink()
+
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_PARTS.items():
+            workbook.writestr(name, content)
+
+        workbook.writestr('xl/workbook.xml', (
+            _XML +
+            f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_XML + f'<worksheet xmlns="{_MAIN_NS}"><sheetData>' + _row(header)).encode('utf-8'))
+
+            for chunk in _chunks(rows):
+                sheet.write(''.join(_row(row) for row in chunk).encode('utf-8'))
+                yield sink.drain()
+
+            sheet.write(b'</sheetData></worksheet>')
+
+    yield sink.drain()
+
+
+# -------------------------
+# RESPONSE
+# -------------------------
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def export_response(dataset, rows, fmt='csv'):
+    header = [title for title, _ in EXPORTS[dataset]['columns']]
+
+    if fmt == 'xlsx':
+        content = stream_xlsx(header, rows, sheet_name=dataset.title())
+    else:
+        content = stream_csv(header, rows)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"'
+    )
+    return response
@@ -0,0 +1,121 @@
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from chitti.models import ChittiMember
+from payments.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_rows, export_response
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = "Stream a large payments export and check memory stays flat as rows grow"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000000,
+            help="Payments to seed and export (rolled back afterwards)",
+        )
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="csv",
+            help="Export format",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=5000,
+            help="Payments per bulk insert while seeding",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        fmt = options["format"]
+
+        if fmt == "xlsx" and rows >= 1048576:
+            self.stdout.write(self.style.WARNING(
+                "Excel opens at most 1,048,576 rows per sheet; the file is still valid."
+            ))
+
+        target = (
+            ChittiMember.objects.filter(group__collector__isnull=False)
+            .values_list('member_id', 'group_id', 'group__collector_id')
+            .first()
+        )
+        if target is None:
+            raise CommandError("Needs at least one group with a collector and members.")
+
+        with transaction.atomic():
+            started = time.monotonic()
+            self.seed(target, rows, options["batch"])
+            self.stdout.write(f"seeded {rows} payments in {time.monotonic() - started:.1f}s")
+
+            self.measure(rows, fmt)
+
+            transaction.set_rollback(True)
+
+    def seed(self, target, rows, batch_size):
+        member_id, group_id, collector_id = target
+        today = timezone.localdate()
+
+        for start in range(0, rows, batch_size):
+            Payment.objects.bulk_create([
+                Payment(
+                    member_id=member_id,
+                    group_id=group_id,
+                    collected_by_id=collector_id,
+                    amount=Decimal('1'),
+                    paid_date=today,
+                    payment_status='failed',
+                    invoice_number=f"BENCH{i:010d}",
+                    transaction_id=f"BENCHTXN{i:010d}",
+                )
+                for i in range(start, min(start + batch_size, rows))
+            ])
+
+    def measure(self, rows, fmt):
+        response = export_response(
+            'payments',
+            export_rows('payments', Q(invoice_number__startswith="BENCH"), {}),
+            fmt
+        )
+
+        # peak traced memory after every tenth of the rows
+        step = max(rows // 10, 1)
+        samples = []
+        size = 0
+        chunks = 0
+
+        tracemalloc.start()
+        started = time.monotonic()
+        try:
+            for piece in response.streaming_content:
+                size += len(piece)
+                chunks += 1
+                # one piece per EXPORT_CHUNK_SIZE rows (+ header / trailer)
+                if chunks * EXPORT_CHUNK_SIZE >= step * (len(samples) + 1):
+                    samples.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        elapsed = time.monotonic() - started
+
+        first = samples[0] if samples else peak
+        line = (
+            f"format={fmt} rows={rows} bytes={size} pieces={chunks} "
+            f"elapsed={elapsed:.2f}s rate={rows / elapsed if elapsed else 0:.0f} rows/s "
+            f"peak_first_tenth={first / 1024:.0f}KiB peak_total={peak / 1024:.0f}KiB"
+        )
+
+        # flat = the peak after all rows is close to the peak after the first tenth
+        if peak > first * 2 + 1024 * 1024:
+            raise CommandError(f"memory grew with rows: {line}")
+
+        self.stdout.write(self.style.SUCCESS(line))
@@ -0,0 +1,223 @@
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from chitti.models import ChittiMember
+from chitti.notifications import PENDING_NOTIFICATION
+from payments.models import Payment
+
+
+# -----------------------------
+# 🔍 CANONICAL PAYMENT QUERIES
+# -----------------------------
+# (name, index we expect the planner to pick, queryset builder).
+# The shapes mirror the filters used by collectors, chitti.views and
+# payments.api.v1; keep them in step when those change.
+def _payments():
+    return Payment.objects.only('id', 'amount', 'paid_date')
+
+
+CANONICAL_QUERIES = [
+    (
+        'member history',
+        'pay_member_group_status_date',
+        lambda ctx: _payments().filter(
+            member_id=ctx['member'], group_id=ctx['group'], payment_status='success'
+        ).order_by('-paid_date'),
+    ),
+    (
+        'duplicate payment check',
+        'pay_member_group_status_date',
+        lambda ctx: _payments().filter(
+            member_id=ctx['member'], group_id=ctx['group'],
+            paid_date=ctx['today'], payment_status='success'
+        )[:1],
+    ),
+    (
+        'collector today total',
+        'pay_collector_status_date',
+        lambda ctx: _payments().filter(
+            collected_by_id=ctx['collector'], paid_date=ctx['today'], payment_status='success'
+        ),
+    ),
+    (
+        'collector keyset page',
+        'pay_collector_status_date',
+        lambda ctx: _payments().filter(
+            collected_by_id=ctx['collector'], payment_status='success'
+        ).order_by('-paid_date', '-id')[:51],
+    ),
+    (
+        'collector drafts',
+        'pay_collector_drafts',
+        lambda ctx: _payments().filter(
+            collected_by_id=ctx['collector'], group_id=ctx['group'],
+            payment_status='success', sent_to_admin=False
+        ),
+    ),
+    (
+        'collector rejected (resend)',
+        'pay_collector_rejected',
+        lambda ctx: _payments().filter(
+            collected_by_id=ctx['collector'], group_id=ctx['group'], admin_status='rejected'
+        ),
+    ),
+    (
+        'group totals',
+        'pay_group_status_date',
+        lambda ctx: _payments().filter(
+            group_id=ctx['group'], payment_status='success'
+        ),
+    ),
+    (
+        'admin pending page',
+        'pay_admin_pending',
+        lambda ctx: _payments().filter(
+            group_id=ctx['group'], payment_status='success',
+            sent_to_admin=True, admin_status='pending'
+        ).order_by('-paid_date', '-id')[:51],
+    ),
+    (
+        'notification counter',
+        'pay_pending_unseen',
+        lambda ctx: _payments().filter(
+            PENDING_NOTIFICATION, group__owner_id=ctx['owner']
+        ),
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the canonical Payment queries and report which indexes their plans use"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Insert this many synthetic payments first (rolled back afterwards)",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE (PostgreSQL only)",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f"Running against {connection.vendor}; plans will differ from PostgreSQL."
+            ))
+
+        with transaction.atomic():
+            if options["seed"]:
+                self.seed(options["seed"])
+
+            ctx = self.sample_context()
+            missed = self.explain_all(ctx, options["analyze"])
+
+            # seeded rows are never kept
+            transaction.set_rollback(True)
+
+        if missed:
+            raise CommandError(f"{missed} queries did not use their expected index.")
+
+        self.stdout.write(self.style.SUCCESS("All canonical queries use their expected index."))
+
+    # -------------------------
+    # SEED
+    # -------------------------
+    def seed(self, count):
+        chitti_members = list(
+            ChittiMember.objects.filter(group__collector__isnull=False)
+            .values_list('member_id', 'group_id', 'group__collector_id')
+        )
+        if not chitti_members:
+            raise CommandError("Seeding needs at least one group with a collector and members.")
+
+        today = timezone.now().date()
+        statuses = ['pending'] * 2 + ['approved'] * 7 + ['rejected']
+
+        payments = []
+        for _ in range(count):
+            member_id, group_id, collector_id = random.choice(chitti_members)
+            admin_status = random.choice(statuses)
+            sent = admin_status != 'pending' or random.random() < 0.5
+
+            payments.append(Payment(
+                member_id=member_id,
+                group_id=group_id,
+                collected_by_id=collector_id,
+                amount=Decimal(random.choice([500, 1000, 2500, 5000])),
+                paid_date=today - timedelta(days=random.randint(0, 720)),
+                payment_status='success' if random.random() < 0.97 else 'failed',
+                sent_to_admin=sent,
+                admin_status=admin_status,
+                received_by_admin=admin_status == 'approved',
+                is_seen=admin_status != 'pending' or random.random() < 0.3,
+                transaction_id=uuid.uuid4().hex[:12].upper(),
+                invoice_number=f"SEED{uuid.uuid4().hex[:16].upper()}",
+            ))
+
+        Payment.objects.bulk_create(payments, batch_size=1000)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Payment._meta.db_table}")
+
+        self.stdout.write(f"Seeded {count} payments.")
+
+    def sample_context(self):
+        payment = (
+            Payment.objects.filter(member__isnull=False, group__isnull=False)
+            .select_related('group')
+            .order_by('-paid_date', '-id')
+            .first()
+        )
+        if payment is None:
+            raise CommandError("No payments to explain against; seed the database or pass --seed N.")
+
+        return {
+            'member': payment.member_id,
+            'group': payment.group_id,
+            'collector': payment.collected_by_id,
+            'owner': payment.group.owner_id,
+            'today': timezone.now().date(),
+        }
+
+    # -------------------------
+    # EXPLAIN
+    # -------------------------
+    def explain_all(self, ctx, analyze=False):
+        index_names = [index.name for index in Payment._meta.indexes]
+        table = Payment._meta.db_table
+        missed = 0
+
+        for name, expected, build in CANONICAL_QUERIES:
+            explain_options = {'analyze': True} if analyze and connection.vendor == 'postgresql' else {}
+            plan = build(ctx).explain(**explain_options)
+
+            used = [index for index in index_names if index in plan]
+            seq_scan = f"Seq Scan on {table}" in plan or f"SCAN {table}" in plan
+
+            if expected in used:
+                line = self.style.SUCCESS(f"OK    {name}: {expected}")
+            else:
+                missed += 1
+                found = ', '.join(used) or ('sequential scan' if seq_scan else 'other index')
+                line = self.style.WARNING(f"MISS  {name}: expected {expected}, plan uses {found}")
+
+            self.stdout.write(line)
+
+            if self.verbosity > 1:
+                self.stdout.write(plan)
+                self.stdout.write("")
+
+        return missed
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from payments.services import rebuild_member_balances, diff_balances
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) the member balance ledger from Payment rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare the ledger with Payment rows, do not write",
+        )
+        parser.add_argument(
+            "--group",
+            type=int,
+            action="append",
+            dest="groups",
+            help="Limit to a ChittiGroup id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        groups = options.get("groups")
+
+        if options.get("verify"):
+            mismatches = diff_balances(groups)
+
+            for member_id, group_id, stored, expected in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"member={member_id} group={group_id} stored={stored} expected={expected}"
+                    )
+                )
+
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} balances out of sync.")
+
+            self.stdout.write(self.style.SUCCESS("Member balances are in sync."))
+            return
+
+        count = rebuild_member_balances(groups)
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} member balances rebuilt.")
+        )
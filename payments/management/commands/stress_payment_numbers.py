@@ -0,0 +1,131 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from chitti.models import ChittiMember
+from payments.models import Payment
+from payments.numbering import number_payments
+
+
+class Command(BaseCommand):
+    help = "Create payments from parallel workers and check their numbers never collide"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=100000,
+            help="Payments to create in total",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Parallel workers, each with its own database connection",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=1000,
+            help="Payments per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+
+        if workers > 1 and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f"{connection.vendor} serializes writers; running with 1 worker."
+            ))
+            workers = 1
+
+        target = (
+            ChittiMember.objects.filter(group__collector__isnull=False)
+            .values_list('member_id', 'group_id', 'group__collector_id')
+            .first()
+        )
+        if target is None:
+            raise CommandError("Needs at least one group with a collector and members.")
+
+        count = options["count"]
+        shares = [count // workers + (1 if i < count % workers else 0) for i in range(workers)]
+
+        started = time.monotonic()
+        if workers == 1:
+            results = [self.run_worker(target, count, options["batch"])]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(
+                    lambda share: self.run_thread(target, share, options["batch"]),
+                    shares
+                ))
+        elapsed = time.monotonic() - started
+
+        invoices = [n for worker_invoices, _, _ in results for n in worker_invoices]
+        transactions = [n for _, worker_transactions, _ in results for n in worker_transactions]
+        failed = sum(errors for _, _, errors in results)
+
+        collisions = (len(invoices) - len(set(invoices))) + (len(transactions) - len(set(transactions)))
+
+        # each worker must see its own numbers in issue order
+        unordered = sum(
+            1 for worker_invoices, _, _ in results
+            if worker_invoices != sorted(worker_invoices)
+        )
+
+        line = (
+            f"payments={len(invoices)} workers={workers} collisions={collisions} "
+            f"out_of_order_workers={unordered} insert_errors={failed} "
+            f"elapsed={elapsed:.2f}s rate={len(invoices) / elapsed if elapsed else 0:.0f}/s"
+        )
+
+        if collisions or unordered or failed:
+            raise CommandError(line)
+
+        self.stdout.write(self.style.SUCCESS(line))
+
+    def run_thread(self, target, share, batch_size):
+        try:
+            return self.run_worker(target, share, batch_size)
+        finally:
+            # worker threads don't go through request_finished
+            connection.close()
+
+    def run_worker(self, target, share, batch_size):
+        member_id, group_id, collector_id = target
+        today = timezone.localdate()
+
+        invoices, transactions, errors = [], [], 0
+
+        # rows are rolled back at the end (PostgreSQL serials stay spent → gaps)
+        with transaction.atomic():
+            for start in range(0, share, batch_size):
+                payments = number_payments([
+                    Payment(
+                        member_id=member_id,
+                        group_id=group_id,
+                        collected_by_id=collector_id,
+                        amount=Decimal('1'),
+                        paid_date=today,
+                        payment_status='failed',
+                    )
+                    for _ in range(min(batch_size, share - start))
+                ])
+
+                try:
+                    with transaction.atomic():
+                        Payment.objects.bulk_create(payments)
+                except Exception as e:
+                    errors += 1
+                    self.stderr.write(f"bulk insert failed: {e}")
+
+                invoices.extend(p.invoice_number for p in payments)
+                transactions.extend(p.transaction_id for p in payments)
+
+            transaction.set_rollback(True)
+
+        return invoices, transactions, errors
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:14
+
+from datetime import date
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_balances(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    MemberBalance = apps.get_model('payments', 'MemberBalance')
+    ChittiGroup = apps.get_model('chitti', 'ChittiGroup')
+
+    groups = {g.id: g for g in ChittiGroup.objects.all()}
+    today = date.today()
+
+    rows = (
+        Payment.objects.filter(payment_status='success', member__isnull=False, group__isnull=False)
+        .exclude(admin_status='rejected')
+        .values('member_id', 'group_id')
+        .annotate(total=models.Sum('amount'), last=models.Max('paid_date'))
+    )
+
+    balances = []
+    for row in rows:
+        group = groups[row['group_id']]
+        total = row['total'] or Decimal('0')
+        monthly = group.monthly_amount
+
+        current = 1
+        if group.start_date:
+            current = (today.year - group.start_date.year) * 12 + (today.month - group.start_date.month) + 1
+            current = max(1, min(current, group.duration_months))
+
+        months_covered = min(int(total // monthly) if monthly else 0, group.duration_months)
+
+        balances.append(MemberBalance(
+            member_id=row['member_id'],
+            group_id=row['group_id'],
+            total_paid=total,
+            months_covered=months_covered,
+            advance=max(total - monthly * current, Decimal('0')),
+            last_payment_date=row['last'],
+        ))
+
+    MemberBalance.objects.bulk_create(balances, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chitti', '0018_alter_chittigroup_auction_interval_months_and_more'),
+        ('members', '0005_alter_member_status'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('months_covered', models.PositiveIntegerField(default=0)),
+                ('advance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_payment_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_balances', to='chitti.chittigroup')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='members.member')),
+            ],
+            options={
+                'unique_together': {('member', 'group')},
+            },
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.9 on 2026-10-18 12:29
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def normalize_admin_status(apps, schema_editor):
+    # older rows may carry 'Pending' etc. → the check constraint needs lowercase
+    Payment = apps.get_model('payments', 'Payment')
+    Payment.objects.exclude(
+        admin_status__in=['pending', 'approved', 'rejected']
+    ).update(admin_status=Lower('admin_status'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_memberbalance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['member', 'group', 'payment_status', 'paid_date'], name='pay_member_group_status_date'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['collected_by', 'payment_status', 'paid_date', 'id'], name='pay_collector_status_date'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['group', 'payment_status', 'paid_date', 'id'], name='pay_group_status_date'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('payment_status', 'success'), ('sent_to_admin', False)), fields=['collected_by', 'group'], name='pay_collector_drafts'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('admin_status', 'pending'), ('payment_status', 'success'), ('sent_to_admin', True)), fields=['group', 'paid_date', 'id'], name='pay_admin_pending'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('admin_status', 'pending'), ('is_seen', False), ('sent_to_admin', True)), fields=['group'], name='pay_pending_unseen'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('admin_status', 'rejected')), fields=['collected_by', 'group'], name='pay_collector_rejected'),
+        ),
+        migrations.RunPython(normalize_admin_status, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.CheckConstraint(condition=models.Q(('amount__gte', 0)), name='payment_amount_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.CheckConstraint(condition=models.Q(('admin_status__in', ['pending', 'approved', 'rejected'])), name='payment_admin_status_valid'),
+        ),
+    ]
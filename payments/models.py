@@ -3,8 +3,6 @@ from django.utils import timezone
 from accounts.models import StaffProfile
 from chitti.models import ChittiGroup
 from members.models import Member
-import uuid, random
-from datetime import datetime
 
 
 # ----------------------------
@@ -15,8 +13,6 @@ from django.utils import timezone
 from accounts.models import StaffProfile
 from chitti.models import ChittiGroup
 from members.models import Member
-import uuid, random
-from datetime import datetime
 
 
 class Installment(models.Model):
@@ -92,9 +88,75 @@ class Payment(models.Model):
      # 🔔 NEW FIELD (IMPORTANT)
     is_seen = models.BooleanField(default=False)
 
+    # 📲 key generated by the collector app per queued collection (bulk sync replays)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Shaped after the hot filters (see `manage.py explain_payment_queries`)
+        indexes = [
+            # member history / duplicate checks / ledger + rotation sums
+            models.Index(
+                fields=['member', 'group', 'payment_status', 'paid_date'],
+                name='pay_member_group_status_date',
+            ),
+            # collector dashboards, today / month totals, keyset pages
+            models.Index(
+                fields=['collected_by', 'payment_status', 'paid_date', 'id'],
+                name='pay_collector_status_date',
+            ),
+            # group details, owner dashboard, per-group pages
+            models.Index(
+                fields=['group', 'payment_status', 'paid_date', 'id'],
+                name='pay_group_status_date',
+            ),
+            # collector drafts waiting for "send to admin"
+            models.Index(
+                fields=['collected_by', 'group'],
+                name='pay_collector_drafts',
+                condition=models.Q(sent_to_admin=False, payment_status='success'),
+            ),
+            # admin verify tray (pending handovers, newest first per group)
+            models.Index(
+                fields=['group', 'paid_date', 'id'],
+                name='pay_admin_pending',
+                condition=models.Q(
+                    sent_to_admin=True, admin_status='pending', payment_status='success'
+                ),
+            ),
+            # notification counter (pending, not yet seen)
+            models.Index(
+                fields=['group'],
+                name='pay_pending_unseen',
+                condition=models.Q(sent_to_admin=True, admin_status='pending', is_seen=False),
+            ),
+            # collector resend of rejected payments
+            models.Index(
+                fields=['collected_by', 'group'],
+                name='pay_collector_rejected',
+                condition=models.Q(admin_status='rejected'),
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(amount__gte=0),
+                name='payment_amount_non_negative',
+            ),
+            # exact-match partial indexes above rely on lowercase statuses
+            models.CheckConstraint(
+                condition=models.Q(admin_status__in=['pending', 'approved', 'rejected']),
+                name='payment_admin_status_valid',
+            ),
+            # one payment per collector per app key → replayed batches can't double-insert
+            models.UniqueConstraint(
+                fields=['collected_by', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='payment_collector_idempotency_key',
+            ),
+        ]
+
 
     # ----------------------------
     # SAVE (NO AUTO ALLOCATION HERE ❌)
@@ -102,11 +164,7 @@ class Payment(models.Model):
     def save(self, *args, **kwargs):
         is_new = self.pk is None
 
-        if not self.transaction_id:
-            self.transaction_id = uuid.uuid4().hex[:12].upper()
-
-        if not self.invoice_number:
-            self.invoice_number = f"INV{datetime.now().strftime('%Y%m%d')}{random.randint(1000,9999)}"
+        self.assign_numbers()
 
         # sync
         self.received_by_admin = (self.admin_status == 'approved')
@@ -116,63 +174,26 @@ class Payment(models.Model):
         # ❌ IMPORTANT: DO NOT allocate here anymore
 
 
+    def assign_numbers(self):
+        """Fill transaction_id / invoice_number (payments.numbering)."""
+        from payments.numbering import number_payments
+        number_payments([self])
+
+
     # ----------------------------
     # ALLOCATION (ONLY APPROVE TIME)
     # ----------------------------
     def allocate_payment(self):
-        remaining = self.amount
-
-        installments = Installment.objects.filter(
-            member=self.member,
-            group=self.group,
-            status__in=['pending', 'partial']
-        ).order_by('month')
-
-        with transaction.atomic():
-            for inst in installments:
-                if remaining <= 0:
-                    break
-
-                due = inst.amount_due - inst.amount_paid
-                if due <= 0:
-                    continue
-
-                pay_amount = min(remaining, due)
-
-                inst.amount_paid += pay_amount
-                inst.status = 'paid' if inst.amount_paid >= inst.amount_due else 'partial'
-                inst.save()
-
-                PaymentAllocation.objects.create(
-                    payment=self,
-                    installment=inst,
-                    amount=pay_amount
-                )
-
-                remaining -= pay_amount
+        from payments.services import allocate_payments
+        allocate_payments([self])
 
 
     # ----------------------------
     # REVERSE (ON REJECT)
     # ----------------------------
     def reverse_allocation(self):
-        allocations = self.allocations.all()
-
-        with transaction.atomic():
-            for alloc in allocations:
-                inst = alloc.installment
-
-                inst.amount_paid -= alloc.amount
-
-                if inst.amount_paid <= 0:
-                    inst.amount_paid = 0
-                    inst.status = 'pending'
-                elif inst.amount_paid < inst.amount_due:
-                    inst.status = 'partial'
-
-                inst.save()
-
-            allocations.delete()
+        from payments.services import reverse_allocations
+        reverse_allocations([self])
 
 
     def __str__(self):
@@ -188,4 +209,61 @@ class PaymentAllocation(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
 
     def __str__(self):
-        return f"{self.amount} → {self.installment}"
\ No newline at end of file
+        return f"{self.amount} → {self.installment}"
+
+# ----------------------------
+# NUMBER SEQUENCE (FALLBACK)
+# ----------------------------
+class NumberSequence(models.Model):
+    """
+    Counter row behind payments.numbering on databases without native
+    sequences (PostgreSQL uses payments_number_seq instead).
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+# ----------------------------
+# MEMBER BALANCE (LEDGER)
+# ----------------------------
+class MemberBalance(models.Model):
+    """
+    Running totals per member per group, maintained from Payment rows
+    (see payments.services.refresh_member_balance).
+    """
+    member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='balances')
+    group = models.ForeignKey(ChittiGroup, on_delete=models.CASCADE, related_name='member_balances')
+
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    months_covered = models.PositiveIntegerField(default=0)
+
+    # advance against the schedule as of last refresh (use position() for live value)
+    advance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_payment_date = models.DateField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('member', 'group')
+
+    # ----------------------------
+    # LIVE POSITION
+    # ----------------------------
+    def position(self, month_no):
+        """(pending, advance) against ``month_no`` months of dues."""
+        expected = self.group.monthly_amount * max(int(month_no or 0), 0)
+        pending = max(expected - self.total_paid, 0)
+        advance = max(self.total_paid - expected, 0)
+        return pending, advance
+
+    def paid_towards(self, month_no):
+        """Part of month ``month_no`` (1-based) covered by the running total."""
+        monthly = self.group.monthly_amount
+        carried = self.total_paid - monthly * (month_no - 1)
+        return min(max(carried, 0), monthly)
+
+    def __str__(self):
+        return f"{self.member.name} - {self.group.name} - ₹{self.total_paid}"
@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+# =========================
+# 🔢 PAYMENT NUMBERS
+# =========================
+# Every payment takes one serial from a single increasing sequence:
+#   invoice_number = INV<yyyymmdd>-<serial, 10 digits>
+#   transaction_id = TXN<serial, 12 digits>
+# Fixed-width → string order is issue order, and new keys land at the
+# right edge of the unique indexes instead of at random pages.
+#
+# On PostgreSQL the serials come from payments_number_seq. nextval() is
+# outside transactions (never rolled back, never blocks), so each
+# process fetches PAYMENT_NUMBER_BLOCK serials in one round trip and
+# hands them out from memory. Serials lost with a process or a rolled
+# back payment leave gaps; nothing is ever issued twice.
+#
+# Other databases use the NumberSequence counter row, bumped by exactly
+# what the caller needs inside its transaction (a rollback there undoes
+# the bump too, so a cached block could be re-issued → no cache).
+SEQUENCE_NAME = "payments_number_seq"
+COUNTER_NAME = "payment"
+
+_lock = threading.Lock()
+_block = deque()
+_block_pid = None
+
+
+def _fetch_block(size):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT nextval('{SEQUENCE_NAME}') FROM generate_series(1, %s)",
+            [size]
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _counter_serials(count):
+    from payments.models import NumberSequence
+
+    counter = NumberSequence.objects.filter(name=COUNTER_NAME)
+
+    with transaction.atomic():
+        if not counter.update(value=F('value') + count):
+            # first payment ever → create the row, then bump it
+            NumberSequence.objects.get_or_create(name=COUNTER_NAME)
+            counter.update(value=F('value') + count)
+
+        end = counter.values_list('value', flat=True).get()
+
+    return list(range(end - count + 1, end + 1))
+
+
+def next_serials(count):
+    """``count`` payment serials (unique, increasing per process)."""
+    global _block_pid
+
+    if connection.vendor != 'postgresql':
+        return _counter_serials(count)
+
+    with _lock:
+        # a forked worker must not reuse its parent's block
+        if _block_pid != os.getpid():
+            _block.clear()
+            _block_pid = os.getpid()
+
+        if len(_block) < count:
+            _block.extend(_fetch_block(max(settings.PAYMENT_NUMBER_BLOCK, count - len(_block))))
+
+        return [_block.popleft() for _ in range(count)]
+
+
+def next_serial():
+    return next_serials(1)[0]
+
+
+def number_payments(payments):
+    """Fill the missing numbers of unsaved payments (bulk_create skips save) in one go."""
+    missing = [p for p in payments if not (p.transaction_id and p.invoice_number)]
+    day = timezone.localdate()
+
+    for payment, serial in zip(missing, next_serials(len(missing)) if missing else []):
+        payment.transaction_id = payment.transaction_id or transaction_number(serial)
+        payment.invoice_number = payment.invoice_number or invoice_number(serial, day)
+
+    return payments
+
+
+def invoice_number(serial, day=None):
+    day = day or timezone.localdate()
+    return f"INV{day:%Y%m%d}-{serial:010d}"
+
+
+def transaction_number(serial):
+    return f"TXN{serial:012d}"
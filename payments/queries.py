@@ -0,0 +1,209 @@
+import hashlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from django.db.models import Sum, Count, Max, Q, F, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+
+# -----------------------------
+# 📊 GROUPED PAYMENT TOTALS
+# -----------------------------
+# One conditional Sum/Count per bucket → every group's summary comes
+# back from a single GROUP BY query instead of Python passes over rows.
+AMOUNT_BUCKETS = {
+    'total': Q(),
+    'received': Q(received_by_admin=True),
+    'sent': Q(sent_to_admin=True),
+    'draft': Q(sent_to_admin=False),
+    'pending': Q(admin_status='pending'),
+    'approved': Q(admin_status='approved'),
+    'rejected': Q(admin_status='rejected'),
+}
+
+
+def group_payment_totals(payments):
+    """
+    Per-group totals and counts for a Payment queryset.
+
+    Returns a list of dicts ordered by latest payment first:
+        {'group_id', 'latest', 'total_<bucket>', 'count_<bucket>', ...}
+    """
+    annotations = {'latest': Max('paid_date')}
+
+    for name, condition in AMOUNT_BUCKETS.items():
+        annotations[f'total_{name}'] = Sum('amount', filter=condition)
+        annotations[f'count_{name}'] = Count('id', filter=condition)
+
+    rows = (
+        payments.exclude(group__isnull=True)
+        .values('group_id')
+        .annotate(**annotations)
+        .order_by('-latest', '-group_id')
+    )
+
+    result = []
+    for row in rows:
+        for name in AMOUNT_BUCKETS:
+            row[f'total_{name}'] = row[f'total_{name}'] or Decimal('0')
+        result.append(row)
+
+    return result
+
+
+# -----------------------------
+# 📄 KEYSET PAGINATION (ROWS)
+# -----------------------------
+# Rows are ordered newest first by (paid_date, id); a cursor is the
+# position of the last row seen ("2026-05-02_1432"), handed out as an
+# opaque url-safe token. Plain "date_id" cursors are still accepted.
+def make_cursor(payment):
+    position = f"{payment.paid_date.isoformat()}_{payment.id}"
+    return urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def _position(value):
+    try:
+        paid_date, pk = value.split('_', 1)
+        return date.fromisoformat(paid_date), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_cursor(cursor):
+    try:
+        decoded = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (TypeError, ValueError):
+        decoded = None
+
+    return _position(decoded) or _position(cursor)
+
+
+def keyset_page(payments, cursor=None, limit=50):
+    """
+    One page of payments after ``cursor``.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    position = parse_cursor(cursor) if cursor else None
+
+    if position:
+        paid_date, pk = position
+        payments = payments.filter(
+            Q(paid_date__lt=paid_date) | Q(paid_date=paid_date, id__lt=pk)
+        )
+
+    return _trim(list(payments.order_by('-paid_date', '-id')[:limit + 1]), limit)
+
+
+def offset_page(payments, offset, limit=50):
+    """
+    Page at ``offset`` for page-number clients (one OFFSET jump); its
+    next_cursor continues as keyset pages from there.
+    """
+    return _trim(list(payments.order_by('-paid_date', '-id')[offset:offset + limit + 1]), limit)
+
+
+def _trim(rows, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = make_cursor(rows[-1])
+
+    return rows, next_cursor
+
+
+def first_page_per_group(payments, limit=50):
+    """
+    First keyset page of every group in one query (ROW_NUMBER per group).
+    Returns {group_id: (rows, next_cursor)}.
+    """
+    ranked = payments.annotate(
+        row_no=Window(
+            expression=RowNumber(),
+            partition_by=[F('group_id')],
+            order_by=[F('paid_date').desc(), F('id').desc()]
+        )
+    ).filter(row_no__lte=limit + 1).order_by('group_id', 'row_no')
+
+    pages = {}
+    for payment in ranked:
+        pages.setdefault(payment.group_id, []).append(payment)
+
+    result = {}
+    for group_id, rows in pages.items():
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = make_cursor(rows[-1])
+        result[group_id] = (rows, next_cursor)
+
+    return result
+
+
+def group_pages(payments, limit=50, group_id=None, cursor=None):
+    """
+    Row pages for the grouped views: first page of every group, or the page
+    after ``cursor`` for ``group_id`` when the client is paging one group.
+    """
+    pages = first_page_per_group(payments, limit)
+
+    if group_id and cursor and str(group_id).isdigit():
+        pages[int(group_id)] = keyset_page(
+            payments.filter(group_id=group_id), cursor, limit
+        )
+
+    return pages
+
+
+def parse_page_size(value, default=50, maximum=200):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+# -----------------------------
+# 🔢 APPROXIMATE TOTALS
+# -----------------------------
+# COUNT(*) over a big group is the slow part of a page, so list endpoints
+# only count on request and keep the number for PAYMENT_COUNT_CACHE_TIMEOUT
+# seconds, keyed by the SQL of the queryset → "about N" while paging.
+# cached_only=True never counts (None on a miss) → for deep pages.
+def approximate_count(queryset, cached_only=False):
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = "count:" + hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+
+    total = cache.get(key)
+    if total is None and not cached_only:
+        total = queryset.order_by().count()
+        cache.set(key, total, settings.PAYMENT_COUNT_CACHE_TIMEOUT)
+
+    return total
+
+
+def payment_totals(payments, key, refresh=False, cached_only=False):
+    """
+    {'collected', 'received'} of the successful ``payments`` (one aggregate),
+    kept under ``key`` for PAYMENT_COUNT_CACHE_TIMEOUT seconds. The first
+    page of a list passes refresh=True; deeper pages reuse the stored pair
+    (cached_only=True → None instead of summing on a miss).
+    """
+    totals = None if refresh else cache.get(key)
+
+    if totals is None and not cached_only:
+        totals = payments.filter(payment_status='success').aggregate(
+            collected=Coalesce(Sum('amount'), Decimal('0')),
+            received=Coalesce(Sum('amount', filter=Q(received_by_admin=True)), Decimal('0')),
+        )
+        cache.set(key, totals, settings.PAYMENT_COUNT_CACHE_TIMEOUT)
+
+    return totals
+
+
+def group_totals_key(group):
+    """Cache key of the payment totals of ``group`` and its sub groups."""
+    return f"payments:totals:tree:{getattr(group, 'pk', group)}"
@@ -0,0 +1,406 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Sum, Max, Q
+
+from payments.models import Payment, MemberBalance, Installment, PaymentAllocation
+from chitti.dashboard import invalidate_group_owners
+from chitti.notifications import invalidate_group_notifications
+from chitti.snapshot import invalidate_group_snapshots
+
+
+# -----------------------------
+# 📒 MEMBER BALANCE LEDGER
+# -----------------------------
+# Payments that count towards a member's balance: collected successfully
+# and not rejected by the group admin.
+COUNTED_PAYMENTS = Q(payment_status='success') & ~Q(admin_status='rejected')
+
+
+def compute_balance_fields(group, total_paid, last_payment_date):
+    total_paid = total_paid or Decimal('0')
+    monthly = group.monthly_amount
+
+    months_covered = int(total_paid // monthly) if monthly else 0
+    months_covered = min(months_covered, group.duration_months)
+
+    expected = monthly * int(group.current_month or 0)
+
+    return {
+        'total_paid': total_paid,
+        'months_covered': months_covered,
+        'advance': max(total_paid - expected, Decimal('0')),
+        'last_payment_date': last_payment_date,
+    }
+
+
+def refresh_member_balance(member_id, group_id, create=True):
+    """
+    Recompute one ledger row from Payment rows.
+
+    The balance row is locked before the payments are summed so concurrent
+    refreshes for the same member serialize instead of overwriting each other.
+    With ``create=False`` a missing row is left alone (used on delete, where
+    the member or group itself may be going away).
+    """
+    if not member_id or not group_id:
+        return None
+
+    from chitti.models import ChittiGroup
+
+    with transaction.atomic():
+        balances = MemberBalance.objects.select_for_update()
+
+        if create:
+            balance, _ = balances.get_or_create(member_id=member_id, group_id=group_id)
+        else:
+            balance = balances.filter(member_id=member_id, group_id=group_id).first()
+            if balance is None:
+                return None
+
+        totals = Payment.objects.filter(
+            COUNTED_PAYMENTS,
+            member_id=member_id,
+            group_id=group_id
+        ).aggregate(total=Sum('amount'), last=Max('paid_date'))
+
+        group = ChittiGroup.objects.get(id=group_id)
+
+        for field, value in compute_balance_fields(group, totals['total'], totals['last']).items():
+            setattr(balance, field, value)
+
+        balance.save()
+
+    return balance
+
+
+def balance_keys(payments):
+    """(member_id, group_id) pairs touched by a payment queryset."""
+    return set(
+        payments.exclude(member__isnull=True)
+        .exclude(group__isnull=True)
+        .values_list('member_id', 'group_id')
+        .distinct()
+    )
+
+
+def refresh_member_balances(keys):
+    """
+    Refresh several ledger rows. Take the keys *before* a queryset
+    .update() (which skips signals), refresh after it.
+    """
+    for member_id, group_id in keys:
+        refresh_member_balance(member_id, group_id)
+
+
+def lock_member_balance(member, group):
+    """Ledger row locked for the rest of the transaction (limit checks before a new payment)."""
+    balance, _ = MemberBalance.objects.select_for_update().get_or_create(
+        member=member,
+        group=group
+    )
+    return balance
+
+
+def get_balance_map(members=None, groups=None):
+    """
+    {(member_id, group_id): MemberBalance} in a single query.
+    """
+    qs = MemberBalance.objects.select_related('group')
+
+    if members is not None:
+        qs = qs.filter(member__in=members)
+
+    if groups is not None:
+        qs = qs.filter(group__in=groups)
+
+    return {(b.member_id, b.group_id): b for b in qs}
+
+
+def get_balance(balance_map, member, group):
+    """Ledger row from a balance map, or an empty one for members with no payments."""
+    balance = balance_map.get((member.id, group.id))
+    if balance is None:
+        balance = MemberBalance(member=member, group=group)
+    return balance
+
+
+def get_member_balance(member, group):
+    return get_balance(get_balance_map(members=[member], groups=[group]), member, group)
+
+
+# -----------------------------
+# 🔁 REBUILD / VERIFY
+# -----------------------------
+def expected_balances(groups=None):
+    """
+    Ledger values recomputed from Payment rows with one grouped query.
+    Returns {(member_id, group_id): fields}.
+    """
+    from chitti.models import ChittiGroup
+
+    payments = Payment.objects.filter(COUNTED_PAYMENTS).exclude(
+        member__isnull=True
+    ).exclude(group__isnull=True)
+
+    group_qs = ChittiGroup.objects.all()
+    if groups is not None:
+        payments = payments.filter(group__in=groups)
+        group_qs = group_qs.filter(id__in=[getattr(g, 'id', g) for g in groups])
+
+    group_map = {g.id: g for g in group_qs}
+
+    rows = payments.values('member_id', 'group_id').annotate(
+        total=Sum('amount'),
+        last=Max('paid_date')
+    )
+
+    return {
+        (row['member_id'], row['group_id']): compute_balance_fields(
+            group_map[row['group_id']], row['total'], row['last']
+        )
+        for row in rows
+    }
+
+
+def diff_balances(groups=None):
+    """
+    Compare the stored ledger with Payment rows.
+    Returns a list of (member_id, group_id, stored, expected) mismatches.
+    ``advance`` is skipped since it moves with the calendar.
+    """
+    expected = expected_balances(groups)
+
+    stored_qs = MemberBalance.objects.all()
+    if groups is not None:
+        stored_qs = stored_qs.filter(group__in=groups)
+
+    stored = {
+        (b.member_id, b.group_id): {
+            'total_paid': b.total_paid,
+            'months_covered': b.months_covered,
+            'last_payment_date': b.last_payment_date,
+        }
+        for b in stored_qs
+    }
+
+    empty = {'total_paid': Decimal('0'), 'months_covered': 0, 'last_payment_date': None}
+    mismatches = []
+
+    for key in set(expected) | set(stored):
+        want = dict(expected.get(key, empty))
+        want.pop('advance', None)
+        have = stored.get(key, empty)
+
+        if want != have:
+            mismatches.append((key[0], key[1], have, want))
+
+    return mismatches
+
+
+@transaction.atomic
+def rebuild_member_balances(groups=None):
+    """Rewrite the ledger from Payment rows. Returns the number of rows written."""
+    expected = expected_balances(groups)
+
+    stale = MemberBalance.objects.all()
+    if groups is not None:
+        stale = stale.filter(group__in=groups)
+    stale.delete()
+
+    MemberBalance.objects.bulk_create(
+        [
+            MemberBalance(member_id=member_id, group_id=group_id, **fields)
+            for (member_id, group_id), fields in expected.items()
+        ],
+        batch_size=500
+    )
+
+    return len(expected)
+
+
+# -----------------------------
+# ⚙️ BULK ALLOCATION ENGINE
+# -----------------------------
+# FIFO allocation of many payments over their members' open installments.
+# Installments are locked once, the split is worked out in memory and
+# written back with bulk_update / bulk_create → query count does not grow
+# with the number of payments or installments.
+def installment_status(inst):
+    if inst.amount_paid <= 0:
+        inst.amount_paid = Decimal('0')
+        return 'pending'
+    if inst.amount_paid >= inst.amount_due:
+        return 'paid'
+    return 'partial'
+
+
+@transaction.atomic
+def allocate_payments(payments):
+    """
+    Allocate payments (FIFO by paid_date) to open installments.
+    Payments that already have allocations are skipped.
+    Returns the number of PaymentAllocation rows created.
+    """
+    payments = [p for p in payments if p.member_id and p.group_id]
+    if not payments:
+        return 0
+
+    already = set(
+        PaymentAllocation.objects.filter(payment__in=payments)
+        .values_list('payment_id', flat=True)
+        .distinct()
+    )
+    payments = sorted(
+        (p for p in payments if p.id not in already),
+        key=lambda p: (p.paid_date, p.id)
+    )
+    if not payments:
+        return 0
+
+    keys = {(p.member_id, p.group_id) for p in payments}
+
+    installments = Installment.objects.select_for_update().filter(
+        member_id__in={m for m, _ in keys},
+        group_id__in={g for _, g in keys},
+        status__in=['pending', 'partial']
+    ).order_by('month', 'id')
+
+    queues = {}
+    for inst in installments:
+        if (inst.member_id, inst.group_id) in keys:
+            queues.setdefault((inst.member_id, inst.group_id), []).append(inst)
+
+    allocations = []
+    touched = {}
+
+    for payment in payments:
+        remaining = Decimal(payment.amount)
+
+        for inst in queues.get((payment.member_id, payment.group_id), []):
+            if remaining <= 0:
+                break
+
+            due = inst.amount_due - inst.amount_paid
+            if due <= 0:
+                continue
+
+            pay_amount = min(remaining, due)
+
+            inst.amount_paid += pay_amount
+            inst.status = installment_status(inst)
+            touched[inst.id] = inst
+
+            allocations.append(PaymentAllocation(
+                payment=payment,
+                installment=inst,
+                amount=pay_amount
+            ))
+
+            remaining -= pay_amount
+
+    Installment.objects.bulk_update(touched.values(), ['amount_paid', 'status'], batch_size=500)
+    PaymentAllocation.objects.bulk_create(allocations, batch_size=500)
+
+    return len(allocations)
+
+
+@transaction.atomic
+def reverse_allocations(payments):
+    """
+    Undo the allocations of the given payments (group or single reject).
+    Returns the number of PaymentAllocation rows removed.
+    """
+    allocations = list(
+        PaymentAllocation.objects.filter(payment__in=payments)
+        .values_list('installment_id', 'amount')
+    )
+    if not allocations:
+        return 0
+
+    installments = Installment.objects.select_for_update().in_bulk(
+        {inst_id for inst_id, _ in allocations}
+    )
+
+    for inst_id, amount in allocations:
+        inst = installments[inst_id]
+        inst.amount_paid -= amount
+        inst.status = installment_status(inst)
+
+    Installment.objects.bulk_update(installments.values(), ['amount_paid', 'status'], batch_size=500)
+    PaymentAllocation.objects.filter(payment__in=payments).delete()
+
+    return len(allocations)
+
+
+@transaction.atomic
+def approve_payments(payments, mark_seen=False):
+    """
+    Approve a payment queryset in bulk and allocate it.
+    Returns (count, total) of the payments approved.
+    """
+    payments = list(
+        payments.exclude(admin_status='approved').select_for_update()
+    )
+    if not payments:
+        return 0, Decimal('0')
+
+    fields = {
+        'admin_status': 'approved',
+        'received_by_admin': True,
+        'updated_at': timezone.now(),
+    }
+    if mark_seen:
+        fields['is_seen'] = True
+
+    Payment.objects.filter(id__in=[p.id for p in payments]).update(**fields)
+
+    allocate_payments(payments)
+
+    # 📊 .update() skips signals → drop cached dashboards, counters and snapshots
+    group_ids = {p.group_id for p in payments}
+    invalidate_group_owners(group_ids)
+    invalidate_group_notifications(group_ids)
+    invalidate_group_snapshots(group_ids)
+
+    return len(payments), sum((p.amount for p in payments), Decimal('0'))
+
+
+@transaction.atomic
+def reject_payments(payments, mark_seen=False):
+    """
+    Reject a payment queryset in bulk: reverse allocations of any approved
+    ones, flip the status and resync the member ledger.
+    Returns (count, total) of the payments rejected.
+    """
+    payments = list(
+        payments.exclude(admin_status='rejected').select_for_update()
+    )
+    if not payments:
+        return 0, Decimal('0')
+
+    approved = [p for p in payments if p.admin_status == 'approved']
+    if approved:
+        reverse_allocations(approved)
+
+    fields = {
+        'admin_status': 'rejected',
+        'received_by_admin': False,
+        'updated_at': timezone.now(),
+    }
+    if mark_seen:
+        fields['is_seen'] = True
+
+    Payment.objects.filter(id__in=[p.id for p in payments]).update(**fields)
+
+    # 📒 .update() skips signals → resync ledger, drop cached dashboards, counters and snapshots
+    refresh_member_balances({
+        (p.member_id, p.group_id) for p in payments if p.member_id and p.group_id
+    })
+    group_ids = {p.group_id for p in payments}
+    invalidate_group_owners(group_ids)
+    invalidate_group_notifications(group_ids)
+    invalidate_group_snapshots(group_ids)
+
+    return len(payments), sum((p.amount for p in payments), Decimal('0'))
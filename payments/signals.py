@@ -0,0 +1,37 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from payments.models import Payment
+from payments.services import refresh_member_balance
+
+
+# -----------------------------
+# 📒 KEEP MEMBER BALANCE IN SYNC
+# -----------------------------
+@receiver(post_init, sender=Payment)
+def remember_balance_key(sender, instance, **kwargs):
+    # member / group can change on edit → old ledger row needs a refresh too
+    deferred = instance.get_deferred_fields()
+    if 'member_id' in deferred or 'group_id' in deferred:
+        # .only()/.defer() load → reading them here would query (and recurse)
+        instance._balance_key = None
+    else:
+        instance._balance_key = (instance.member_id, instance.group_id)
+
+
+@receiver(post_save, sender=Payment)
+def update_balance_on_save(sender, instance, **kwargs):
+    old_key = getattr(instance, '_balance_key', None)
+    new_key = (instance.member_id, instance.group_id)
+
+    refresh_member_balance(*new_key)
+
+    if old_key and old_key != new_key:
+        refresh_member_balance(*old_key)
+
+    instance._balance_key = new_key
+
+
+@receiver(post_delete, sender=Payment)
+def update_balance_on_delete(sender, instance, **kwargs):
+    refresh_member_balance(instance.member_id, instance.group_id, create=False)
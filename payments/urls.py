@@ -10,4 +10,7 @@ urlpatterns = [
     path('group/edit/<int:pk>/', views.group_payment_edit, name='group_payment_edit'),
     path('group/delete/<int:pk>/', views.group_payment_delete, name='group_payment_delete'),
     path('group/history/', views.group_cash_collected_history, name='group_cash_collected_history'),
+
+    # Exports (staff)
+    path('export/<str:dataset>/', views.export_data, name='export_data'),
 ]
@@ -2,15 +2,18 @@ from datetime import timezone
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db.models import Sum
-from accounts.decorators import group_admin_required, collector_required
+from accounts.decorators import group_admin_required, collector_required, role_required
 from chitti.models import ChittiGroup, ChittiMember
+from chitti.hierarchy import subtree
 from members.models import Member
 from .models import Payment
 from .forms import PaymentForm
 from .models import Payment
 from .forms import PaymentForm
 from django.db import transaction
-from django.core.paginator import Paginator
+from payments.queries import approximate_count, group_totals_key, keyset_page, payment_totals
+from payments.exports import EXPORTS, EXPORT_FORMATS, export_scope, export_rows, export_response
+from django.http import Http404, HttpResponseBadRequest
 from django.utils import timezone  
 from django.contrib.auth.decorators import login_required
 
@@ -31,27 +34,32 @@ def group_payment_list(request):
         messages.error(request, "You are not assigned to any group.")
         return redirect('chitti:dashboard')
 
-    # Include sub-groups for admin
-    groups = [main_group.id] + list(main_group.sub_groups.values_list('id', flat=True))
+    # Include sub-groups for admin (any depth)
+    groups = subtree(main_group).values('id')
 
     # Fetch payments for all groups
     payments_list = Payment.objects.filter(group_id__in=groups)\
-        .select_related('member', 'collected_by', 'group')\
-        .order_by('-paid_date')
+        .select_related('member', 'collected_by__user', 'group')
 
-    # Calculate totals
-    total_collector_collected = payments_list.filter(payment_status='success').aggregate(total=Sum('amount'))['total'] or 0
-    total_admin_collected = payments_list.filter(payment_status='success', received_by_admin=True).aggregate(total=Sum('amount'))['total'] or 0
+    # Keyset pagination (?cursor=) → no COUNT / OFFSET per page
+    cursor = request.GET.get('cursor')
+    payments, next_cursor = keyset_page(payments_list, cursor, limit=10)
 
-    # Pagination
-    paginator = Paginator(payments_list, 10)  # 10 payments per page
-    page_number = request.GET.get('page')
-    payments = paginator.get_page(page_number)
+    # Totals + count summed on the first page only (one query each, cached);
+    # deeper pages show the cached figures and never scan the group again
+    is_first_page = not cursor
+    totals = payment_totals(
+        payments_list, group_totals_key(main_group),
+        refresh=is_first_page, cached_only=not is_first_page
+    ) or {}
 
     return render(request, 'chitti/payment_list.html', {
-        'payments': payments,  # Page object
-        'total_collector_collected': total_collector_collected,
-        'total_admin_collected': total_admin_collected,
+        'payments': payments,
+        'next_cursor': next_cursor,
+        'is_first_page': is_first_page,
+        'approximate_total': approximate_count(payments_list, cached_only=not is_first_page),
+        'total_collector_collected': totals.get('collected'),
+        'total_admin_collected': totals.get('received'),
     })
 @group_admin_required
 @transaction.atomic
@@ -255,3 +263,22 @@ def group_cash_collected_history(request):
     })
 
 
+# -----------------------------------
+# EXPORTS (CSV / XLSX, streamed)
+# -----------------------------------
+@login_required
+@role_required('admin', 'group_admin', 'collector')
+def export_data(request, dataset):
+    if dataset not in EXPORTS:
+        raise Http404("Unknown export")
+
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("format must be csv or xlsx")
+
+    try:
+        rows = export_rows(dataset, export_scope(request.user, dataset), request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    return export_response(dataset, rows, fmt)
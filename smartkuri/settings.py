@@ -123,6 +123,43 @@ else:
             "PORT": "5432",
         }
     }
+# -----------------------------
+# CACHE
+# -----------------------------
+# Local memory by default; point CACHE_BACKEND / CACHE_LOCATION at
+# redis or memcached in production (e.g. django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "smartkuri"),
+    }
+}
+
+# Dashboard summary: served fresh for DASHBOARD_CACHE_TIMEOUT seconds, then
+# served stale (while one refresh runs) for up to DASHBOARD_CACHE_STALE more.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", 60))
+DASHBOARD_CACHE_STALE = int(os.getenv("DASHBOARD_CACHE_STALE", 600))
+
+# Group admin notification counter: kept in step on every payment save,
+# recounted from the database at least this often (seconds).
+NOTIFICATION_CACHE_TIMEOUT = int(os.getenv("NOTIFICATION_CACHE_TIMEOUT", 900))
+
+# Group detail snapshot: dropped on every change to the group's payments,
+# members and auctions; this only bounds how long a missed one can linger.
+GROUP_SNAPSHOT_CACHE_TIMEOUT = int(os.getenv("GROUP_SNAPSHOT_CACHE_TIMEOUT", 300))
+
+# Idempotency-Key responses are replayed for this long (seconds);
+# older records are purged by `manage.py purge_idempotency_records`.
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 86400))
+
+# Payment serials each process takes from the PostgreSQL sequence at once
+# (payments.numbering); unused ones are skipped when the process exits.
+PAYMENT_NUMBER_BLOCK = int(os.getenv("PAYMENT_NUMBER_BLOCK", 100))
+
+# Row totals shown next to keyset pages (payments.queries.approximate_count)
+# are recounted at most this often (seconds).
+PAYMENT_COUNT_CACHE_TIMEOUT = int(os.getenv("PAYMENT_COUNT_CACHE_TIMEOUT", 120))
+
 # -----------------------------
 # PASSWORD VALIDATION
 # -----------------------------
@@ -197,6 +234,7 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.api.v1.serializers.FirstLoginTokenObtainPairSerializer",
 }
 
 # -----------------------------
@@ -213,12 +251,16 @@ CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
     "dnt",
+    "idempotency-key",
     "origin",
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
 ]
 
+# lets browser clients see that a response was replayed (core.idempotency)
+CORS_EXPOSE_HEADERS = ["idempotent-replayed"]
+
 # -----------------------------
 # CSRF SETTINGS
 # -----------------------------
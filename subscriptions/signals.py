@@ -19,13 +19,13 @@ def create_group(admin_user, group_name, plan_name):
     return group
 
 # 2️⃣ Add member to separate group
-def add_member_to_group(group, member, token_no):
+def add_member_to_group(group, member, token_no=None):
     if not can_add_member(group):
         return False, f"Cannot add member: limit reached ({group.subscription.plan.max_members}) or expired"
 
     ChittiMember.objects.create(
         group=group,
         member=member,
-        token_no=token_no
+        token_no=token_no  # None → next token of the group
     )
     return True, "Member added successfully"
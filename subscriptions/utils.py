@@ -1,18 +1,25 @@
 from django.utils import timezone
 from chitti.models import ChittiGroup
+from chitti.hierarchy import root_group_id
+from subscriptions.models import GroupSubscription
 
 
 # ---------------- Effective Subscription ----------------
 def get_effective_subscription(group: ChittiGroup):
     """
     Returns active subscription from main group.
-    Sub-groups inherit subscription from parent group.
+    Sub-groups (any depth) inherit subscription from the main group,
+    found from the group's tree_path (no parent lookups).
     """
     if not group:
         return None
 
-    main_group = group.parent_group or group
-    subscription = getattr(main_group, "subscription", None)
+    main_group_id = root_group_id(group)
+
+    if main_group_id == group.pk:
+        subscription = getattr(group, "subscription", None)
+    else:
+        subscription = GroupSubscription.objects.filter(group_id=main_group_id).first()
 
     if not subscription:
         return None